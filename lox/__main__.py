@@ -1,14 +1,128 @@
-from sys import argv
+import json
+import os
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from sys import argv, stderr, stdout
 from lox.lox import Lox
+from lox.optimizer import Optimizer, passes
+from lox.cache import CheckCache, ProgramCache
+from lox.profiler import Profile, ProfilingInterpreter
+from lox.batch import find_scripts, run_batch
+from lox.check import check_scripts, format_report
+from lox.output import Output
 
 
 def main(args) -> None:
-    if len(args) > 1:
-        Lox.usage(64)
-    elif len(args) == 1:
-        Lox.run_file(args[0])
-    else:
-        Lox.run_repl()
+    parser = ArgumentParser(prog="lox")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("--engine", choices=Lox.engines, default="interpreter")
+    parser.add_argument("--scanner", choices=Lox.scanners, default="chars")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--mmap", action="store_true")
+    parser.add_argument("--cache-dir", type=Path, help="cache parsed scripts in this directory")
+    parser.add_argument("--cache-size", type=int, default=64, help="cache size limit in MiB (default 64)")
+    parser.add_argument("--emit-python", action="store_true")
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--passes", help=f"comma separated optimizer passes: {', '.join(passes)}")
+    parser.add_argument("--optimize-report", action="store_true")
+    parser.add_argument("--profile", action="store_true", help="print the hottest lines and node types to stderr")
+    parser.add_argument("--profile-stacks", type=Path, help="write collapsed stacks for flame graphs to this file")
+    parser.add_argument("--flush", choices=Output.policies,
+                        help="when printed lines are written out (default line on a terminal, size otherwise)")
+    parser.add_argument("--flush-size", type=int, default=64, help="KiB of output to buffer (default 64)")
+    parser.add_argument("--flush-interval", type=float, default=0.1,
+                        help="seconds a line waits under the time policy (default 0.1)")
+    parser.add_argument("--batch", metavar="DIR|GLOB", help="run many scripts and print a json report of them")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes for --batch and --check")
+    parser.add_argument("--check", action="store_true",
+                        help="scan, parse and resolve the script, or every script of a DIR|GLOB, without running "
+                             "them, and report every error")
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="how --check reports errors")
+    options = parser.parse_args(args)
+
+    Lox.scanner = Lox.scanners[options.scanner]
+    Lox.streaming = options.stream
+    Lox.memory_map = options.mmap
+    Lox.use_output(Output(policy=options.flush, size=options.flush_size * 1024, interval=options.flush_interval))
+
+    if options.check:
+        if options.script is None or options.batch is not None or options.emit_python or options.profile \
+                or options.profile_stacks:
+            parser.error("--check needs a script, directory or glob, and does nothing else.")
+        if options.jobs < 1:
+            parser.error("--jobs must be at least 1.")
+
+        scripts = find_scripts(options.script)
+        if not scripts:
+            parser.error(f"No scripts found for '{options.script}'.")
+
+        cache = None
+        if options.cache_dir is not None:
+            cache = CheckCache(options.cache_dir, options.cache_size * 1024 * 1024)
+
+        report = check_scripts(scripts, Lox.scanner, options.jobs, cache)
+        if options.format == "json":
+            json.dump(report, stdout, indent=2)
+            stdout.write("\n")
+        else:
+            stdout.write(format_report(report))
+        exit(65 if report["failed"] else 0)
+
+    if options.cache_dir is not None:
+        Lox.cache = ProgramCache(options.cache_dir, options.cache_size * 1024 * 1024)
+
+    if options.optimize or options.passes is not None:
+        enabled = options.passes.split(",") if options.passes is not None else None
+        try:
+            Lox.optimizer = Optimizer(enabled, stderr if options.optimize_report else None)
+        except ValueError as error:
+            parser.error(str(error))
+
+    if options.batch is not None:
+        if options.script is not None or options.emit_python or options.profile or options.profile_stacks:
+            parser.error("--batch runs the scripts it finds and nothing else.")
+        if options.jobs < 1:
+            parser.error("--jobs must be at least 1.")
+
+        scripts = find_scripts(options.batch)
+        if not scripts:
+            parser.error(f"No scripts found for '{options.batch}'.")
+
+        report = run_batch(scripts, options.engine, options.jobs)
+        json.dump(report, stdout, indent=2)
+        stdout.write("\n")
+        exit(1 if report["failed"] else 0)
+
+    profile = None
+    if options.profile or options.profile_stacks is not None:
+        if options.engine != "interpreter":
+            parser.error("--profile needs the interpreter engine.")
+        profile = Profile()
+        Lox.interpreter = ProfilingInterpreter(Lox.globals, profile, Lox.output)
+
+    try:
+        if options.emit_python:
+            Lox.emit_python(options.script)
+        elif options.script is not None:
+            Lox.run_file(options.script, options.engine)
+        else:
+            Lox.run_repl(options.engine)
+    finally:
+        # also after the exit of a script with errors
+        Lox.output.flush()
+        if profile is not None:
+            write_profile(profile, options)
+
+
+def write_profile(profile: Profile, options: Namespace) -> None:
+    if options.profile:
+        source = Path(options.script).read_text().splitlines() if options.script is not None else None
+        stderr.write("\n")
+        profile.report(stderr, source)
+
+    if options.profile_stacks is not None:
+        with open(options.profile_stacks, "w") as file:
+            profile.write_stacks(file)
 
 main(argv[1:])
 
@@ -0,0 +1,180 @@
+import math
+import operator
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+from lox.tokens import Token, TokenType
+from lox.errors import LoxRuntimeError
+
+try:
+    import numpy
+except ImportError:
+    # arrays fall back to array('d'), with the same results, only slower
+    numpy = None
+
+
+class LoxArray:
+    # a lox value holding numbers, or the booleans a comparison of numbers
+    #     gives, on which the operators apply element by element. it is
+    #     truthy like any other object, so it never stands for a boolean
+    __slots__ = ('values', 'booleans')
+
+    def __init__(self, values: Iterable = (), booleans: bool = False) -> None:
+        # a numpy.ndarray of float64 or bool, or else an array of 'd' or 'b'
+        if numpy is not None:
+            self.values = numpy.asarray(values, dtype=bool if booleans else numpy.float64)
+        else:
+            self.values = values if isinstance(values, array) else array('b' if booleans else 'd', values)
+        self.booleans = booleans
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator:
+        # as lox values, float or bool
+        if self.booleans:
+            return (bool(value) for value in self.values)
+        return (float(value) for value in self.values)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __str__(self) -> str:
+        return "[" + ", ".join(map(stringify, self)) + "]"
+
+    def __repr__(self) -> str:
+        return f"LoxArray({self})"
+
+    def __eq__(self, other: Any) -> Any:
+        if not comparable(self, other):
+            return False
+        return combine(TokenType.EQUAL_EQUAL, self, other)
+
+    def __ne__(self, other: Any) -> Any:
+        if not comparable(self, other):
+            return True
+        return combine(TokenType.BANG_EQUAL, self, other)
+
+    __hash__ = None
+
+    def sum(self) -> float:
+        if numpy is not None:
+            return float(self.values.sum())
+        return math.fsum(self.values)
+
+    def at(self, index: int) -> Any:
+        return bool(self.values[index]) if self.booleans else float(self.values[index])
+
+    def min(self) -> float:
+        # nan for an empty array, as for mean
+        if not len(self):
+            return math.nan
+        return float(min(self.values)) if numpy is None else float(self.values.min())
+
+    def max(self) -> float:
+        if not len(self):
+            return math.nan
+        return float(max(self.values)) if numpy is None else float(self.values.max())
+
+    def mean(self) -> float:
+        # nan for an empty array, as 0 / 0 is
+        return self.sum() / len(self) if len(self) else math.nan
+
+
+def stringify(value: Any) -> str:
+    # as Interpreter.stringify
+    if isinstance(value, bool):
+        return str(value).lower()
+    text = str(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+def divide(left: float, right: float) -> float:
+    # ieee division, as numpy divides
+    if right == 0.0:
+        if left == 0.0 or math.isnan(left):
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+    return left / right
+
+
+# operator -> python function and numpy function applied element-wise,
+#     and whether the result holds booleans
+operators: Dict[TokenType, Tuple[Callable, str, bool]] = {
+    TokenType.PLUS: (operator.add, "add", False),
+    TokenType.MINUS: (operator.sub, "subtract", False),
+    TokenType.STAR: (operator.mul, "multiply", False),
+    TokenType.SLASH: (divide, "divide", False),
+    TokenType.GREATER: (operator.gt, "greater", True),
+    TokenType.GREATER_EQUAL: (operator.ge, "greater_equal", True),
+    TokenType.LESS: (operator.lt, "less", True),
+    TokenType.LESS_EQUAL: (operator.le, "less_equal", True),
+    TokenType.EQUAL_EQUAL: (operator.eq, "equal", True),
+    TokenType.BANG_EQUAL: (operator.ne, "not_equal", True),
+}
+
+
+def numbers(value: Any) -> bool:
+    return type(value) is float or (type(value) is LoxArray and not value.booleans)
+
+
+def comparable(left: Any, right: Any) -> bool:
+    # == and != apply element by element against a number, a boolean or an
+    #     array of the same length; anything else is unequal
+    for value in (left, right):
+        if type(value) is not LoxArray and type(value) is not float and type(value) is not bool:
+            return False
+    return not (type(left) is LoxArray and type(right) is LoxArray and len(left) != len(right))
+
+
+def combine(operator_type: TokenType, left: Any, right: Any) -> LoxArray:
+    # operands already checked, at least one of them an array
+    function, name, booleans = operators[operator_type]
+
+    if numpy is not None:
+        left = left.values if type(left) is LoxArray else left
+        right = right.values if type(right) is LoxArray else right
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return LoxArray(getattr(numpy, name)(left, right), booleans)
+
+    if type(left) is LoxArray and type(right) is LoxArray:
+        values = map(function, left.values, right.values)
+    elif type(left) is LoxArray:
+        values = (function(value, right) for value in left.values)
+    else:
+        values = (function(left, value) for value in right.values)
+    return LoxArray(array('b' if booleans else 'd', values), booleans)
+
+
+def binary(operator: Token, left: Any, right: Any) -> Any:
+    # left operator right when either is an array; the engines call it
+    #     where their own checks fail, so otherwise it raises what they did
+    if operator.type == TokenType.EQUAL_EQUAL:
+        return left == right
+    if operator.type == TokenType.BANG_EQUAL:
+        return left != right
+
+    if not numbers(left) or not numbers(right) or (type(left) is not LoxArray and type(right) is not LoxArray):
+        if operator.type == TokenType.PLUS:
+            raise LoxRuntimeError(operator, 'Cannot add a number and a string.')
+        raise LoxRuntimeError(operator, 'Operands must be numbers.')
+    if type(left) is LoxArray and type(right) is LoxArray and len(left) != len(right):
+        raise LoxRuntimeError(operator, 'Arrays must have the same length.')
+
+    return combine(operator.type, left, right)
+
+
+def apply(value: LoxArray, function: Callable[[float], float], name: str) -> LoxArray:
+    # function, or the numpy function of that name, on every number
+    if numpy is not None:
+        with numpy.errstate(all="ignore"):
+            return LoxArray(getattr(numpy, name)(value.values))
+    return LoxArray(array('d', map(function, value.values)))
+
+
+def negate(operator: Token, value: Any) -> Any:
+    if type(value) is not LoxArray or value.booleans:
+        raise LoxRuntimeError(operator, 'Operand must be a number.')
+
+    if numpy is not None:
+        return LoxArray(-value.values)
+    return LoxArray(array('d', (-item for item in value.values)))
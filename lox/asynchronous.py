@@ -0,0 +1,153 @@
+import asyncio
+from asyncio import StreamWriter
+from time import perf_counter
+from typing import Any, List
+from lox.environment import Environment, Globals
+from lox.expression import Expression as ExprExpression
+from lox.statement import Statement, Block, If, Print, While
+from lox.interpreter import Interpreter
+
+
+class AsyncWriter:
+    # what print writes to: text goes to write() and drain() is awaited
+    #     whenever the script gives the loop a turn, as with StreamWriter
+    def write(self, text: str) -> None:
+        raise NotImplementedError
+
+    async def drain(self) -> None:
+        pass
+
+
+class StreamOutput(AsyncWriter):
+    # the text of print encoded onto an asyncio stream, such as a socket
+    def __init__(self, stream: StreamWriter, encoding: str = "utf-8") -> None:
+        self.stream = stream
+        self.encoding = encoding
+
+    def write(self, text: str) -> None:
+        self.stream.write(text.encode(self.encoding))
+
+    async def drain(self) -> None:
+        await self.stream.drain()
+
+
+class AsyncInterpreter(Interpreter):
+    # runs a script as a coroutine that gives the event loop a turn every
+    #     slice_nodes evaluated expression nodes or slice_time seconds,
+    #     whichever comes first, so scripts sharing a loop take turns with
+    #     each other and with everything else on it.
+    #
+    # only statements await, expressions are evaluated as Interpreter does:
+    #     without calls of lox functions, an expression runs for as long as
+    #     its source is, and every loop runs statements, so the budget is
+    #     checked after each one. natives run to completion
+    def __init__(self, globals: Globals = None, stdout: AsyncWriter = None,
+                 slice_nodes: int = 1000, slice_time: float = None) -> None:
+        super().__init__(globals)
+        # sys.stdout when None
+        self.writer = stdout
+        # None for no limit
+        self.slice_nodes = slice_nodes
+        self.slice_time = slice_time
+        self.nodes = 0
+        self.slice_start = 0.0
+
+    async def interpret(self, statements: List[Statement]) -> None:
+        self.nodes = 0
+        self.slice_start = perf_counter()
+        self.call_sites = {}
+
+        try:
+            await self.execute_all(statements)
+        finally:
+            if self.writer is not None:
+                await self.writer.drain()
+
+    def evaluate(self, expr: ExprExpression) -> Any:
+        self.nodes += 1
+        return expr.accept(self)
+
+    async def execute(self, stmt: Statement) -> None:
+        # expression, print and var statements run as Interpreter runs them
+        #     and return None; blocks, ifs and whiles return a coroutine
+        pending = stmt.accept(self)
+        if pending is not None:
+            await pending
+
+        if self.exhausted():
+            await self.pause()
+
+    async def execute_all(self, statements: List[Statement]) -> None:
+        # execute for each statement, without a coroutine for each
+        for statement in statements:
+            pending = statement.accept(self)
+            if pending is not None:
+                await pending
+
+            if self.exhausted():
+                await self.pause()
+
+    def exhausted(self) -> bool:
+        if self.slice_nodes is not None and self.nodes >= self.slice_nodes:
+            return True
+        return self.slice_time is not None and perf_counter() - self.slice_start >= self.slice_time
+
+    async def pause(self) -> None:
+        # the loop runs ready callbacks in the order they became ready, so
+        #     every script that is out of budget waits for all the others
+        #     to have had a turn
+        if self.writer is not None:
+            await self.writer.drain()
+        await asyncio.sleep(0)
+
+        self.nodes = 0
+        self.slice_start = perf_counter()
+
+    async def visit_if_statement(self, statement: If):
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        if self.truthy(evaluate(statement.condition)):
+            await self.execute(statement.then_branch)
+        elif statement.else_branch is not None:
+            await self.execute(statement.else_branch)
+
+        return None
+
+    def visit_print_statement(self, statement: Print):
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        value = evaluate(statement.expression)
+        if self.writer is None:
+            print(self.stringify(value))
+        else:
+            self.writer.write(self.stringify(value) + "\n")
+        return None
+
+    async def visit_block_statement(self, statement: Block):
+        # blocks that declare nothing share the enclosing environment
+        if statement.slots == 0:
+            await self.execute_all(statement.statements)
+            return None
+
+        await self.execute_block(statement.statements, Environment(self.environment, statement.slots))
+        return None
+
+    async def execute_block(self, statements: List[Statement], environment: Environment) -> None:
+        previous = self.environment
+        try:
+            self.environment = environment
+            await self.execute_all(statements)
+        finally:
+            self.environment = previous
+
+    async def visit_while_statement(self, statement: While):
+        body = statement.body
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+
+        while self.truthy(evaluate(statement.condition)):
+            pending = body.accept(self)
+            if pending is not None:
+                await pending
+
+            if self.exhausted():
+                await self.pause()
+
+        return None
@@ -0,0 +1,90 @@
+import gc
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from glob import glob
+from io import StringIO
+from itertools import repeat
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List
+from lox.lox import Lox
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.vm import VM
+from lox.output import Output
+
+
+def find_scripts(pattern: str) -> List[str]:
+    # every .lox file under a directory, or the files a glob matches
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(str(script) for script in path.rglob("*.lox"))
+
+    return sorted(script for script in glob(pattern, recursive=True) if Path(script).is_file())
+
+
+def run_script(path: str, engine: str) -> Dict[str, Any]:
+    # each script starts from fresh globals and error flags, as it would in
+    #     a process of its own
+    stdout = StringIO()
+    stderr = StringIO()
+    status = 0
+
+    start = perf_counter()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        Lox.globals = Globals()
+        # made here, so it picks its policy for the captured stdout
+        Lox.output = Output()
+        Lox.interpreter = Interpreter(Lox.globals, Lox.output)
+        Lox.vm = VM(Lox.globals, Lox.output)
+        Lox.had_error = False
+        Lox.had_runtime_error = False
+
+        try:
+            Lox.run_file(path, engine)
+        except SystemExit as error:
+            # run_file exits with 65 and 70
+            status = error.code if error.code is not None else 0
+        except Exception:
+            # as an uncaught exception ends python
+            traceback.print_exc()
+            status = 1
+    elapsed = perf_counter() - start
+
+    return {
+        "script": path,
+        "status": status,
+        "wall_time": elapsed,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+def run_batch(paths: List[str], engine: str, jobs: int) -> Dict[str, Any]:
+    # workers are forked, so they start with everything imported and with
+    #     the settings on Lox; where fork is missing they start afresh
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork") if "fork" in methods else None
+
+    # objects that exist now are left alone by the collector from here on,
+    #     so collections in the workers do not write to, and so copy, the
+    #     pages they share with this process
+    gc.freeze()
+
+    start = perf_counter()
+    with ProcessPoolExecutor(jobs, mp_context=context) as executor:
+        # scripts go to the workers a few at a time rather than one by one
+        chunksize = max(1, len(paths) // (jobs * 8))
+        results = list(executor.map(run_script, paths, repeat(engine), chunksize=chunksize))
+    elapsed = perf_counter() - start
+
+    return {
+        "engine": engine,
+        "jobs": jobs,
+        "wall_time": elapsed,
+        "scripts": len(results),
+        "failed": sum(1 for result in results if result["status"] != 0),
+        "results": results,
+    }
@@ -0,0 +1,217 @@
+import os
+import pickle
+import stat
+import sys
+from hashlib import sha256
+from pathlib import Path
+from secrets import token_hex
+from time import time
+from typing import List, Optional, Set, Tuple, Union
+from lox.flat import FlatAst, node_types
+from lox.statement import Statement
+from lox.tokens import Buffer
+
+
+# bump whenever what a cached program means changes without the node
+#     classes changing, e.g. a resolver or optimizer fix
+version = 1
+
+# node classes are generated, so their layout is part of every key and
+#     regenerating them invalidates the whole cache
+layout = ";".join(f"{node_type.__name__}({','.join(node_type.__slots__)})" for node_type in node_types)
+fingerprint = f"{version} {sys.version_info.major}.{sys.version_info.minor} {layout}".encode()
+
+def temporary_file(directory: Path) -> Tuple[int, str]:
+    # like mkstemp, but with the mode any new file gets, 0666 less the
+    #     umask, rather than readable by its owner only, so a cache shared
+    #     between users is shared. the kernel applies the umask, which the
+    #     process never has to read or change
+    while True:
+        temporary = str(directory / f"{token_hex(8)}.tmp")
+        try:
+            return os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temporary
+        except FileExistsError:
+            continue
+
+
+class ProgramCache:
+    # parsed, resolved and optimized programs on disk, keyed by a hash of
+    #     their source, like .pyc files are for python
+    suffix = ".loxc"
+    # temporary files older than this were left by a writer that died
+    stale = 60 * 60
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(source: Union[str, Buffer], variant: str = "") -> str:
+        digest = sha256(fingerprint)
+        digest.update(variant.encode() + b"\0")
+        digest.update(source.encode() if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def load(self, key: str) -> Optional[List[Statement]]:
+        path = self.path(key)
+
+        try:
+            with open(path, "rb") as file:
+                if not self.trusted(os.fstat(file.fileno())):
+                    return None
+                statements = pickle.load(file).statements()
+        except OSError:
+            # missing, or not readable by this user
+            return None
+        except Exception:
+            # a damaged entry is dropped and rebuilt like any other miss;
+            #     in a shared directory it may be another user's to drop
+            self.remove(path)
+            return None
+
+        try:
+            # eviction goes by modification time, so a hit counts as a use.
+            #     only the owner of an entry may set it, so hits on other
+            #     users' entries do not count
+            os.utime(path)
+        except OSError:
+            pass
+
+        return statements
+
+    @staticmethod
+    def trusted(status: os.stat_result) -> bool:
+        # unpickling an entry runs whatever its writer put in it, so only
+        #     entries of this user or of root that no one else may write are
+        #     loaded; anyone else's are misses, as if they were not there
+        if not hasattr(os, "getuid"):
+            return True
+        return status.st_uid in (os.getuid(), 0) and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def store(self, key: str, statements: List[Statement]) -> None:
+        # a program that cannot be stored, e.g. in a directory this user
+        #     may not write, or over another user's entry in a sticky one,
+        #     is run all the same
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = temporary_file(self.directory)
+        except OSError:
+            return None
+
+        # written to a temporary file of its own and renamed into place, so
+        #     readers and concurrent writers only ever see whole entries;
+        #     writers racing on one key write the same bytes
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(FlatAst.flatten(statements), file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path(key))
+        except BaseException as error:
+            Path(temporary).unlink(missing_ok=True)
+            if not isinstance(error, OSError):
+                raise
+            return None
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+
+        for path in self.directory.iterdir():
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                # removed by another process in the meantime
+                continue
+
+            if path.suffix == self.suffix:
+                entries.append((status.st_mtime, status.st_size, path))
+            elif path.suffix == ".tmp" and status.st_mtime < time() - self.stale:
+                self.remove(path)
+
+        # least recently used entries go first; other users' entries in a
+        #     sticky directory stay, and are left for them to evict
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            if self.remove(path):
+                total -= size
+
+    @staticmethod
+    def remove(path: Path) -> bool:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            return False
+        return True
+
+
+class CheckCache:
+    # the keys of sources --check found nothing wrong with, one per line in a
+    #     single file, so checking a script that has not changed since it was
+    #     last clean takes reading and hashing it only. a file rather than an
+    #     entry per script, as a check goes through tens of thousands of them
+    name = "clean"
+    variant = "check"
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.path = directory / self.name
+
+        try:
+            self.keys = set(self.path.read_text().split())
+        except FileNotFoundError:
+            self.keys = set()
+        # keys this check found clean or was asked about and had
+        self.used: Set[str] = set()
+        self.added: List[str] = []
+
+    @classmethod
+    def key(cls, source: Union[str, Buffer]) -> str:
+        return ProgramCache.key(source, cls.variant)
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.keys:
+            self.used.add(key)
+            return True
+        return False
+
+    def add(self, key: str) -> None:
+        if key not in self.keys:
+            self.keys.add(key)
+            self.added.append(key)
+        self.used.add(key)
+
+    def save(self) -> None:
+        if not self.added:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # appends are cheap and, being whole lines in one write, safe with
+        #     other checks appending at the same time. past max_bytes the
+        #     file is written again with only the keys this check used
+        lines = "".join(f"{key}\n" for key in self.added)
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+
+        if size + len(lines) <= self.max_bytes:
+            with open(self.path, "a") as file:
+                file.write(lines)
+        else:
+            descriptor, temporary = temporary_file(self.directory)
+            try:
+                with os.fdopen(descriptor, "w") as file:
+                    file.write("".join(f"{key}\n" for key in self.used))
+                os.replace(temporary, self.path)
+            except BaseException:
+                Path(temporary).unlink(missing_ok=True)
+                raise
+
+        self.added = []
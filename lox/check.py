@@ -0,0 +1,129 @@
+import gc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from itertools import repeat
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Type
+from lox.cache import CheckCache
+from lox.errors import NestingError
+from lox.parser import Parser
+from lox.resolver import Resolver, ResolveError
+from lox.scanner import Scanner
+from lox.tokens import TokenType
+
+
+def diagnostic(phase: str, line: int, where: str, message: str) -> Dict[str, Any]:
+    # text is the message in the form the command line reports parse and
+    #     resolve errors in; scan errors, which a run prints bare, get it
+    #     too, for their line
+    return {
+        "phase": phase,
+        "line": line,
+        "message": message,
+        "text": f"[line {line}] Error{where}: {message}",
+    }
+
+
+def check_source(source: str, scanner: Type[Scanner] = Scanner) -> List[Dict[str, Any]]:
+    # scans, parses and resolves without running anything, and returns
+    #     every error found on the way rather than the first
+    source_scanner = scanner(source, StringIO())
+    tokens = source_scanner.scan_tokens()
+    diagnostics = [diagnostic("scan", line, "", message) for line, message in source_scanner.errors]
+
+    parser = Parser(tokens)
+    try:
+        statements, errors = parser.parse_all()
+    except NestingError as error:
+        # nothing past statements nested too deeply is parsed or resolved
+        statements, errors = [], parser.errors
+        diagnostics.append(diagnostic("parse", error.line, "", error.message))
+    for error in errors:
+        where = " at end" if error.token.type == TokenType.EOF else f" at '{error.token.lexeme}'"
+        diagnostics.append(diagnostic("parse", error.token.line, where, error.message))
+
+    # what is left of the tree around parse errors is resolved too; leaving
+    #     statements out never makes a resolve error of its own
+    resolve_errors: List[ResolveError] = []
+    Resolver(resolve_errors).resolve(statements)
+    for error in resolve_errors:
+        diagnostics.append(diagnostic("resolve", error.token.line, f" at '{error.token.lexeme}'", error.message))
+
+    # in the order they are in the script, as one pass would find them
+    diagnostics.sort(key=lambda found: found["line"])
+    return diagnostics
+
+
+def check_script(path: str, scanner: Type[Scanner]) -> Dict[str, Any]:
+    # keyed on the bytes as they are on disk, which is what the cache is
+    #     asked about
+    data = Path(path).read_bytes()
+    try:
+        diagnostics = check_source(data.decode(), scanner)
+    except UnicodeDecodeError as error:
+        # a script that is not text is one error of its own, on the line
+        #     of the first byte that is not, rather than the end of the run
+        line = data.count(b"\n", 0, error.start) + 1
+        diagnostics = [diagnostic("scan", line, "", "Script is not valid UTF-8.")]
+
+    return {
+        "script": path,
+        "key": CheckCache.key(data),
+        "diagnostics": diagnostics,
+    }
+
+
+def check_scripts(paths: List[str], scanner: Type[Scanner] = Scanner, jobs: int = 1,
+                  cache: Optional[CheckCache] = None) -> Dict[str, Any]:
+    start = perf_counter()
+
+    # scripts whose source is the same as when they were last found clean
+    #     are not checked again
+    cached = set()
+    if cache is not None:
+        for path in paths:
+            if CheckCache.key(Path(path).read_bytes()) in cache:
+                cached.add(path)
+    unchecked = [path for path in paths if path not in cached]
+
+    if jobs > 1 and len(unchecked) > 1:
+        # forked as --batch forks its workers
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork") if "fork" in methods else None
+        gc.freeze()
+
+        with ProcessPoolExecutor(jobs, mp_context=context) as executor:
+            chunksize = max(1, len(unchecked) // (jobs * 8))
+            checked = list(executor.map(check_script, unchecked, repeat(scanner), chunksize=chunksize))
+    else:
+        checked = [check_script(path, scanner) for path in unchecked]
+
+    if cache is not None:
+        for result in checked:
+            if not result["diagnostics"]:
+                cache.add(result["key"])
+        cache.save()
+
+    diagnostics = {result["script"]: result["diagnostics"] for result in checked}
+    report = [{"script": path, "cached": path in cached, "diagnostics": diagnostics.get(path, [])}
+              for path in paths]
+
+    return {
+        "wall_time": perf_counter() - start,
+        "scripts": len(paths),
+        "cached": len(cached),
+        "failed": sum(1 for result in report if result["diagnostics"]),
+        "diagnostics": sum(len(result["diagnostics"]) for result in report),
+        "results": report,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    # one line per diagnostic, after the script it is in, then a summary
+    lines = [f"{result['script']}: {found['text']}"
+             for result in report["results"] for found in result["diagnostics"]]
+    lines.append(f"{report['scripts']} scripts checked, {report['cached']} unchanged since they were clean, "
+                 f"{report['failed']} with errors, {report['diagnostics']} errors in all")
+    return "\n".join(lines) + "\n"
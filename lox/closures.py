@@ -0,0 +1,446 @@
+import gc
+import sys
+from threading import Lock
+from typing import Any, Callable, List, Optional, TextIO
+from lox.tokens import TokenType
+from lox.expression import Expression as ExprExpression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set, Assign, Variable
+from lox.statement import Expression as StmtExpression, Statement, StatementVisitor, Block, If, Print, Var, While
+from lox.errors import LoxRuntimeError
+from lox.environment import Environment, Globals
+from lox.interpreter import Interpreter
+from lox.rope import Rope, concat
+from lox import array as arrays
+from lox.natives import NativeError, function_of
+from lox.instances import Site
+
+
+class Run(Environment):
+    # the environment top level code runs in, one for every run of a
+    #     compiled program: closures are compiled once, so whatever belongs
+    #     to a run is found through it rather than kept in them
+    def __init__(self, globals: Globals, stdout: Optional[TextIO], sites: int) -> None:
+        super().__init__(None, 0)
+        self.run = self
+        self.globals = globals.values
+        # where print writes, sys.stdout when None
+        self.write = (stdout if stdout is not None else sys.stdout).write
+        # what each fixed call site calls in this run, once looked up
+        self.functions: List[Optional[Callable]] = [None] * sites
+
+
+class Scope(Environment):
+    # the environment of a block, with the run it belongs to and its globals
+    #     at hand
+    def __init__(self, enclosing: Environment, size: int) -> None:
+        self.enclosing = enclosing
+        self.values = [None] * size
+        self.run = enclosing.run
+        self.globals = enclosing.globals
+
+
+# every compiled node takes the innermost environment, the Run at top level
+Thunk = Callable[[Environment], Any]
+
+# compiles running at once on other threads, and whether the collector was
+#     enabled before the first of them started
+collection = {"compiles": 0, "enabled": False}
+collection_lock = Lock()
+
+
+class ClosureCompiler(ExpressionVisitor, StatementVisitor):
+    def __init__(self) -> None:
+        # fixed call sites numbered so far, each has a slot in Run.functions
+        self.sites = 0
+
+    def compile(self, statements: List[Statement]) -> Callable[[Globals, TextIO], Globals]:
+        # the program takes the globals to run with, new ones when None, and
+        #     where print writes, sys.stdout when None; it returns the globals
+        # every closure is a gc tracked object, left enabled the collector
+        #     keeps rescanning the whole half-built tree while it grows
+        with collection_lock:
+            if collection["compiles"] == 0:
+                collection["enabled"] = gc.isenabled()
+                gc.disable()
+            collection["compiles"] += 1
+        try:
+            body = tuple(self.execute(statement) for statement in statements)
+        finally:
+            # only the last compile to finish turns it back on
+            with collection_lock:
+                collection["compiles"] -= 1
+                if collection["compiles"] == 0 and collection["enabled"]:
+                    gc.enable()
+
+        sites = self.sites
+
+        def program(globals: Globals = None, stdout: TextIO = None) -> Globals:
+            globals = globals if globals is not None else Globals()
+            run = Run(globals, stdout, sites)
+            for statement in body:
+                statement(run)
+            return globals
+
+        return program
+
+    def evaluate(self, expr: ExprExpression) -> Thunk:
+        return expr.accept(self)
+
+    def execute(self, stmt: Statement) -> Thunk:
+        return stmt.accept(self)
+
+    def visit_literal_expression(self, expr: Literal) -> Thunk:
+        value = expr.value
+        return lambda environment: value
+
+    def visit_grouping_expression(self, expr: Grouping) -> Thunk:
+        # groupings only exist for the parser, there is nothing to run
+        return self.evaluate(expr.expression)
+
+    def visit_unary_expression(self, expr: Unary) -> Thunk:
+        right = self.evaluate(expr.right)
+        operator = expr.operator
+
+        match operator.type:
+            case TokenType.MINUS:
+                def negate(environment):
+                    value = right(environment)
+                    if type(value) is float:
+                        return -value
+                    return arrays.negate(operator, value)
+                return negate
+            case TokenType.BANG:
+                def not_(environment):
+                    value = right(environment)
+                    return value is None or value is False
+                return not_
+
+        raise ValueError(f"Unknown unary operator '{operator.lexeme}'.")
+
+    def visit_binary_expression(self, expr: Binary) -> Thunk:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        operator = expr.operator
+
+        match operator.type:
+            case TokenType.PLUS:
+                def add(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a + b
+                    if (type(a) is str or type(a) is Rope) and (type(b) is str or type(b) is Rope):
+                        return concat(a, b)
+                    return arrays.binary(operator, a, b)
+                return add
+            case TokenType.MINUS:
+                def subtract(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a - b
+                    return arrays.binary(operator, a, b)
+                return subtract
+            case TokenType.SLASH:
+                def divide(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a / b
+                    return arrays.binary(operator, a, b)
+                return divide
+            case TokenType.STAR:
+                def multiply(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a * b
+                    return arrays.binary(operator, a, b)
+                return multiply
+            case TokenType.GREATER:
+                def greater(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a > b
+                    return arrays.binary(operator, a, b)
+                return greater
+            case TokenType.GREATER_EQUAL:
+                def greater_equal(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a >= b
+                    return arrays.binary(operator, a, b)
+                return greater_equal
+            case TokenType.LESS:
+                def less(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a < b
+                    return arrays.binary(operator, a, b)
+                return less
+            case TokenType.LESS_EQUAL:
+                def less_equal(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a <= b
+                    return arrays.binary(operator, a, b)
+                return less_equal
+            case TokenType.BANG_EQUAL:
+                return lambda environment: left(environment) != right(environment)
+            case TokenType.EQUAL_EQUAL:
+                return lambda environment: left(environment) == right(environment)
+
+        raise ValueError(f"Unknown binary operator '{operator.lexeme}'.")
+
+    def visit_call_expression(self, expr: Call) -> Thunk:
+        if type(expr.callee) is Get:
+            return self.invoke(expr, expr.callee)
+
+        arguments = tuple(self.evaluate(argument) for argument in expr.arguments)
+        paren = expr.paren
+        count = len(arguments)
+
+        if not expr.fixed:
+            callee = self.evaluate(expr.callee)
+
+            def call(environment):
+                function = function_of(paren, callee(environment), count)
+                values = [argument(environment) for argument in arguments]
+                try:
+                    return function(*values)
+                except NativeError as error:
+                    raise LoxRuntimeError(paren, str(error))
+            return call
+
+        # a fixed call site looks up what it calls once a run, and keeps it
+        #     in its slot of the run
+        site = self.sites
+        self.sites += 1
+        name = expr.callee.name
+        lexeme = name.lexeme
+
+        def bind(run):
+            values = run.globals
+            if lexeme not in values:
+                raise LoxRuntimeError(name, f"Undefined variable '{lexeme}'.")
+            function = run.functions[site] = function_of(paren, values[lexeme], count)
+            return function
+
+        if count == 0:
+            def call_none(environment):
+                run = environment.run
+                callable_ = run.functions[site] or bind(run)
+                try:
+                    return callable_()
+                except NativeError as error:
+                    raise LoxRuntimeError(paren, str(error))
+            return call_none
+        elif count == 1:
+            argument = arguments[0]
+
+            def call_one(environment):
+                run = environment.run
+                callable_ = run.functions[site] or bind(run)
+                value = argument(environment)
+                try:
+                    return callable_(value)
+                except NativeError as error:
+                    raise LoxRuntimeError(paren, str(error))
+            return call_one
+
+        def call_many(environment):
+            run = environment.run
+            callable_ = run.functions[site] or bind(run)
+            values = [argument(environment) for argument in arguments]
+            try:
+                return callable_(*values)
+            except NativeError as error:
+                raise LoxRuntimeError(paren, str(error))
+        return call_many
+
+    def invoke(self, expr: Call, callee: Get) -> Thunk:
+        instance = self.evaluate(callee.object)
+        arguments = tuple(self.evaluate(argument) for argument in expr.arguments)
+        paren = expr.paren
+        method = Site(callee.name, paren, len(arguments)).method
+
+        if len(arguments) == 0:
+            def invoke_none(environment):
+                receiver = instance(environment)
+                function = method(receiver)
+                try:
+                    return function(receiver)
+                except NativeError as error:
+                    raise LoxRuntimeError(paren, str(error))
+            return invoke_none
+        elif len(arguments) == 1:
+            argument = arguments[0]
+
+            def invoke_one(environment):
+                receiver = instance(environment)
+                function = method(receiver)
+                value = argument(environment)
+                try:
+                    return function(receiver, value)
+                except NativeError as error:
+                    raise LoxRuntimeError(paren, str(error))
+            return invoke_one
+
+        def invoke_many(environment):
+            receiver = instance(environment)
+            function = method(receiver)
+            values = [argument(environment) for argument in arguments]
+            try:
+                return function(receiver, *values)
+            except NativeError as error:
+                raise LoxRuntimeError(paren, str(error))
+        return invoke_many
+
+    def visit_get_expression(self, expr: Get) -> Thunk:
+        instance = self.evaluate(expr.object)
+        get = Site(expr.name).get
+        return lambda environment: get(instance(environment))
+
+    def visit_set_expression(self, expr: Set) -> Thunk:
+        instance = self.evaluate(expr.object)
+        value = self.evaluate(expr.value)
+        set_ = Site(expr.name).set
+
+        def set_property(environment):
+            receiver = instance(environment)
+            return set_(receiver, value(environment))
+        return set_property
+
+    def visit_assign_expression(self, expr: Assign) -> Thunk:
+        value = self.evaluate(expr.value)
+        name = expr.name
+        slot = expr.slot
+
+        if expr.depth is None:
+            lexeme = name.lexeme
+
+            def assign_global(environment):
+                result = value(environment)
+                values = environment.globals
+                if lexeme not in values:
+                    raise LoxRuntimeError(name, f"Undefined variable '{lexeme}'.")
+                values[lexeme] = result
+                return result
+            return assign_global
+        elif expr.depth == 0:
+            def assign_local(environment):
+                result = environment.values[slot] = value(environment)
+                return result
+            return assign_local
+
+        depth = expr.depth
+
+        def assign_enclosing(environment):
+            result = environment.ancestor(depth).values[slot] = value(environment)
+            return result
+        return assign_enclosing
+
+    def visit_variable_expression(self, expr: Variable) -> Thunk:
+        name = expr.name
+        slot = expr.slot
+
+        if expr.depth is None:
+            lexeme = name.lexeme
+
+            def get_global(environment):
+                try:
+                    return environment.globals[lexeme]
+                except KeyError:
+                    raise LoxRuntimeError(name, f"Undefined variable '{lexeme}'.")
+            return get_global
+        elif expr.depth == 0:
+            return lambda environment: environment.values[slot]
+        elif expr.depth == 1:
+            return lambda environment: environment.enclosing.values[slot]
+
+        depth = expr.depth
+        return lambda environment: environment.ancestor(depth).values[slot]
+
+    def visit_expression_statement(self, statement: StmtExpression) -> Thunk:
+        return self.evaluate(statement.expression)
+
+    def visit_if_statement(self, statement: If) -> Thunk:
+        condition = self.evaluate(statement.condition)
+        then_branch = self.execute(statement.then_branch)
+
+        if statement.else_branch is None:
+            def if_(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    then_branch(environment)
+            return if_
+
+        else_branch = self.execute(statement.else_branch)
+
+        def if_else(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                then_branch(environment)
+            else:
+                else_branch(environment)
+        return if_else
+
+    def visit_print_statement(self, statement: Print) -> Thunk:
+        expression = self.evaluate(statement.expression)
+        stringify = Interpreter.stringify
+
+        def print_(environment):
+            value = stringify(expression(environment))
+            environment.run.write(value + "\n")
+        return print_
+
+    def visit_block_statement(self, statement: Block) -> Thunk:
+        body = tuple(self.execute(inner) for inner in statement.statements)
+        slots = statement.slots
+
+        if slots == 0:
+            def block(environment):
+                for inner in body:
+                    inner(environment)
+            return block
+
+        def scoped_block(environment):
+            inner_environment = Scope(environment, slots)
+            for inner in body:
+                inner(inner_environment)
+        return scoped_block
+
+    def visit_var_statement(self, statement: Var) -> Thunk:
+        slot = statement.slot
+
+        if statement.initializer is None:
+            initializer = lambda environment: None
+        else:
+            initializer = self.evaluate(statement.initializer)
+
+        if slot is None:
+            lexeme = statement.name.lexeme
+
+            def define_global(environment):
+                value = initializer(environment)
+                environment.globals[lexeme] = value
+            return define_global
+
+        def define_local(environment):
+            environment.values[slot] = initializer(environment)
+        return define_local
+
+    def visit_while_statement(self, statement: While) -> Thunk:
+        condition = self.evaluate(statement.condition)
+        body = self.execute(statement.body)
+
+        def while_(environment):
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return None
+                body(environment)
+        return while_
@@ -0,0 +1,334 @@
+from enum import IntEnum, unique
+from typing import List, Any, Dict, Tuple
+from lox.tokens import Token, TokenType
+from lox.instances import Site
+from lox.expression import Expression as ExprExpression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set, Assign, Variable
+from lox.statement import Expression as StmtExpression, Statement, StatementVisitor, Block, If, Print, Var, While
+
+
+@unique
+class OpCode(IntEnum):
+    CONSTANT = 1
+    NIL = 2
+    TRUE = 3
+    FALSE = 4
+    POP = 5
+
+    ADD = 6
+    SUBTRACT = 7
+    MULTIPLY = 8
+    DIVIDE = 9
+    GREATER = 10
+    GREATER_EQUAL = 11
+    LESS = 12
+    LESS_EQUAL = 13
+    EQUAL = 14
+    NOT_EQUAL = 15
+
+    NEGATE = 16
+    NOT = 17
+
+    PRINT = 18
+
+    DEFINE_GLOBAL = 19
+    GET_GLOBAL = 20
+    SET_GLOBAL = 21
+    DEFINE_LOCAL = 22
+    GET_LOCAL = 23
+    SET_LOCAL = 24
+    PUSH_SCOPE = 25
+    POP_SCOPE = 26
+
+    JUMP = 27
+    JUMP_IF_FALSE = 28
+
+    CALLABLE = 29
+    NATIVE = 30
+    CALL = 31
+
+    GET_PROPERTY = 32
+    SET_PROPERTY = 33
+    INVOKE = 34
+
+
+# number of inline operands following each opcode, zero when absent
+operand_counts = {
+    OpCode.CONSTANT: 1,
+    OpCode.DEFINE_GLOBAL: 1,
+    OpCode.GET_GLOBAL: 1,
+    OpCode.SET_GLOBAL: 1,
+    OpCode.DEFINE_LOCAL: 1,
+    OpCode.GET_LOCAL: 2,
+    OpCode.SET_LOCAL: 2,
+    OpCode.PUSH_SCOPE: 1,
+    OpCode.JUMP: 1,
+    OpCode.JUMP_IF_FALSE: 1,
+    OpCode.CALLABLE: 1,
+    OpCode.NATIVE: 3,
+    OpCode.CALL: 1,
+    OpCode.GET_PROPERTY: 1,
+    OpCode.SET_PROPERTY: 1,
+    OpCode.INVOKE: 1,
+}
+
+
+binary_opcodes = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+unary_opcodes = {
+    TokenType.MINUS: OpCode.NEGATE,
+    TokenType.BANG: OpCode.NOT,
+}
+
+
+class Chunk:
+    def __init__(self) -> None:
+        # opcodes and their inline operands, stored as plain ints
+        self.code: List[int] = []
+        self.constants: List[Any] = []
+        # token that produced each code slot, used for runtime error lines
+        self.tokens: List[Token] = []
+        # fixed call sites, each caching what it calls for a run
+        self.sites = 0
+        # the inline cache of each property access, kept from run to run
+        self.properties: List[Site] = []
+
+        self._constant_indexes: Dict[Tuple[type, Any], int] = {}
+
+    def write(self, byte: int, token: Token = None) -> None:
+        self.code.append(int(byte))
+        self.tokens.append(token)
+
+    def add_constant(self, value: Any) -> int:
+        # keyed on type too, otherwise 1.0 and true would share a slot
+        key = (type(value), value)
+        index = self._constant_indexes.get(key)
+
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self._constant_indexes[key] = index
+
+        return index
+
+    def disassemble(self) -> str:
+        lines = []
+        offset = 0
+
+        while offset < len(self.code):
+            op = OpCode(self.code[offset])
+            token = self.tokens[offset]
+            line = token.line if token is not None else '|'
+
+            count = operand_counts.get(op, 0)
+            operands = self.code[offset + 1: offset + 1 + count]
+
+            if op in (OpCode.CONSTANT, OpCode.DEFINE_GLOBAL, OpCode.GET_GLOBAL, OpCode.SET_GLOBAL):
+                index = operands[0]
+                lines.append(
+                    f"{offset:04d} {line:>4} {op.name:<16} {index} '{self.constants[index]}'")
+            elif op == OpCode.NATIVE:
+                index, count, site = operands
+                lines.append(
+                    f"{offset:04d} {line:>4} {op.name:<16} {index} '{self.constants[index]}' {count} {site}")
+            elif op in (OpCode.GET_PROPERTY, OpCode.SET_PROPERTY, OpCode.INVOKE):
+                site = operands[0]
+                lines.append(
+                    f"{offset:04d} {line:>4} {op.name:<16} {site} '{self.properties[site].name.lexeme}'")
+            else:
+                lines.append(
+                    f"{offset:04d} {line:>4} {op.name:<16} {' '.join(map(str, operands))}".rstrip())
+
+            offset += 1 + count
+
+        return '\n'.join(lines)
+
+
+class Compiler(ExpressionVisitor, StatementVisitor):
+    def __init__(self) -> None:
+        self.chunk = Chunk()
+
+    def compile(self, statements: List[Statement]) -> Chunk:
+        self.chunk = Chunk()
+
+        for statement in statements:
+            self.execute(statement)
+
+        return self.chunk
+
+    def evaluate(self, expr: ExprExpression) -> None:
+        expr.accept(self)
+
+    def execute(self, stmt: Statement) -> None:
+        stmt.accept(self)
+
+    def emit(self, op: OpCode, token: Token = None) -> None:
+        self.chunk.write(op, token)
+
+    def emit_jump(self, op: OpCode) -> int:
+        self.emit(op)
+        self.chunk.write(0)
+        return len(self.chunk.code) - 1
+
+    def patch_jump(self, operand: int) -> None:
+        # jump targets are absolute offsets into the code list
+        self.chunk.code[operand] = len(self.chunk.code)
+
+    def visit_literal_expression(self, expr: Literal) -> None:
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT)
+            self.chunk.write(self.chunk.add_constant(expr.value))
+
+    def visit_grouping_expression(self, expr: Grouping) -> None:
+        self.evaluate(expr.expression)
+
+    def visit_unary_expression(self, expr: Unary) -> None:
+        self.evaluate(expr.right)
+        self.emit(unary_opcodes[expr.operator.type], expr.operator)
+
+    def visit_binary_expression(self, expr: Binary) -> None:
+        self.evaluate(expr.left)
+        self.evaluate(expr.right)
+        self.emit(binary_opcodes[expr.operator.type], expr.operator)
+
+    def add_property(self, site: Site) -> int:
+        self.chunk.properties.append(site)
+        return len(self.chunk.properties) - 1
+
+    def visit_call_expression(self, expr: Call) -> None:
+        if type(expr.callee) is Get:
+            # INVOKE puts the method under the instance, which then goes to
+            #     the call as its first argument
+            self.evaluate(expr.callee.object)
+            self.emit(OpCode.INVOKE, expr.callee.name)
+            self.chunk.write(self.add_property(Site(expr.callee.name, expr.paren, len(expr.arguments))))
+
+            for argument in expr.arguments:
+                self.evaluate(argument)
+
+            self.emit(OpCode.CALL, expr.paren)
+            self.chunk.write(len(expr.arguments) + 1)
+            return None
+
+        # NATIVE looks a fixed callee up and checks it on the first call of
+        #     a run only, CALLABLE checks any other callee every time
+        if expr.fixed:
+            self.emit(OpCode.NATIVE, expr.paren)
+            self.chunk.write(self.chunk.add_constant(expr.callee.name.lexeme), expr.callee.name)
+            self.chunk.write(len(expr.arguments))
+            self.chunk.write(self.chunk.sites)
+            self.chunk.sites += 1
+        else:
+            self.evaluate(expr.callee)
+            self.emit(OpCode.CALLABLE, expr.paren)
+            self.chunk.write(len(expr.arguments))
+
+        for argument in expr.arguments:
+            self.evaluate(argument)
+
+        self.emit(OpCode.CALL, expr.paren)
+        self.chunk.write(len(expr.arguments))
+
+    def visit_get_expression(self, expr: Get) -> None:
+        self.evaluate(expr.object)
+        self.emit(OpCode.GET_PROPERTY, expr.name)
+        self.chunk.write(self.add_property(Site(expr.name)))
+
+    def visit_set_expression(self, expr: Set) -> None:
+        self.evaluate(expr.object)
+        self.evaluate(expr.value)
+        self.emit(OpCode.SET_PROPERTY, expr.name)
+        self.chunk.write(self.add_property(Site(expr.name)))
+
+    def visit_assign_expression(self, expr: Assign) -> None:
+        self.evaluate(expr.value)
+
+        if expr.depth is None:
+            self.emit(OpCode.SET_GLOBAL, expr.name)
+            self.chunk.write(self.chunk.add_constant(expr.name.lexeme))
+        else:
+            self.emit(OpCode.SET_LOCAL, expr.name)
+            self.chunk.write(expr.depth)
+            self.chunk.write(expr.slot)
+
+    def visit_variable_expression(self, expr: Variable) -> None:
+        if expr.depth is None:
+            self.emit(OpCode.GET_GLOBAL, expr.name)
+            self.chunk.write(self.chunk.add_constant(expr.name.lexeme))
+        else:
+            self.emit(OpCode.GET_LOCAL, expr.name)
+            self.chunk.write(expr.depth)
+            self.chunk.write(expr.slot)
+
+    def visit_expression_statement(self, statement: StmtExpression) -> None:
+        self.evaluate(statement.expression)
+        self.emit(OpCode.POP)
+
+    def visit_if_statement(self, statement: If) -> None:
+        self.evaluate(statement.condition)
+        else_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.execute(statement.then_branch)
+
+        if statement.else_branch is None:
+            self.patch_jump(else_jump)
+            return None
+
+        end_jump = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.execute(statement.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_print_statement(self, statement: Print) -> None:
+        self.evaluate(statement.expression)
+        self.emit(OpCode.PRINT)
+
+    def visit_block_statement(self, statement: Block) -> None:
+        if statement.slots:
+            self.emit(OpCode.PUSH_SCOPE)
+            self.chunk.write(statement.slots)
+
+        for inner in statement.statements:
+            self.execute(inner)
+
+        if statement.slots:
+            self.emit(OpCode.POP_SCOPE)
+
+    def visit_var_statement(self, statement: Var) -> None:
+        if statement.initializer is not None:
+            self.evaluate(statement.initializer)
+        else:
+            self.emit(OpCode.NIL)
+
+        if statement.slot is None:
+            self.emit(OpCode.DEFINE_GLOBAL, statement.name)
+            self.chunk.write(self.chunk.add_constant(statement.name.lexeme))
+        else:
+            self.emit(OpCode.DEFINE_LOCAL, statement.name)
+            self.chunk.write(statement.slot)
+
+    def visit_while_statement(self, statement: While) -> None:
+        start = len(self.chunk.code)
+
+        self.evaluate(statement.condition)
+        exit_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.execute(statement.body)
+
+        self.emit(OpCode.JUMP)
+        self.chunk.write(start)
+        self.patch_jump(exit_jump)
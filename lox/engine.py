@@ -0,0 +1,171 @@
+from io import StringIO
+from types import CodeType
+from typing import Callable, Iterable, List, Optional, TextIO, Tuple, Type, Union
+from lox.scanner import Scanner, BytesScanner
+from lox.tokens import Buffer, TokenType
+from lox.parser import Parser, ParseError
+from lox.resolver import Resolver, ResolveError, first_deep
+from lox.optimizer import Optimizer
+from lox.cache import ProgramCache
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.asynchronous import AsyncInterpreter, AsyncWriter
+from lox.compiler import Chunk, Compiler
+from lox.vm import VM
+from lox.closures import ClosureCompiler
+from lox.transpiler import Transpiler, run as run_python
+from lox.statement import Statement
+from lox.errors import CompileError, NestingError
+
+
+engines = ("interpreter", "vm", "closure", "python")
+
+# what compiling for an engine raises when a program nests too deeply for
+#     it: the vm, closure and python engines compile by recursing, python
+#     parses no more than 200 nested parentheses, and the python engine
+#     raises NestingError for more loops in loops or levels of indentation
+#     than python compiles
+too_deep = (RecursionError, SyntaxError, NestingError)
+
+
+def nesting_error(statements: List[Statement], engine: str, error: Exception) -> Optional[Tuple[int, str]]:
+    # the line and message to report when compiling statements for engine
+    #     raised error, one of too_deep, or None when nothing in them is
+    #     deep enough to have, and the error is one of the engine's own.
+    #     only the interpreter runs any expression the resolver takes
+    if isinstance(error, NestingError):
+        return error.line, error.message
+
+    statement = first_deep(statements)
+    if statement is None:
+        return None
+    return statement.line, f"Expression nested too deeply for the {engine} engine."
+
+
+class CompiledProgram:
+    # a program scanned, parsed, resolved, optimized and compiled for one
+    #     engine. any number of threads can run it at once, every run with
+    #     its own environments, globals, output and errors. what runs do
+    #     change is the inline caches of property accesses: the Sites the
+    #     interpreter puts on Get and Set nodes, those in Chunk.properties
+    #     and those the closures are compiled with. they only hold facts
+    #     about shapes, which are the same for every run, and are swapped in
+    #     whole, so runs racing on them never see a wrong entry
+    __slots__ = ('engine', 'statements', 'code')
+
+    def __init__(self, engine: str, statements: Tuple[Statement, ...],
+                 code: Union[Chunk, Callable, CodeType, None]) -> None:
+        object.__setattr__(self, 'engine', engine)
+        object.__setattr__(self, 'statements', statements)
+        # the chunk of the vm, the program of the closure engine or the code
+        #     object of the python engine
+        object.__setattr__(self, 'code', code)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("CompiledProgram is immutable.")
+
+    def run(self, globals: Globals = None, stdout: TextIO = None) -> Globals:
+        # raises LoxRuntimeError when the program fails; returns the globals
+        #     it ran with, new ones unless some were given
+        globals = globals if globals is not None else Globals()
+
+        match self.engine:
+            case "interpreter":
+                Interpreter(globals, stdout).interpret(self.statements)
+            case "vm":
+                VM(globals, stdout).interpret(self.code)
+            case "closure":
+                self.code(globals, stdout)
+            case "python":
+                run_python(self.code, globals, stdout)
+
+        return globals
+
+    async def run_async(self, globals: Globals = None, stdout: AsyncWriter = None,
+                        slice_nodes: int = 1000, slice_time: float = None) -> Globals:
+        # runs the statements on an AsyncInterpreter whatever the engine, so
+        #     the script gives the event loop a turn every slice
+        globals = globals if globals is not None else Globals()
+        await AsyncInterpreter(globals, stdout, slice_nodes, slice_time).interpret(self.statements)
+        return globals
+
+
+class LoxEngine:
+    # compiles programs without touching the state on Lox, so any number of
+    #     them can be compiled and run side by side
+    def __init__(self, engine: str = "interpreter", scanner: Type[Scanner] = Scanner,
+                 passes: Iterable[str] = None, cache: ProgramCache = None) -> None:
+        if engine not in engines:
+            raise ValueError(f"Unknown engine '{engine}'.")
+
+        self.engine = engine
+        self.scanner = scanner
+        # optimizer passes to run, None to run none
+        self.passes = list(passes) if passes is not None else None
+        if self.passes is not None:
+            Optimizer(self.passes)
+        self.cache = cache
+
+    def compile(self, source: Union[str, Buffer]) -> CompiledProgram:
+        # raises CompileError with every message the command line would
+        #     print before refusing to run the program
+        key = None
+        statements = None
+        if self.cache is not None:
+            key = self.cache.key(source, ",".join(self.passes) if self.passes is not None else "")
+            statements = self.cache.load(key)
+
+        if statements is None:
+            statements = self.front_end(source)
+            if key is not None:
+                self.cache.store(key, statements)
+
+        try:
+            match self.engine:
+                case "vm":
+                    code = Compiler().compile(statements)
+                case "python":
+                    code = Transpiler().compile(statements)
+                case "closure":
+                    code = ClosureCompiler().compile(statements)
+                case _:
+                    code = None
+        except too_deep as error:
+            found = nesting_error(statements, self.engine, error)
+            if found is None:
+                raise
+            line, message = found
+            raise CompileError([f"[line {line}] Error: {message}"])
+
+        return CompiledProgram(self.engine, tuple(statements), code)
+
+    def front_end(self, source: Union[str, Buffer]) -> List[Statement]:
+        output = StringIO()
+        if isinstance(source, str):
+            scanner = self.scanner(source, output)
+        else:
+            scanner = BytesScanner(source, output)
+        tokens = scanner.scan_tokens()
+
+        # unlike the command line, a program with scanner errors is not run
+        messages = output.getvalue().splitlines()
+        try:
+            statements = Parser(tokens).parse()
+        except ParseError as error:
+            where = " at end" if error.token.type == TokenType.EOF else f" at '{error.token.lexeme}'"
+            raise CompileError(messages + [f"[line {error.token.line}] Error{where}: {error.message}"])
+        except NestingError as error:
+            raise CompileError(messages + [f"[line {error.line}] Error: {error.message}"])
+
+        if messages:
+            raise CompileError(messages)
+
+        try:
+            Resolver().resolve(statements)
+        except ResolveError as error:
+            raise CompileError([f"[line {error.token.line}] Error at '{error.token.lexeme}': {error.message}"])
+
+        if self.passes is not None:
+            statements = Optimizer(self.passes).optimize(statements)
+
+        return statements
@@ -1,25 +1,46 @@
-from typing import Any
+from typing import Any, Dict, List
 from lox.tokens import Token
+from lox.errors import LoxRuntimeError
+from lox.natives import natives
 
-class Environment:
+
+class Globals:
     def __init__(self) -> None:
-        self._values = {}
+        # globals are the only late-bound names, so they are the only ones
+        #     still looked up by name; the natives are globals like any other
+        self.values: Dict[str, Any] = dict(natives)
+
+    def define(self, name: str, value: Any) -> None:
+        self.values[name] = value
 
-    @property
-    def values(self) -> None:
-        return self._values
+    def get(self, name: Token) -> Any:
+        try:
+            return self.values[name.lexeme]
+        except KeyError:
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-    @values.setter
-    def values(self, name: Token, value: Any) -> None:
-        self._values[name] = value
+    def assign(self, name: Token, value: Any) -> None:
+        if name.lexeme not in self.values:
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
 
-    @values.deleter
-    def values(self, name: Token) -> None:
-        del self._values[name]
+        self.values[name.lexeme] = value
 
-    @values.getter
-    def values(self, name: Token) -> Any:
-        try:
-            return self._values[name]
-        except RuntimeError:
-            raise RuntimeError(f"Undefined varible '{name.lexeme} '.")
+
+class Environment:
+    def __init__(self, enclosing: 'Environment', size: int) -> None:
+        self.enclosing = enclosing
+        # one slot per variable the resolver found in this scope
+        self.values: List[Any] = [None] * size
+
+    def ancestor(self, depth: int) -> 'Environment':
+        environment = self
+        for _ in range(depth):
+            environment = environment.enclosing
+
+        return environment
+
+    def get_at(self, depth: int, slot: int) -> Any:
+        return self.ancestor(depth).values[slot]
+
+    def assign_at(self, depth: int, slot: int, value: Any) -> None:
+        self.ancestor(depth).values[slot] = value
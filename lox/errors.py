@@ -1,2 +1,34 @@
+from typing import List
+from lox.tokens import Token
+
+
 class ErrorReporter(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class LoxRuntimeError(Exception):
+    def __init__(self, token: Token, message: str):
+        super().__init__(message)
+        self.token = token
+
+    def __str__(self) -> str:
+        return super().__str__()
+
+    def __repr__(self) -> str:
+        return super().__repr__()
+
+
+class CompileError(Exception):
+    def __init__(self, messages: List[str]):
+        super().__init__("\n".join(messages))
+        # one per error, formatted as the command line prints them
+        self.messages = messages
+
+
+class NestingError(Exception):
+    # a program nested more deeply than an engine compiles, with the line
+    #     to report it at
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+        self.message = message
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from lox.tokens import Token
-from typing import Any
+from typing import Any, List
 
 
 __all__ = [
@@ -8,8 +8,11 @@ __all__ = [
     "Expression",
     "Assign"
     "Binary"
+    "Call"
+    "Get"
     "Grouping"
     "Literal"
+    "Set"
     "Unary"
     "Variable"
 ]
@@ -23,6 +26,14 @@ class ExpressionVisitor(ABC):
     def visit_binary_expression(self, expression: 'Expression'):
         pass
 
+    @abstractmethod
+    def visit_call_expression(self, expression: 'Expression'):
+        pass
+
+    @abstractmethod
+    def visit_get_expression(self, expression: 'Expression'):
+        pass
+
     @abstractmethod
     def visit_grouping_expression(self, expression: 'Expression'):
         pass
@@ -31,6 +42,10 @@ class ExpressionVisitor(ABC):
     def visit_literal_expression(self, expression: 'Expression'):
         pass
 
+    @abstractmethod
+    def visit_set_expression(self, expression: 'Expression'):
+        pass
+
     @abstractmethod
     def visit_unary_expression(self, expression: 'Expression'):
         pass
@@ -41,21 +56,29 @@ class ExpressionVisitor(ABC):
 
 
 class Expression(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: ExpressionVisitor):
         pass
 
 
 class Assign(Expression):
-    def __init__(self, name: Token, value: Expression) -> None:
+    __slots__ = ('name', 'value', 'depth', 'slot')
+
+    def __init__(self, name: Token, value: Expression, depth: int = None, slot: int = None) -> None:
         self.name = name
         self.value = value
+        self.depth = depth
+        self.slot = slot
 
     def accept(self, visitor: ExpressionVisitor) -> ExpressionVisitor:
         return visitor.visit_assign_expression(self)
 
 
 class Binary(Expression):
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left: Expression, operator: Token, right: Expression) -> None:
         self.left = left
         self.operator = operator
@@ -65,7 +88,34 @@ class Binary(Expression):
         return visitor.visit_binary_expression(self)
 
 
+class Call(Expression):
+    __slots__ = ('callee', 'paren', 'arguments', 'fixed')
+
+    def __init__(self, callee: Expression, paren: Token, arguments: List[Expression], fixed: bool = False) -> None:
+        self.callee = callee
+        self.paren = paren
+        self.arguments = arguments
+        self.fixed = fixed
+
+    def accept(self, visitor: ExpressionVisitor) -> ExpressionVisitor:
+        return visitor.visit_call_expression(self)
+
+
+class Get(Expression):
+    __slots__ = ('object', 'name', 'site')
+
+    def __init__(self, object: Expression, name: Token, site: Any = None) -> None:
+        self.object = object
+        self.name = name
+        self.site = site
+
+    def accept(self, visitor: ExpressionVisitor) -> ExpressionVisitor:
+        return visitor.visit_get_expression(self)
+
+
 class Grouping(Expression):
+    __slots__ = ('expression',)
+
     def __init__(self, expression: Expression) -> None:
         self.expression = expression
 
@@ -74,6 +124,8 @@ class Grouping(Expression):
 
 
 class Literal(Expression):
+    __slots__ = ('value',)
+
     def __init__(self, value: Any) -> None:
         self.value = value
 
@@ -81,7 +133,22 @@ class Literal(Expression):
         return visitor.visit_literal_expression(self)
 
 
+class Set(Expression):
+    __slots__ = ('object', 'name', 'value', 'site')
+
+    def __init__(self, object: Expression, name: Token, value: Expression, site: Any = None) -> None:
+        self.object = object
+        self.name = name
+        self.value = value
+        self.site = site
+
+    def accept(self, visitor: ExpressionVisitor) -> ExpressionVisitor:
+        return visitor.visit_set_expression(self)
+
+
 class Unary(Expression):
+    __slots__ = ('operator', 'right')
+
     def __init__(self, operator: Token, right: Expression) -> None:
         self.operator = operator
         self.right = right
@@ -91,8 +158,12 @@ class Unary(Expression):
 
 
 class Variable(Expression):
-    def __init__(self, name: Token) -> None:
+    __slots__ = ('name', 'depth', 'slot')
+
+    def __init__(self, name: Token, depth: int = None, slot: int = None) -> None:
         self.name = name
+        self.depth = depth
+        self.slot = slot
 
     def accept(self, visitor: ExpressionVisitor) -> ExpressionVisitor:
         return visitor.visit_variable_expression(self)
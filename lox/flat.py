@@ -0,0 +1,143 @@
+from array import array
+from typing import Any, List, Tuple, Union
+from lox.expression import Expression as ExprExpression
+from lox.statement import Statement
+
+
+Node = Union[ExprExpression, Statement]
+
+# kind code -> node class; __subclasses__ keeps definition order, so the
+#     codes are stable for a given version of the generated modules
+node_types = [*ExprExpression.__subclasses__(), *Statement.__subclasses__()]
+kind_codes = {node_type: code for code, node_type in enumerate(node_types)}
+
+# every encoded field is (payload << 2) | tag
+NODE = 0
+CONSTANT = 1
+LIST = 2
+
+
+class FlatAst:
+    def __init__(self) -> None:
+        # one entry per node, in post-order so children precede parents
+        self.kinds = array('B')
+        self.starts = array('I')
+        # encoded fields of every node, in __slots__ order
+        self.fields = array('I')
+        # length-prefixed runs of node indices for list fields
+        self.lists = array('I')
+        # tokens, literal values, depths and slots
+        self.constants: List[Any] = []
+        # indices of the top level statements
+        self.roots = array('I')
+
+    @classmethod
+    def flatten(cls, statements: List[Statement]) -> 'FlatAst':
+        flat = cls()
+        for statement in statements:
+            flat.roots.append(flat.add(statement))
+
+        return flat
+
+    def add(self, node: Node) -> int:
+        # post-order with a stack of its own rather than by recursing, as
+        #     the resolver and the interpreter take expressions nested
+        #     deeper than python's recursion limit. a node comes off the
+        #     stack twice: first to put its children on, then, once their
+        #     indices are on indices, to be added itself
+        pending: List[Tuple[Node, bool]] = [(node, False)]
+        indices: List[int] = []
+
+        while pending:
+            node, ready = pending.pop()
+            values = [getattr(node, name) for name in type(node).__slots__]
+
+            if not ready:
+                pending.append((node, True))
+                for value in reversed(values):
+                    if isinstance(value, (ExprExpression, Statement)):
+                        pending.append((value, False))
+                    elif isinstance(value, list):
+                        pending.extend((child, False) for child in reversed(value))
+                continue
+
+            # the indices of its children are the last ones on indices
+            start = len(indices)
+            for value in values:
+                if isinstance(value, (ExprExpression, Statement)):
+                    start -= 1
+                elif isinstance(value, list):
+                    start -= len(value)
+            children = iter(indices[start:])
+            del indices[start:]
+            encoded = []
+
+            for value in values:
+                if isinstance(value, (ExprExpression, Statement)):
+                    encoded.append(next(children) << 2 | NODE)
+                elif isinstance(value, list):
+                    encoded.append(len(self.lists) << 2 | LIST)
+                    self.lists.append(len(value))
+                    self.lists.extend(next(children) for _ in value)
+                else:
+                    encoded.append(len(self.constants) << 2 | CONSTANT)
+                    self.constants.append(value)
+
+            indices.append(len(self.kinds))
+            self.kinds.append(kind_codes[type(node)])
+            self.starts.append(len(self.fields))
+            self.fields.extend(encoded)
+
+        return indices[0]
+
+    def node(self, index: int) -> Node:
+        node_type = node_types[self.kinds[index]]
+        start = self.starts[index]
+        arguments = []
+
+        for field in self.fields[start: start + len(node_type.__slots__)]:
+            tag = field & 3
+            payload = field >> 2
+
+            if tag == NODE:
+                arguments.append(self.node(payload))
+            elif tag == LIST:
+                count = self.lists[payload]
+                arguments.append([self.node(child)
+                                  for child in self.lists[payload + 1: payload + 1 + count]])
+            else:
+                arguments.append(self.constants[payload])
+
+        # the generated constructors take their fields in __slots__ order
+        return node_type(*arguments)
+
+    def statements(self) -> List[Statement]:
+        # children always come before their parents, so one pass in index
+        #     order rebuilds the whole tree without recursing
+        nodes: List[Node] = []
+        fields = self.fields
+        lists = self.lists
+        constants = self.constants
+
+        for kind, start in zip(self.kinds, self.starts):
+            node_type = node_types[kind]
+            arguments = []
+
+            for field in fields[start: start + len(node_type.__slots__)]:
+                tag = field & 3
+                payload = field >> 2
+
+                if tag == NODE:
+                    arguments.append(nodes[payload])
+                elif tag == LIST:
+                    count = lists[payload]
+                    arguments.append([nodes[child] for child in lists[payload + 1: payload + 1 + count]])
+                else:
+                    arguments.append(constants[payload])
+
+            nodes.append(node_type(*arguments))
+
+        return [nodes[root] for root in self.roots]
+
+    def __len__(self) -> int:
+        return len(self.kinds)
@@ -0,0 +1,292 @@
+from typing import Iterator, List, Optional, Tuple, Type
+from lox.scanner import Scanner
+from lox.tokens import Token, TokenType
+from lox.parser import ParseError, StreamingParser
+from lox.errors import NestingError
+from lox.expression import Expression as ExprExpression
+from lox.statement import Statement
+
+
+class Chunk:
+    # the text of one top level statement, from its first token up to the
+    #     first token of the next one, or of a run that failed to parse;
+    #     the first chunk also holds any text before its statement. before
+    #     the gap start and line count from the start of the script, after
+    #     it from the end
+    __slots__ = ('start', 'line', 'text', 'statement', 'error', 'parsed_line', 'scan_error')
+
+    def __init__(self, start: int, line: int, text: str, statement: Optional[Statement],
+                 error: Optional[ParseError], scan_error: bool) -> None:
+        self.start = start
+        self.line = line
+        self.text = text
+        self.statement = statement
+        self.error = error
+        # the line the tokens in statement or error were scanned at
+        self.parsed_line = line
+        self.scan_error = scan_error
+
+
+class WindowExhausted(Exception):
+    pass
+
+
+class Document:
+    # a script under edit that only scans and parses the statements around
+    #     each edit again, reusing the rest.
+    #
+    # the chunks of the script are kept in a gap buffer at the last edit:
+    #     as chunks after the gap count their position from the end of the
+    #     script, an edit there moves none of them, and a following edit
+    #     nearby only moves the few in between across the gap. the text is
+    #     kept in the chunks too, so no edit copies all of it
+    def __init__(self, source: str, scanner: Type[Scanner] = Scanner) -> None:
+        self.scanner = scanner
+        self.length = 0
+        self.newlines = 0
+        self.before: List[Chunk] = []
+        # nearest the gap last
+        self.after: List[Chunk] = []
+        # chunks that failed to parse, and ones the scanner printed errors for
+        self.errors = 0
+        self.scan_errors = 0
+        # start of the token the parser is looking at, and the line there
+        self.position = 0
+        self.line = 1
+
+        self.edit(0, 0, source)
+
+    @property
+    def source(self) -> str:
+        return "".join(chunk.text for chunk, _ in self.chunks())
+
+    @property
+    def had_error(self) -> bool:
+        return self.scan_errors > 0
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> List[Statement]:
+        # replaces deleted characters at offset by inserted, and returns the
+        #     statements that were parsed again
+        self.move_gap(offset)
+
+        # the chunk holding the edit goes, and so does the one before: its
+        #     last token may run into the edit and its parse looked at the
+        #     first token of the edited chunk, in case it was an else
+        removed = []
+        for _ in range(2):
+            if self.before:
+                removed.insert(0, self.before.pop())
+        # as do any the deleted text reaches into
+        while self.after and self.start_of(self.after[-1]) < offset + deleted:
+            chunk = self.after.pop()
+            chunk.start = self.start_of(chunk)
+            chunk.line = self.line_of(chunk)
+            removed.append(chunk)
+
+        for chunk in removed:
+            self.discard(chunk)
+        start, line = (removed[0].start, removed[0].line) if removed else (0, 1)
+        text = "".join(chunk.text for chunk in removed)
+
+        relative = offset - start
+        self.length += len(inserted) - deleted
+        self.newlines += inserted.count("\n") - text.count("\n", relative, relative + deleted)
+        text = text[:relative] + inserted + text[relative + deleted:]
+
+        # the text is parsed along with a few of the chunks after it, which
+        #     the new statements usually meet again within the first; when
+        #     the scan gets to the end of them first it starts over with more
+        window = 4
+        while True:
+            try:
+                chunks, consumed = self.parse_window(start, line, text, relative + len(inserted), window)
+                break
+            except WindowExhausted:
+                window *= 4
+
+        for _ in range(consumed):
+            self.discard(self.after.pop())
+        for chunk in chunks:
+            self.add(chunk)
+
+        return [chunk.statement for chunk in chunks if chunk.statement is not None]
+
+    def parse_window(self, start: int, line: int, text: str, end: int,
+                     window: int) -> Tuple[List[Chunk], int]:
+        # parses text followed by the text of window old chunks, until the
+        #     next statement would be an old chunk past end; returns the
+        #     new chunks and how many of the old ones they replace
+        following = self.after[-1: -window - 1: -1]
+        # where each old chunk starts in the text
+        starts = []
+        for chunk in following:
+            starts.append(len(text))
+            text += chunk.text
+
+        scanner = self.scanner(text)
+        scanner.line = line
+        parser = StreamingParser(self.tokens(scanner, len(following) == len(self.after)))
+        found = []
+        consumed = 0
+
+        while True:
+            # old chunks the new statements have run over
+            while consumed < len(starts) and starts[consumed] < self.position:
+                consumed += 1
+
+            if parser.is_at_end():
+                break
+            if self.position >= end and consumed < len(starts) and starts[consumed] == self.position:
+                break
+
+            position, position_line = self.position, self.line
+            try:
+                try:
+                    statement = parser.declaration()
+                except NestingError as error:
+                    # a chunk's error is a ParseError, at the token the
+                    #     parser stopped at
+                    raise ParseError(parser.peek(), error.message)
+            except ParseError as error:
+                # nothing past an error is parsed, but it is still scanned as
+                #     a full scan would, until the tokens meet an old chunk
+                while True:
+                    while consumed < len(starts) and starts[consumed] < self.position:
+                        consumed += 1
+
+                    if parser.is_at_end():
+                        break
+                    if (self.position > position and self.position >= end
+                            and consumed < len(starts) and starts[consumed] == self.position):
+                        break
+                    parser.advance()
+
+                found.append((position, position_line, None, error, scanner.had_error))
+                break
+
+            found.append((position, position_line, statement, None, scanner.had_error))
+            scanner.had_error = False
+
+        stop = starts[consumed] if consumed < len(starts) else len(text)
+        if not found and stop > 0:
+            # only space, comments or characters the scanner rejected
+            found.append((0, line, None, None, scanner.had_error))
+
+        chunks = []
+        for index, (position, position_line, statement, error, scan_error) in enumerate(found):
+            if index == 0:
+                position, position_line = 0, line
+            following_position = found[index + 1][0] if index + 1 < len(found) else stop
+            chunks.append(Chunk(start + position, position_line, text[position: following_position],
+                                statement, error, scan_error))
+
+        return chunks, consumed
+
+    def tokens(self, scanner: Scanner, complete: bool) -> Iterator[Token]:
+        # scans a token at a time, keeping track of where it starts
+        buffer = scanner.tokens
+        end = len(scanner.source)
+
+        while True:
+            scanner.scan(1)
+
+            # the last token of a window may go on past it
+            if scanner.current == end and not complete:
+                raise WindowExhausted
+
+            if not len(buffer):
+                self.position = scanner.current
+                self.line = scanner.line
+                yield Token(TokenType.EOF, "", None, scanner.line)
+                return
+
+            token = buffer.token(0)
+            self.position = buffer.starts[0]
+            # a string spanning lines has the line it ends on
+            self.line = token.line - token.lexeme.count("\n")
+            yield token
+            buffer.clear()
+
+    def parse(self) -> List[Statement]:
+        # the statements of the whole script, as Parser.parse would return
+        #     them, or the first error it would raise; statements nested too
+        #     deeply are a ParseError at the token the parser stopped at
+        #     rather than a NestingError
+        statements = []
+
+        for chunk, line in self.chunks():
+            self.relocate(chunk, line)
+            if chunk.error is not None:
+                raise chunk.error
+            if chunk.statement is not None:
+                statements.append(chunk.statement)
+
+        return statements
+
+    def chunks(self) -> Iterator[Tuple[Chunk, int]]:
+        for chunk in self.before:
+            yield chunk, chunk.line
+        for chunk in reversed(self.after):
+            yield chunk, self.line_of(chunk)
+
+    def move_gap(self, offset: int) -> None:
+        # leaves exactly the chunks starting at or before offset before the gap
+        while self.before and self.before[-1].start > offset:
+            chunk = self.before.pop()
+            chunk.start = self.length - chunk.start
+            chunk.line = self.newlines - chunk.line + 1
+            self.after.append(chunk)
+
+        while self.after and self.start_of(self.after[-1]) <= offset:
+            chunk = self.after.pop()
+            chunk.start = self.start_of(chunk)
+            chunk.line = self.line_of(chunk)
+            self.before.append(chunk)
+
+    def start_of(self, chunk: Chunk) -> int:
+        # of a chunk after the gap
+        return self.length - chunk.start
+
+    def line_of(self, chunk: Chunk) -> int:
+        # of a chunk after the gap
+        return self.newlines - chunk.line + 1
+
+    def add(self, chunk: Chunk) -> None:
+        self.before.append(chunk)
+        self.errors += chunk.error is not None
+        self.scan_errors += chunk.scan_error
+
+    def discard(self, chunk: Chunk) -> None:
+        self.errors -= chunk.error is not None
+        self.scan_errors -= chunk.scan_error
+
+    @staticmethod
+    def relocate(chunk: Chunk, line: int) -> None:
+        # tokens of chunks after an edit that added or removed lines still
+        #     carry their old lines, until they are asked for
+        delta = line - chunk.parsed_line
+        if delta == 0:
+            return None
+
+        seen = set()
+        pending: List = [chunk.statement if chunk.error is None else chunk.error.token]
+        while pending:
+            node = pending.pop()
+
+            if isinstance(node, Token):
+                # a token can be shared, as an assignment's is with the
+                #     variable it was parsed as
+                if id(node) not in seen:
+                    seen.add(id(node))
+                    node.line += delta
+            elif isinstance(node, list):
+                pending.extend(node)
+            elif isinstance(node, (ExprExpression, Statement)):
+                for name in type(node).__slots__:
+                    value = getattr(node, name)
+                    if name == "line" and isinstance(node, Statement):
+                        node.line = value + delta if value is not None else None
+                    else:
+                        pending.append(value)
+
+        chunk.parsed_line = line
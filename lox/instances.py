@@ -0,0 +1,229 @@
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from lox.tokens import Token
+from lox.errors import LoxRuntimeError
+from lox.natives import LoxCallable, Native, function_of
+
+
+# shapes a property site remembers before it stops caching; 0 turns the
+#     caches off, and every access looks its property up by name
+POLYMORPHIC = 4
+
+
+class Shape:
+    # the fields of an instance, name -> index in its values, shared by
+    #     every instance of a class that got the same fields in the same
+    #     order. shapes never change, adding a field moves an instance on
+    #     to the next shape, so what a site learnt about one stays true
+    __slots__ = ('klass', 'fields', 'transitions')
+
+    def __init__(self, klass: 'LoxClass', fields: Dict[str, int]) -> None:
+        self.klass = klass
+        self.fields = fields
+        # field name -> the shape after adding it
+        self.transitions: Dict[str, 'Shape'] = {}
+
+    def add(self, name: str) -> 'Shape':
+        shape = self.transitions.get(name)
+        if shape is None:
+            # racing threads agree on the one that got in first
+            shape = self.transitions.setdefault(name, Shape(self.klass, {**self.fields, name: len(self.fields)}))
+        return shape
+
+
+class LoxClass(LoxCallable):
+    # a class defined by the host; calling it makes an instance and passes
+    #     the arguments to its init method, if it has one
+    __slots__ = ('name', 'methods', 'shape')
+
+    def __init__(self, name: str, methods: Dict[str, Native] = None) -> None:
+        self.name = name
+        # name -> native taking the instance before its arity arguments;
+        #     not to be changed once instances exist
+        self.methods = methods if methods is not None else {}
+        # the shape of every new instance
+        self.shape = Shape(self, {})
+
+    @property
+    def arity(self) -> int:
+        initializer = self.methods.get("init")
+        return initializer.arity if initializer is not None else 0
+
+    @property
+    def function(self) -> Callable:
+        return self.instantiate
+
+    def instantiate(self, *arguments: Any) -> 'LoxInstance':
+        instance = LoxInstance(self.shape, [])
+        initializer = self.methods.get("init")
+        if initializer is not None:
+            initializer.function(instance, *arguments)
+        return instance
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class LoxInstance:
+    __slots__ = ('shape', 'values')
+
+    def __init__(self, shape: Shape, values: List[Any]) -> None:
+        self.shape = shape
+        # field values, in the order of shape.fields
+        self.values = values
+
+    def get(self, name: str) -> Any:
+        # for natives; raises KeyError for a field the instance lacks
+        return self.values[self.shape.fields[name]]
+
+    def set(self, name: str, value: Any) -> None:
+        index = self.shape.fields.get(name)
+        if index is None:
+            self.values.append(value)
+            self.shape = self.shape.add(name)
+        else:
+            self.values[index] = value
+
+    def __str__(self) -> str:
+        return f"{self.shape.klass.name} instance"
+
+
+class BoundMethod(LoxCallable):
+    # a method looked up without being called right away
+    __slots__ = ('receiver', 'method')
+
+    def __init__(self, receiver: LoxInstance, method: Native) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    @property
+    def arity(self) -> int:
+        return self.method.arity
+
+    @property
+    def function(self) -> Callable:
+        return partial(self.method.function, self.receiver)
+
+    def __str__(self) -> str:
+        return str(self.method)
+
+
+# what a site caches for a shape: the index of a field, or for a get site
+#     the method, for an invoke site its function and for a set site the
+#     shape after adding the field
+Entry = Union[int, Native, Callable, Shape]
+
+
+class Site:
+    # the inline cache of one property access, get, set or invoke: the
+    #     entry for the first shape seen, then for up to POLYMORPHIC shapes
+    #     in all. entries are facts about shapes, so a site can be shared
+    #     between runs and threads
+    __slots__ = ('name', 'paren', 'count', 'monomorphic', 'polymorphic')
+
+    def __init__(self, name: Token, paren: Token = None, count: int = 0) -> None:
+        self.name = name
+        # for invoke sites, the call's closing parenthesis and arguments
+        self.paren = paren
+        self.count = count
+        # (shape, entry), swapped in whole so racing threads never see the
+        #     entry of another shape
+        self.monomorphic: Tuple[Optional[Shape], Entry] = (None, 0)
+        self.polymorphic: Optional[Dict[Shape, Entry]] = None
+
+    def __reduce__(self) -> Tuple:
+        # pickled with a program, as an empty cache
+        return Site, (self.name, self.paren, self.count)
+
+    def cached(self, shape: Shape) -> Optional[Entry]:
+        monomorphic = self.monomorphic
+        if monomorphic[0] is shape:
+            return monomorphic[1]
+        if self.polymorphic is not None:
+            return self.polymorphic.get(shape)
+        return None
+
+    def remember(self, shape: Shape, entry: Entry) -> Entry:
+        if self.monomorphic[0] is None:
+            if POLYMORPHIC > 0:
+                self.monomorphic = (shape, entry)
+        elif self.polymorphic is None:
+            if POLYMORPHIC > 1:
+                self.polymorphic = {shape: entry}
+        elif len(self.polymorphic) < POLYMORPHIC - 1:
+            self.polymorphic[shape] = entry
+        # past that the site is megamorphic and looks everything else up
+        return entry
+
+    def lookup(self, shape: Shape) -> Union[int, Native]:
+        # fields shadow methods
+        index = shape.fields.get(self.name.lexeme)
+        if index is not None:
+            return index
+
+        method = shape.klass.methods.get(self.name.lexeme)
+        if method is None:
+            raise LoxRuntimeError(self.name, f"Undefined property '{self.name.lexeme}'.")
+        return method
+
+    def get(self, instance: Any) -> Any:
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(self.name, "Only instances have properties.")
+
+        shape = instance.shape
+        monomorphic = self.monomorphic
+        if monomorphic[0] is shape:
+            entry = monomorphic[1]
+        else:
+            entry = self.cached(shape)
+            if entry is None:
+                entry = self.remember(shape, self.lookup(shape))
+
+        if type(entry) is int:
+            return instance.values[entry]
+        return BoundMethod(instance, entry)
+
+    def set(self, instance: Any, value: Any) -> Any:
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(self.name, "Only instances have fields.")
+
+        shape = instance.shape
+        monomorphic = self.monomorphic
+        if monomorphic[0] is shape:
+            entry = monomorphic[1]
+        else:
+            entry = self.cached(shape)
+            if entry is None:
+                index = shape.fields.get(self.name.lexeme)
+                entry = self.remember(shape, index if index is not None else shape.add(self.name.lexeme))
+
+        if type(entry) is int:
+            instance.values[entry] = value
+        else:
+            instance.values.append(value)
+            instance.shape = entry
+        return value
+
+    def method(self, instance: Any) -> Callable:
+        # what an invoke site calls with the instance and then the
+        #     arguments, without making a bound method
+        if type(instance) is not LoxInstance:
+            raise LoxRuntimeError(self.name, "Only instances have properties.")
+
+        shape = instance.shape
+        monomorphic = self.monomorphic
+        if monomorphic[0] is shape:
+            entry = monomorphic[1]
+        else:
+            entry = self.cached(shape)
+            if entry is None:
+                entry = self.lookup(shape)
+                if type(entry) is not int:
+                    entry = function_of(self.paren, entry, self.count)
+                entry = self.remember(shape, entry)
+
+        if type(entry) is int:
+            # a field holding something callable, called without the instance
+            function = function_of(self.paren, instance.values[entry], self.count)
+            return lambda receiver, *arguments: function(*arguments)
+        return entry
@@ -1,28 +1,29 @@
-from typing import List, Any
+from typing import Any, Callable, Dict, List, TextIO, Tuple
 from lox.tokens import Token, TokenType
-from lox.expression import Expression as ExprExpression, Expression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Assign, Variable
-from lox.statement import Expression as StmtExpression, Expression, Statement, StatementVisitor
-
-
-class LoxRuntimeError(Exception):
-    def __init__(self, token: Token, message: str):
-        super().__init__(message)
-        self.token = token
-
-    def __str__(self) -> str:
-        return super().__str__()
-
-    def __repr__(self) -> str:
-        return super().__repr__()
+from lox.errors import LoxRuntimeError
+from lox.environment import Environment, Globals
+from lox.rope import Rope, concat
+from lox.array import LoxArray, binary, negate
+from lox.natives import NativeError, function_of
+from lox.instances import Site
+from lox.expression import Expression as ExprExpression, Expression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set, Assign, Variable
+from lox.statement import Expression as StmtExpression, Expression, Statement, StatementVisitor, Block, If, Var, While
 
 
 class Interpreter(ExpressionVisitor, StatementVisitor):
+    def __init__(self, globals: Globals = None, stdout: TextIO = None) -> None:
+        self.globals = globals if globals is not None else Globals()
+        # where print writes, sys.stdout when None
+        self.stdout = stdout
+        # innermost block environment, None while running top level code
+        self.environment: Environment = None
+        # fixed call site -> what it calls, for the current run
+        self.call_sites: Dict[Call, Callable] = {}
+
     def interpret(self, statements: List[Statement]):
-        try:
-            for statement in statements:
-                self.execute(statement)
-        except RuntimeError as error:
-            raise LoxRuntimeError(error)
+        self.call_sites = {}
+        for statement in statements:
+            self.execute(statement)
 
     def accept(self, visitor: ExpressionVisitor):
         return super().accept(visitor)
@@ -35,7 +36,9 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
 
         match expr.operator.type:
             case TokenType.MINUS:
-                return float(right) * -1
+                if type(right) is LoxArray:
+                    return negate(expr.operator, right)
+                return -self.floaty(expr.operator, right, 'Operand must be a number.')
             case TokenType.BANG:
                 return not self.truthy(right)
 
@@ -46,37 +49,50 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
         return self.evaluate(expr.expression)
 
     def visit_assign_expression(self, expr: Assign) -> Any:
-        return None
+        value = self.evaluate(expr.value)
+
+        if expr.depth is None:
+            self.globals.assign(expr.name, value)
+        else:
+            self.environment.assign_at(expr.depth, expr.slot, value)
+
+        return value
 
     def visit_variable_expression(self, expr: Variable) -> Any:
-        return None
+        if expr.depth is None:
+            return self.globals.get(expr.name)
+
+        return self.environment.get_at(expr.depth, expr.slot)
 
     def visit_binary_expression(self, expr: Binary) -> Any:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
+        if type(left) is LoxArray or type(right) is LoxArray:
+            return binary(expr.operator, left, right)
+
         match expr.operator.type:
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
-                    return self.floaty(left) + self.floaty(right)
-                elif isinstance(left, str) and isinstance(right, str):
-                    return self.is_string(left) + self.is_string(right)
+                    return self.floaty(expr.operator, left) + self.floaty(expr.operator, right)
+                elif isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+                    return concat(left, right)
                 raise LoxRuntimeError(
                     expr.operator, 'Cannot add a number and a string.')
             case TokenType.MINUS:
-                return self.floaty(left) - self.floaty(right)
+                return self.floaty(expr.operator, left) - self.floaty(expr.operator, right)
             case TokenType.SLASH:
-                return self.floaty(left) / self.floaty(right)
+                return self.floaty(expr.operator, left) / self.floaty(expr.operator, right)
             case TokenType.STAR:
-                return self.floaty(left) * self.floaty(right)
+                return self.floaty(expr.operator, left) * self.floaty(expr.operator, right)
             case TokenType.GREATER:
-                return self.floaty(left) > self.floaty(right)
+                return self.floaty(expr.operator, left) > self.floaty(expr.operator, right)
             case TokenType.GREATER_EQUAL:
-                return self.floaty(left) >= self.floaty(right)
+                return self.floaty(expr.operator, left) >= self.floaty(expr.operator, right)
             case TokenType.LESS:
-                return self.floaty(left) < self.floaty(right)
+                return self.floaty(expr.operator, left) < self.floaty(expr.operator, right)
             case TokenType.LESS_EQUAL:
-                return self.floaty(left) <= self.floaty(right)
+                return self.floaty(expr.operator, left) <= self.floaty(expr.operator, right)
             case TokenType.BANG_EQUAL:
                 return left != right
             case TokenType.EQUAL_EQUAL:
@@ -85,47 +101,242 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
         # Unreachable
         return None
 
+    def visit_call_expression(self, expr: Call) -> Any:
+        if type(expr.callee) is Get:
+            return self.invoke(expr, expr.callee)
+
+        # the callee is checked against the number of arguments before they
+        #     are evaluated, so a fixed call site can skip both next time
+        if expr.fixed:
+            function = self.call_sites.get(expr)
+            if function is None:
+                function = self.call_sites[expr] = function_of(
+                    expr.paren, self.globals.get(expr.callee.name), len(expr.arguments))
+        else:
+            function = function_of(expr.paren, self.evaluate(expr.callee), len(expr.arguments))
+
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        try:
+            return function(*arguments)
+        except NativeError as error:
+            raise LoxRuntimeError(expr.paren, str(error))
+
+    def invoke(self, expr: Call, callee: Get) -> Any:
+        # a method called right away gets the instance passed along, with no
+        #     bound method made for it
+        instance = self.evaluate(callee.object)
+        site = callee.site
+        if site is None:
+            site = callee.site = Site(callee.name, expr.paren, len(expr.arguments))
+        function = site.method(instance)
+
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        try:
+            return function(instance, *arguments)
+        except NativeError as error:
+            raise LoxRuntimeError(expr.paren, str(error))
+
+    def visit_get_expression(self, expr: Get) -> Any:
+        instance = self.evaluate(expr.object)
+        site = expr.site
+        if site is None:
+            site = expr.site = Site(expr.name)
+        return site.get(instance)
+
+    def visit_set_expression(self, expr: Set) -> Any:
+        instance = self.evaluate(expr.object)
+        value = self.evaluate(expr.value)
+        site = expr.site
+        if site is None:
+            site = expr.site = Site(expr.name)
+        return site.set(instance, value)
+
     def evaluate(self, expr: ExprExpression) -> Any:
         return expr.accept(self)
+
+    def evaluate_deep(self, expr: ExprExpression) -> Any:
+        # evaluate with a stack of its own in place of recursion, for the
+        #     expressions the resolver found too deep to recurse through.
+        #     pending holds nodes with how many of their stages have run,
+        #     values the results of the operands evaluated so far. once its
+        #     operands are known, an operator runs through its own visit
+        #     method on literals of them
+        values: List[Any] = []
+        pending: List[Tuple[ExprExpression, int]] = [(expr, 0)]
+
+        while pending:
+            expr, stage = pending.pop()
+
+            match expr:
+                case Literal():
+                    values.append(expr.value)
+                case Variable():
+                    values.append(self.visit_variable_expression(expr))
+                case Grouping():
+                    pending.append((expr.expression, 0))
+                case Unary() if stage == 0:
+                    pending.append((expr, 1))
+                    pending.append((expr.right, 0))
+                case Unary():
+                    values[-1] = self.visit_unary_expression(Unary(expr.operator, Literal(values[-1])))
+                case Binary() if stage == 0:
+                    pending.append((expr, 1))
+                    pending.append((expr.right, 0))
+                    pending.append((expr.left, 0))
+                case Binary():
+                    right = values.pop()
+                    values[-1] = self.visit_binary_expression(Binary(Literal(values[-1]), expr.operator, Literal(right)))
+                case Assign() if stage == 0:
+                    pending.append((expr, 1))
+                    pending.append((expr.value, 0))
+                case Assign():
+                    values[-1] = self.visit_assign_expression(
+                        Assign(expr.name, Literal(values[-1]), expr.depth, expr.slot))
+                case Get() if stage == 0:
+                    pending.append((expr, 1))
+                    pending.append((expr.object, 0))
+                case Get():
+                    if expr.site is None:
+                        expr.site = Site(expr.name)
+                    values[-1] = expr.site.get(values[-1])
+                case Set() if stage == 0:
+                    pending.append((expr, 1))
+                    pending.append((expr.value, 0))
+                    pending.append((expr.object, 0))
+                case Set():
+                    if expr.site is None:
+                        expr.site = Site(expr.name)
+                    value = values.pop()
+                    values[-1] = expr.site.set(values[-1], value)
+                case Call():
+                    self.call_deep(expr, stage, values, pending)
+
+        return values[0]
+
+    def call_deep(self, expr: Call, stage: int, values: List[Any],
+                  pending: List[Tuple[ExprExpression, int]]) -> None:
+        # a stage of a call for evaluate_deep: the callee, or the instance a
+        #     method is called on, then what is called with the arguments
+        #     put on values above it, then the call itself
+        callee = expr.callee
+        count = len(expr.arguments)
+
+        if stage == 0 and expr.fixed:
+            function = self.call_sites.get(expr)
+            if function is None:
+                function = self.call_sites[expr] = function_of(expr.paren, self.globals.get(callee.name), count)
+            values.append(function)
+        elif stage == 0:
+            pending.append((expr, 1))
+            pending.append((callee.object if type(callee) is Get else callee, 0))
+            return None
+        elif stage == 1 and type(callee) is Get:
+            if callee.site is None:
+                callee.site = Site(callee.name, expr.paren, count)
+            instance = values[-1]
+            values[-1] = callee.site.method(instance)
+            values.append(instance)
+        elif stage == 1:
+            values[-1] = function_of(expr.paren, values[-1], count)
+        else:
+            if type(callee) is Get:
+                count += 1
+            arguments = values[len(values) - count:]
+            del values[len(values) - count:]
+            try:
+                values[-1] = values[-1](*arguments)
+            except NativeError as error:
+                raise LoxRuntimeError(expr.paren, str(error))
+            return None
+
+        pending.append((expr, 2))
+        for index in range(len(expr.arguments) - 1, -1, -1):
+            pending.append((expr.arguments[index], 0))
     
     def execute(self, stmt: Statement) -> Any:
         return stmt.accept(self)
     
     def visit_expression_statement(self, statement: StmtExpression):
-        self.evaluate(statement.expression)
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        evaluate(statement.expression)
         return None
     
+    def visit_if_statement(self, statement: If):
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        if self.truthy(evaluate(statement.condition)):
+            self.execute(statement.then_branch)
+        elif statement.else_branch is not None:
+            self.execute(statement.else_branch)
+
+        return None
+
     def visit_print_statement(self, statement: StmtExpression):
-        value = self.evaluate(statement.expression)
-        print(self.stringify(value))
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        value = evaluate(statement.expression)
+        if self.stdout is None:
+            print(self.stringify(value))
+        else:
+            # one write a line, where print would make two
+            self.stdout.write(self.stringify(value) + "\n")
         return None
 
-    def visit_block_statement(self, statement: Expression):
-        return super().visit_block_statement(statement)
-    
-    def visit_var_statement(self, statement: Expression):
-        return super().visit_var_statement(statement)
+    def visit_block_statement(self, statement: Block):
+        # blocks that declare nothing share the enclosing environment
+        if statement.slots == 0:
+            for inner in statement.statements:
+                self.execute(inner)
+            return None
+
+        self.execute_block(statement.statements, Environment(self.environment, statement.slots))
+        return None
+
+    def execute_block(self, statements: List[Statement], environment: Environment) -> None:
+        previous = self.environment
+        try:
+            self.environment = environment
+
+            for statement in statements:
+                self.execute(statement)
+        finally:
+            self.environment = previous
+
+    def visit_var_statement(self, statement: Var):
+        value = None
+        if statement.initializer is not None:
+            evaluate = self.evaluate_deep if statement.deep else self.evaluate
+            value = evaluate(statement.initializer)
+
+        if statement.slot is None:
+            self.globals.define(statement.name.lexeme, value)
+        else:
+            self.environment.values[statement.slot] = value
+
+        return None
+
+    def visit_while_statement(self, statement: While):
+        evaluate = self.evaluate_deep if statement.deep else self.evaluate
+        while self.truthy(evaluate(statement.condition)):
+            self.execute(statement.body)
+
+        return None
 
     def truthy(self, value: Any) -> bool:
         # false & nil are falsey, anything else is truthy
         if value is None or value is False:
             return False
 
-    def floaty(self, value: Any) -> float:
+        return True
+
+    def floaty(self, operator: Token, value: Any, message: str = 'Operands must be numbers.') -> float:
         # lox only supports floating point numbers, implicitly any number
         #     must be a float
         if type(value) == float:
             return value
 
-        raise TypeError
-
-    def stringy(self, value: Any) -> str:
-        if type(value) == str:
-            return value
-
-        raise TypeError
+        raise LoxRuntimeError(operator, message)
 
-    def stringify(self, value):
+    @staticmethod
+    def stringify(value):
         if value is None:
             return 'nil'
         text = str(value)
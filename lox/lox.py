@@ -1,13 +1,40 @@
+from mmap import mmap, ACCESS_READ
 from pathlib import Path
-from sys import stderr
-from lox.scanner import Scanner
-from lox.parser import Parser
+import sys
+from typing import List, Optional, Type, Union
+from lox.scanner import Scanner, RegexScanner, BytesScanner
+from lox.tokens import Buffer, TokenBuffer, TokenType
+from lox.parser import Parser, ParseError, StreamingParser
+from lox.resolver import Resolver, ResolveError
+from lox.optimizer import Optimizer
+from lox.cache import ProgramCache
+from lox.environment import Globals
 from lox.interpreter import Interpreter, LoxRuntimeError
+from lox.compiler import Compiler
+from lox.vm import VM
+from lox.closures import ClosureCompiler
+from lox.transpiler import Transpiler, run as run_python
+from lox.statement import Statement
 from lox.ast_printer import AstPrinter
+from lox.output import Output
+from lox.engine import engines, too_deep, nesting_error
+from lox.errors import NestingError
 
 
 class Lox:
-    interpreter = Interpreter()
+    globals = Globals()
+    # every engine prints here; it is flushed before an error is reported
+    #     and when a script ends
+    output = Output()
+    interpreter = Interpreter(globals, output)
+    vm = VM(globals, output)
+    engines = engines
+    scanners = {"chars": Scanner, "regex": RegexScanner}
+    scanner: Type[Scanner] = Scanner
+    optimizer: Optimizer = None
+    streaming = False
+    memory_map = False
+    cache: ProgramCache = None
     had_error = False
     had_runtime_error = False
 
@@ -16,11 +43,16 @@ class Lox:
         return f"repl intro: placeholder"
 
     @staticmethod
-    def run_file(file_path: str) -> None:
+    def run_file(file_path: str, engine: str = "interpreter") -> None:
         absolute_path = Path(file_path).resolve()
-        source = absolute_path.read_text()
 
-        Lox.run(source)
+        try:
+            if Lox.memory_map:
+                Lox.run(Lox.map_file(absolute_path), engine, cached=True)
+            else:
+                Lox.run(absolute_path.read_text(), engine, cached=True)
+        finally:
+            Lox.output.flush()
 
         if Lox.had_error:
             exit(65)
@@ -29,7 +61,39 @@ class Lox:
             exit(70)
 
     @staticmethod
-    def run_repl() -> None:
+    def map_file(path: Path) -> Buffer:
+        # the map stays valid after the file is closed and is released with
+        #     the last token buffer that refers to it
+        with open(path, "rb") as file:
+            if path.stat().st_size == 0:
+                # an empty file cannot be mapped
+                return b""
+            return mmap(file.fileno(), 0, access=ACCESS_READ)
+
+    @staticmethod
+    def emit_python(file_path: str) -> None:
+        source = Path(file_path).resolve().read_text()
+        statements = Lox.parse(Lox.scanner(source).scan_tokens())
+
+        if Lox.had_error or not Lox.resolve(statements):
+            exit(65)
+
+        if Lox.optimizer is not None:
+            statements = Lox.optimizer.optimize(statements)
+
+        try:
+            source = Transpiler().transpile(statements)
+        except too_deep as error:
+            found = nesting_error(statements, "python", error)
+            if found is None:
+                raise
+            Lox.error(*found)
+            exit(65)
+
+        print(source, end='')
+
+    @staticmethod
+    def run_repl(engine: str = "interpreter") -> None:
         print(Lox.print_repl_intro())
 
         while True:
@@ -37,7 +101,8 @@ class Lox:
                 print(">>> ", end='')
 
                 source = input()
-                Lox.run(source)
+                Lox.run(source, engine)
+                Lox.output.flush()
 
                 Lox.had_error = False
 
@@ -48,24 +113,155 @@ class Lox:
                 exit(1)
 
     @classmethod
-    def run(cls, source: str) -> None:
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens)
-        statements = parser.parse()
+    def run(cls, source: Union[str, Buffer], engine: str = "interpreter", cached: bool = False) -> None:
+        if cls.streaming:
+            return cls.run_stream(source, engine)
+
+        statements = cls.prepare(source, cached)
+        if statements is None:
+            return None
+
+        try:
+            cls.execute(statements, engine)
+        except LoxRuntimeError as error:
+            Lox.runtime_error(error)
+
+    @classmethod
+    def prepare(cls, source: Union[str, Buffer], cached: bool = False) -> Optional[List[Statement]]:
+        # scans, parses, resolves and optimizes source, or loads the result
+        #     of doing so from the cache; None when there was an error
+        key = None
+        if cached and cls.cache is not None:
+            key = cls.cache.key(source, ",".join(cls.optimizer.passes) if cls.optimizer is not None else "")
+            statements = cls.cache.load(key)
+            if statements is not None:
+                return statements
+
+        scanner = cls.scanner_for(source)
+        statements = cls.parse(scanner.scan_tokens())
 
         if cls.had_error:
             return None
 
-        Lox.interpreter.interpret(statements)
+        if not cls.resolve(statements):
+            return None
+
+        if cls.optimizer is not None:
+            statements = cls.optimizer.optimize(statements)
+
+        # a hit would skip the scanner, so programs it printed messages for
+        #     are always scanned again
+        if key is not None and not scanner.had_error:
+            cls.cache.store(key, statements)
+
+        return statements
+
+    @classmethod
+    def run_stream(cls, source: Union[str, Buffer], engine: str = "interpreter") -> None:
+        # every top level statement runs as soon as it is parsed, so the
+        #     statements before a resolve or runtime error have already run
+        #     by the time it is reported
+        resolver = Resolver()
+
+        try:
+            for statement in StreamingParser(cls.scanner_for(source).stream()).parse():
+                try:
+                    resolver.resolve([statement])
+                except ResolveError as error:
+                    cls.report(error.token.line, f" at '{error.token.lexeme}'", error.message)
+                    return None
+
+                statements = [statement]
+                if cls.optimizer is not None:
+                    statements = cls.optimizer.optimize(statements)
+
+                try:
+                    if not cls.execute(statements, engine):
+                        return None
+                except LoxRuntimeError as error:
+                    Lox.runtime_error(error)
+                    return None
+        except ParseError as error:
+            cls.parse_error(error)
+        except NestingError as error:
+            cls.error(error.line, error.message)
+
+    @classmethod
+    def parse(cls, tokens: TokenBuffer) -> List[Statement]:
+        # the statements, or none once a parse error has been reported
+        try:
+            return Parser(tokens).parse()
+        except ParseError as error:
+            cls.parse_error(error)
+        except NestingError as error:
+            cls.error(error.line, error.message)
+        return []
+
+    @classmethod
+    def parse_error(cls, error: ParseError) -> None:
+        where = " at end" if error.token.type == TokenType.EOF else f" at '{error.token.lexeme}'"
+        cls.report(error.token.line, where, error.message)
+
+    @classmethod
+    def scanner_for(cls, source: Union[str, Buffer]) -> Scanner:
+        # bytes and memory maps are scanned without decoding them first.
+        #     messages go where printed output goes, so they come after what
+        #     the script printed before the scanner got to them
+        if isinstance(source, str):
+            return cls.scanner(source, cls.output)
+        return BytesScanner(source, cls.output)
+
+    @classmethod
+    def execute(cls, statements: List[Statement], engine: str) -> bool:
+        # false when the engine could not take the statements, which is
+        #     reported like a compile error
+        try:
+            match engine:
+                case "interpreter":
+                    Lox.interpreter.interpret(statements)
+                case "vm":
+                    Lox.vm.interpret(Compiler().compile(statements))
+                case "closure":
+                    ClosureCompiler().compile(statements)(Lox.globals, Lox.output)
+                case "python":
+                    run_python(Transpiler().compile(statements), Lox.globals, Lox.output)
+                case _:
+                    raise ValueError(f"Unknown engine '{engine}'.")
+        except too_deep as error:
+            found = nesting_error(statements, engine, error)
+            if found is None:
+                raise
+            cls.error(*found)
+            return False
+
+        return True
+
+    @classmethod
+    def resolve(cls, statements: List[Statement]) -> bool:
+        try:
+            Resolver().resolve(statements)
+        except ResolveError as error:
+            cls.report(error.token.line, f" at '{error.token.lexeme}'", error.message)
+            return False
+
+        return True
 
     @staticmethod
     def error(line: int, message: str) -> None:
         Lox.report(line, "", message)
 
+    @classmethod
+    def use_output(cls, output: Output) -> None:
+        cls.output = output
+        cls.interpreter.stdout = output
+        cls.vm.stdout = output
+
     @staticmethod
     def runtime_error(error: LoxRuntimeError) -> None:
-        stderr.write(f"{error}\n[line {error.token.line}]")
+        # what the script printed before the error comes first
+        Lox.output.flush()
+        # sys.stderr is looked up on every call, so it can be redirected
+        sys.stderr.write(f"{error}\n[line {error.token.line}]")
         Lox.had_runtime_error = True
 
     @classmethod
@@ -73,5 +269,6 @@ class Lox:
         error_message = "".join([
             "[line ", str(line), "] Error", where, ": ", message])
 
-        stderr.write(error_message)
+        cls.output.flush()
+        sys.stderr.write(error_message)
         cls.had_error = True
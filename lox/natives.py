@@ -0,0 +1,148 @@
+import math
+from time import perf_counter
+from typing import Any, Callable, Dict
+from lox.tokens import Token
+from lox.errors import LoxRuntimeError
+from lox.array import LoxArray, apply
+
+
+class NativeError(Exception):
+    # raised by a native for arguments it cannot take; the call site reports
+    #     it as a LoxRuntimeError at its closing parenthesis
+    pass
+
+
+class LoxCallable:
+    # what a call site can call: arity arguments are passed to function
+    __slots__ = ()
+    arity: int
+    function: Callable
+
+
+class Native(LoxCallable):
+    # a python callable exposed to scripts as a global, or as a method of a
+    #     LoxClass, when function takes the instance before the arguments
+    __slots__ = ('name', 'arity', 'function')
+
+    def __init__(self, name: str, arity: int, function: Callable) -> None:
+        self.name = name
+        self.arity = arity
+        # takes arity lox values and returns one
+        self.function = function
+
+    def __str__(self) -> str:
+        return f"<native fn {self.name}>"
+
+    def __repr__(self) -> str:
+        return f"Native({self.name!r}, {self.arity})"
+
+
+# name -> native every Globals starts out with
+natives: Dict[str, Native] = {}
+
+
+def native(name: str, arity: int) -> Callable[[Callable], Callable]:
+    def register(function: Callable) -> Callable:
+        natives[name] = Native(name, arity, function)
+        return function
+
+    return register
+
+
+def function_of(paren: Token, callee: Any, count: int) -> Callable:
+    # what a call site with count arguments calls, checked before they are
+    #     evaluated; a call site whose callee cannot change keeps it
+    if not isinstance(callee, LoxCallable):
+        raise LoxRuntimeError(paren, "Can only call functions and classes.")
+    if callee.arity != count:
+        raise LoxRuntimeError(paren, f"Expected {callee.arity} arguments but got {count}.")
+
+    return callee.function
+
+
+def ieee(function: Callable[[float], float], value: float) -> float:
+    # what numpy gives where math raises: nan outside the domain, infinity
+    #     on overflow and for log(0)
+    try:
+        return float(function(value))
+    except OverflowError:
+        return value if math.isinf(value) else math.inf
+    except ValueError:
+        return -math.inf if value == 0.0 else math.nan
+
+
+def mathematical(name: str, function: Callable[[float], float]) -> None:
+    # applied element by element to an array of numbers
+    def call(value: Any) -> Any:
+        if type(value) is float:
+            return ieee(function, value)
+        if type(value) is LoxArray and not value.booleans:
+            return apply(value, lambda item: ieee(function, item), name)
+        raise NativeError("Argument must be a number.")
+
+    native(name, 1)(call)
+
+
+for name, function in [("abs", math.fabs), ("sqrt", math.sqrt), ("floor", math.floor), ("ceil", math.ceil),
+                       ("exp", math.exp), ("log", math.log), ("sin", math.sin), ("cos", math.cos)]:
+    mathematical(name, function)
+
+
+def array_argument(value: Any) -> LoxArray:
+    if type(value) is not LoxArray:
+        raise NativeError("Argument must be an array.")
+    return value
+
+
+def count_argument(value: Any) -> int:
+    if type(value) is not float or not value.is_integer() or value < 0:
+        raise NativeError("Argument must be a non-negative integer.")
+    return int(value)
+
+
+@native("clock", 0)
+def clock() -> float:
+    return perf_counter()
+
+
+@native("len", 1)
+def length(value: Any) -> float:
+    return float(len(array_argument(value)))
+
+
+@native("at", 2)
+def at(value: Any, index: Any) -> Any:
+    values = array_argument(value)
+    if type(index) is not float or not index.is_integer() or not 0 <= index < len(values):
+        raise NativeError("Index out of range.")
+    return values.at(int(index))
+
+
+@native("range", 1)
+def range_(count: Any) -> LoxArray:
+    return LoxArray(range(count_argument(count)))
+
+
+@native("zeros", 1)
+def zeros(count: Any) -> LoxArray:
+    return LoxArray([0.0] * count_argument(count))
+
+
+@native("sum", 1)
+def sum_(value: Any) -> float:
+    return array_argument(value).sum()
+
+
+@native("min", 1)
+def min_(value: Any) -> float:
+    return array_argument(value).min()
+
+
+@native("max", 1)
+def max_(value: Any) -> float:
+    return array_argument(value).max()
+
+
+@native("mean", 1)
+def mean(value: Any) -> float:
+    return array_argument(value).mean()
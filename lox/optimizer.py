@@ -0,0 +1,351 @@
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+from lox.tokens import TokenType
+from lox.errors import LoxRuntimeError
+from lox.expression import Expression as ExprExpression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set, Assign, Variable
+from lox.statement import Expression as StmtExpression, Statement, StatementVisitor, Block, If, Print, Var, While
+from lox.interpreter import Interpreter
+from lox.rope import Rope
+
+
+class NodeCounter(ExpressionVisitor, StatementVisitor):
+    def count(self, statements: List[Statement]) -> int:
+        return sum(self.execute(statement) for statement in statements)
+
+    def evaluate(self, expr: ExprExpression) -> int:
+        return expr.accept(self)
+
+    def execute(self, stmt: Statement) -> int:
+        if getattr(stmt, 'deep', False):
+            return self.size(stmt)
+        return stmt.accept(self)
+
+    @staticmethod
+    def size(node: Statement) -> int:
+        # counted with a stack, as a statement the resolver found deep may
+        #     nest deeper than python recurses
+        pending: List[Any] = [node]
+        count = 0
+
+        while pending:
+            node = pending.pop()
+            count += 1
+            for name in type(node).__slots__:
+                value = getattr(node, name)
+                if isinstance(value, (ExprExpression, Statement)):
+                    pending.append(value)
+                elif isinstance(value, list):
+                    pending.extend(value)
+
+        return count
+
+    def visit_literal_expression(self, expr: Literal) -> int:
+        return 1
+
+    def visit_grouping_expression(self, expr: Grouping) -> int:
+        return 1 + self.evaluate(expr.expression)
+
+    def visit_unary_expression(self, expr: Unary) -> int:
+        return 1 + self.evaluate(expr.right)
+
+    def visit_binary_expression(self, expr: Binary) -> int:
+        return 1 + self.evaluate(expr.left) + self.evaluate(expr.right)
+
+    def visit_call_expression(self, expr: Call) -> int:
+        return 1 + self.evaluate(expr.callee) + sum(self.evaluate(argument) for argument in expr.arguments)
+
+    def visit_get_expression(self, expr: Get) -> int:
+        return 1 + self.evaluate(expr.object)
+
+    def visit_set_expression(self, expr: Set) -> int:
+        return 1 + self.evaluate(expr.object) + self.evaluate(expr.value)
+
+    def visit_assign_expression(self, expr: Assign) -> int:
+        return 1 + self.evaluate(expr.value)
+
+    def visit_variable_expression(self, expr: Variable) -> int:
+        return 1
+
+    def visit_expression_statement(self, statement: StmtExpression) -> int:
+        return 1 + self.evaluate(statement.expression)
+
+    def visit_if_statement(self, statement: If) -> int:
+        count = 1 + self.evaluate(statement.condition) + self.execute(statement.then_branch)
+        if statement.else_branch is not None:
+            count += self.execute(statement.else_branch)
+        return count
+
+    def visit_print_statement(self, statement: Print) -> int:
+        return 1 + self.evaluate(statement.expression)
+
+    def visit_block_statement(self, statement: Block) -> int:
+        return 1 + self.count(statement.statements)
+
+    def visit_var_statement(self, statement: Var) -> int:
+        if statement.initializer is None:
+            return 1
+        return 1 + self.evaluate(statement.initializer)
+
+    def visit_while_statement(self, statement: While) -> int:
+        return 1 + self.evaluate(statement.condition) + self.execute(statement.body)
+
+
+class Pass(ExpressionVisitor, StatementVisitor):
+    # every visit returns the node to put in place of the one visited;
+    #     statements may return None to be dropped altogether
+    name = ""
+
+    def run(self, statements: List[Statement]) -> List[Statement]:
+        return self.statements(statements)
+
+    def statements(self, statements: List[Statement]) -> List[Statement]:
+        result = []
+
+        for statement in statements:
+            statement = self.execute(statement)
+            if statement is not None:
+                result.append(statement)
+
+        return result
+
+    def evaluate(self, expr: ExprExpression) -> ExprExpression:
+        return expr.accept(self)
+
+    def execute(self, stmt: Statement) -> Optional[Statement]:
+        # every pass recurses, so statements the resolver found deep are
+        #     left as they are, to be run as they were written
+        if getattr(stmt, 'deep', False):
+            return stmt
+        return stmt.accept(self)
+
+    def branch(self, stmt: Statement) -> Statement:
+        # if and while need a body, so a dropped one becomes an empty block
+        stmt = self.execute(stmt)
+        return stmt if stmt is not None else Block([])
+
+    def visit_literal_expression(self, expr: Literal) -> ExprExpression:
+        return expr
+
+    def visit_grouping_expression(self, expr: Grouping) -> ExprExpression:
+        expr.expression = self.evaluate(expr.expression)
+        return expr
+
+    def visit_unary_expression(self, expr: Unary) -> ExprExpression:
+        expr.right = self.evaluate(expr.right)
+        return expr
+
+    def visit_binary_expression(self, expr: Binary) -> ExprExpression:
+        expr.left = self.evaluate(expr.left)
+        expr.right = self.evaluate(expr.right)
+        return expr
+
+    def visit_call_expression(self, expr: Call) -> ExprExpression:
+        expr.callee = self.evaluate(expr.callee)
+        expr.arguments = [self.evaluate(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expression(self, expr: Get) -> ExprExpression:
+        expr.object = self.evaluate(expr.object)
+        return expr
+
+    def visit_set_expression(self, expr: Set) -> ExprExpression:
+        expr.object = self.evaluate(expr.object)
+        expr.value = self.evaluate(expr.value)
+        return expr
+
+    def visit_assign_expression(self, expr: Assign) -> ExprExpression:
+        expr.value = self.evaluate(expr.value)
+        return expr
+
+    def visit_variable_expression(self, expr: Variable) -> ExprExpression:
+        return expr
+
+    def visit_expression_statement(self, statement: StmtExpression) -> Optional[Statement]:
+        statement.expression = self.evaluate(statement.expression)
+        return statement
+
+    def visit_if_statement(self, statement: If) -> Optional[Statement]:
+        statement.condition = self.evaluate(statement.condition)
+        statement.then_branch = self.branch(statement.then_branch)
+        if statement.else_branch is not None:
+            statement.else_branch = self.execute(statement.else_branch)
+        return statement
+
+    def visit_print_statement(self, statement: Print) -> Optional[Statement]:
+        statement.expression = self.evaluate(statement.expression)
+        return statement
+
+    def visit_block_statement(self, statement: Block) -> Optional[Statement]:
+        statement.statements = self.statements(statement.statements)
+        return statement
+
+    def visit_var_statement(self, statement: Var) -> Optional[Statement]:
+        if statement.initializer is not None:
+            statement.initializer = self.evaluate(statement.initializer)
+        return statement
+
+    def visit_while_statement(self, statement: While) -> Optional[Statement]:
+        statement.condition = self.evaluate(statement.condition)
+        statement.body = self.branch(statement.body)
+        return statement
+
+
+def unwrap(expr: ExprExpression) -> ExprExpression:
+    while isinstance(expr, Grouping):
+        expr = expr.expression
+    return expr
+
+
+def truthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+class RemoveGroupings(Pass):
+    name = "remove-groupings"
+
+    def visit_grouping_expression(self, expr: Grouping) -> ExprExpression:
+        # groupings only carry precedence, which the tree shape already has
+        return self.evaluate(expr.expression)
+
+
+class FoldConstants(Pass):
+    name = "fold-constants"
+
+    def __init__(self) -> None:
+        self.interpreter = Interpreter()
+
+    def fold(self, expr: ExprExpression) -> ExprExpression:
+        # evaluated by the interpreter itself so folding can never disagree
+        #     with it; anything that would fail at runtime is left in place
+        #     to fail there, with its own line
+        try:
+            value = self.interpreter.evaluate(expr)
+        except (LoxRuntimeError, ArithmeticError):
+            return expr
+
+        # literals hold plain strings, which every engine can embed
+        if isinstance(value, Rope):
+            value = value.flatten()
+        return Literal(value)
+
+    def visit_grouping_expression(self, expr: Grouping) -> ExprExpression:
+        expr.expression = self.evaluate(expr.expression)
+
+        if isinstance(expr.expression, Literal):
+            return expr.expression
+        return expr
+
+    def visit_unary_expression(self, expr: Unary) -> ExprExpression:
+        expr.right = self.evaluate(expr.right)
+
+        if isinstance(unwrap(expr.right), Literal):
+            return self.fold(expr)
+        return expr
+
+    def visit_binary_expression(self, expr: Binary) -> ExprExpression:
+        expr.left = self.evaluate(expr.left)
+        expr.right = self.evaluate(expr.right)
+
+        if isinstance(unwrap(expr.left), Literal) and isinstance(unwrap(expr.right), Literal):
+            return self.fold(expr)
+        return expr
+
+
+class PruneBranches(Pass):
+    name = "prune-branches"
+
+    def visit_if_statement(self, statement: If) -> Optional[Statement]:
+        statement = super().visit_if_statement(statement)
+        condition = unwrap(statement.condition)
+
+        if not isinstance(condition, Literal):
+            return statement
+        elif truthy(condition.value):
+            return statement.then_branch
+        return statement.else_branch
+
+    def visit_while_statement(self, statement: While) -> Optional[Statement]:
+        statement = super().visit_while_statement(statement)
+        condition = unwrap(statement.condition)
+
+        if isinstance(condition, Literal) and not truthy(condition.value):
+            return None
+        return statement
+
+
+class EliminateDeadCode(Pass):
+    name = "eliminate-dead-code"
+
+    def pure(self, expr: ExprExpression) -> bool:
+        # true when evaluating expr can neither fail nor change anything
+        expr = unwrap(expr)
+
+        if isinstance(expr, Literal):
+            return True
+        elif isinstance(expr, Variable):
+            # globals may be undefined, resolved locals always exist
+            return expr.depth is not None
+        elif isinstance(expr, Unary):
+            return expr.operator.type == TokenType.BANG and self.pure(expr.right)
+        elif isinstance(expr, Binary):
+            return (expr.operator.type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL)
+                    and self.pure(expr.left) and self.pure(expr.right))
+
+        return False
+
+    @staticmethod
+    def empty(statement: Optional[Statement]) -> bool:
+        return statement is None or (isinstance(statement, Block) and not statement.statements)
+
+    def visit_expression_statement(self, statement: StmtExpression) -> Optional[Statement]:
+        if self.pure(statement.expression):
+            return None
+        return statement
+
+    def visit_block_statement(self, statement: Block) -> Optional[Statement]:
+        statement = super().visit_block_statement(statement)
+
+        if not statement.statements:
+            return None
+        return statement
+
+    def visit_if_statement(self, statement: If) -> Optional[Statement]:
+        statement = super().visit_if_statement(statement)
+
+        if self.empty(statement.then_branch) and self.empty(statement.else_branch) \
+                and self.pure(statement.condition):
+            return None
+        return statement
+
+
+passes = {
+    RemoveGroupings.name: RemoveGroupings,
+    FoldConstants.name: FoldConstants,
+    PruneBranches.name: PruneBranches,
+    EliminateDeadCode.name: EliminateDeadCode,
+}
+
+
+class Optimizer:
+    def __init__(self, enabled: Iterable[str] = None, report: TextIO = None) -> None:
+        self.passes = list(passes) if enabled is None else list(enabled)
+        for name in self.passes:
+            if name not in passes:
+                raise ValueError(f"Unknown optimizer pass '{name}'.")
+
+        self.report = report
+        # pass name -> nodes removed, summed over every optimize() call
+        self.removed: Dict[str, int] = {name: 0 for name in self.passes}
+
+    def optimize(self, statements: List[Statement]) -> List[Statement]:
+        counter = NodeCounter()
+
+        for name in self.passes:
+            before = counter.count(statements)
+            statements = passes[name]().run(statements)
+            removed = before - counter.count(statements)
+
+            self.removed[name] += removed
+            if self.report is not None:
+                self.report.write(f"{name}: removed {removed} nodes\n")
+
+        return statements
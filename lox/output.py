@@ -0,0 +1,70 @@
+import sys
+from time import monotonic
+from typing import List, TextIO
+
+
+class Output:
+    # where print writes: lines are collected and written to the stream
+    #     together, a write and a flush for many lines rather than for each.
+    #
+    # policies:
+    #     line      every line as it is printed, as a terminal expects
+    #     size      once size characters are waiting
+    #     time      once the oldest waiting line is interval seconds old, or
+    #               size characters are waiting; checked as lines are
+    #               printed, so the last lines wait for the next print or
+    #               flush()
+    #     explicit  only on flush()
+    #
+    # by default the policy is line for a terminal and size for anything else
+    policies = ("line", "size", "time", "explicit")
+
+    def __init__(self, stream: TextIO = None, policy: str = None,
+                 size: int = 64 * 1024, interval: float = 0.1) -> None:
+        # sys.stdout when None, looked up on every flush so it can be
+        #     redirected
+        self.stream = stream
+        if policy is None:
+            policy = "line" if self.target().isatty() else "size"
+        if policy not in self.policies:
+            raise ValueError(f"Unknown flush policy '{policy}'.")
+
+        self.policy = policy
+        self.interval = interval if policy == "time" else None
+        match policy:
+            case "line":
+                self.limit = 1
+            case "size" | "time":
+                self.limit = size
+            case "explicit":
+                self.limit = float("inf")
+
+        self.pending: List[str] = []
+        self.waiting = 0
+        # when the oldest waiting line was printed, for the time policy
+        self.since = 0.0
+
+    def target(self) -> TextIO:
+        return self.stream if self.stream is not None else sys.stdout
+
+    def write(self, text: str) -> None:
+        self.pending.append(text)
+        self.waiting += len(text)
+
+        if self.waiting >= self.limit:
+            self.flush()
+        elif self.interval is not None:
+            now = monotonic()
+            if len(self.pending) == 1:
+                self.since = now
+            elif now - self.since >= self.interval:
+                self.flush()
+
+    def flush(self) -> None:
+        target = self.target()
+        if self.pending:
+            text = "".join(self.pending)
+            self.pending.clear()
+            self.waiting = 0
+            target.write(text)
+        target.flush()
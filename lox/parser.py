@@ -1,8 +1,66 @@
 from sys import stderr
-from typing import List, Any
-from lox.tokens import Token, TokenType
-from lox.expression import Expression as ExprExpression, Binary, Unary, Literal, Grouping
-from lox.statement import Expression as StmtExpression, Statement, Print
+from typing import Iterator, List, Any, Optional, Tuple
+from lox.tokens import Token, TokenBuffer, TokenType
+from lox.expression import Expression as ExprExpression, Assign, Binary, Call, Get, Set, Unary, Literal, Grouping, Variable
+from lox.statement import Expression as StmtExpression, Statement, Block, If, Print, Var, While
+from lox.errors import NestingError
+
+
+# statements nested in statements at most; the resolver, the optimizer, the
+#     engines and pickle all recurse on them
+MAX_NESTING = 100
+
+# how the token that starts an operand is parsed
+KEYWORD = 0
+VALUE = 1
+NAME = 2
+PREFIX = 3
+OPEN = 4
+
+prefix_rules = {
+    TokenType.FALSE: KEYWORD,
+    TokenType.TRUE: KEYWORD,
+    TokenType.NIL: KEYWORD,
+    TokenType.NUMBER: VALUE,
+    TokenType.STRING: VALUE,
+    TokenType.IDENTIFIER: NAME,
+    TokenType.BANG: PREFIX,
+    TokenType.MINUS: PREFIX,
+    TokenType.LEFT_PAREN: OPEN,
+}
+
+keywords = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+    TokenType.NIL: None,
+}
+
+# how tightly the token after an operand binds to it: assignment loosest,
+#     then the binary operators, then calls and gets, which bind tighter
+#     than the prefix operators too
+ASSIGNMENT = 0
+POSTFIX = 5
+
+binding_powers = {
+    TokenType.EQUAL: ASSIGNMENT,
+    TokenType.BANG_EQUAL: 1,
+    TokenType.EQUAL_EQUAL: 1,
+    TokenType.GREATER: 2,
+    TokenType.GREATER_EQUAL: 2,
+    TokenType.LESS: 2,
+    TokenType.LESS_EQUAL: 2,
+    TokenType.MINUS: 3,
+    TokenType.PLUS: 3,
+    TokenType.SLASH: 4,
+    TokenType.STAR: 4,
+    TokenType.LEFT_PAREN: POSTFIX,
+    TokenType.DOT: POSTFIX,
+}
+
+# what a frame of Parser.expression waits for an expression to finish
+GROUPING = 0
+CALL = 1
+ASSIGN = 2
 
 
 class ParseError(RuntimeError):
@@ -22,136 +80,283 @@ class ParseError(RuntimeError):
 
 
 class Parser:
-    def __init__(self, tokens: List[Token]):
+    # a list while parse_all runs, which collects errors there and carries
+    #     on rather than stopping at the first
+    errors: Optional[List[ParseError]] = None
+
+    def __init__(self, tokens: TokenBuffer):
         self.tokens = tokens
+        # the parser mostly looks at token types, so it reads that column
+        #     directly and only materializes a Token for the tree or errors
+        self.types = tokens.types
         self.current = 0
+        # statements the parser is in
+        self.depth = 0
 
     def parse(self) -> None:
         statements = []
 
         while not self.is_at_end():
-            statements.append(self.statement())
+            statements.append(self.declaration())
 
         return statements
 
+    def parse_all(self) -> Tuple[List[Statement], List[ParseError]]:
+        # parses to the end, recovering from every error at the next
+        #     statement boundary. the statements errors were in are left
+        #     out of the tree
+        self.errors = []
+        statements = [statement for statement in self.parse() if statement is not None]
+        return statements, self.errors
+
     def expression(self) -> ExprExpression:
-        return self.equality()
+        # a pratt parser: the rule for a token is looked up once, by its
+        #     type, in prefix_rules where an operand starts and in
+        #     binding_powers after one. it keeps explicit stacks rather than
+        #     recursing, so how deeply expressions nest is limited by memory
+        #     alone. operands, operators and prefixes are what the innermost
+        #     grouping, argument or assigned value has read so far; frames
+        #     what the ones around it were in the middle of
+        frames: List[Tuple[int, Any, List[ExprExpression], List[Token], List[Token]]] = []
+        operands: List[ExprExpression] = []
+        operators: List[Token] = []
+        prefixes: List[Token] = []
+        # a primary, grouping or call, with the calls and gets after it
+        #     still to be read
+        expr = None
+
+        while True:
+            if expr is None:
+                typ = self.peek_type()
+                rule = prefix_rules.get(typ)
+                if rule is None:
+                    raise self.error(self.peek(), "Expect expression.")
+                self.advance()
+
+                if rule == NAME:
+                    expr = Variable(self.previous())
+                elif rule == VALUE:
+                    expr = Literal(self.previous_literal())
+                elif rule == KEYWORD:
+                    expr = Literal(keywords[typ])
+                elif rule == PREFIX:
+                    prefixes.append(self.previous())
+                    continue
+                else:
+                    frames.append((GROUPING, None, operands, operators, prefixes))
+                    operands, operators, prefixes = [], [], []
+                    continue
+
+            typ = self.peek_type()
+            power = binding_powers.get(typ)
+
+            if power == POSTFIX:
+                self.advance()
+                if typ == TokenType.DOT:
+                    expr = Get(expr, self.consume(TokenType.IDENTIFIER, "Expect property name after '.'."))
+                elif self.check(TokenType.RIGHT_PAREN):
+                    expr = Call(expr, self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments."), [])
+                else:
+                    frames.append((CALL, (expr, []), operands, operators, prefixes))
+                    operands, operators, prefixes = [], [], []
+                    expr = None
+                continue
+
+            while prefixes:
+                expr = Unary(prefixes.pop(), expr)
+            operands.append(expr)
+            expr = None
+
+            # binary operators are all left associative
+            if power is not None and power != ASSIGNMENT:
+                self.advance()
+                while operators and binding_powers[operators[-1].type] >= power:
+                    right = operands.pop()
+                    operands[-1] = Binary(operands[-1], operators.pop(), right)
+                operators.append(self.previous())
+                continue
+
+            while operators:
+                right = operands.pop()
+                operands[-1] = Binary(operands[-1], operators.pop(), right)
+            value = operands.pop()
+
+            # the value assigned is an expression of its own, and its end
+            #     is the end of the assignment too
+            if power == ASSIGNMENT:
+                self.advance()
+                frames.append((ASSIGN, (value, self.previous()), None, None, None))
+                operands, operators, prefixes = [], [], []
+                continue
+
+            # hand the finished expression to what was waiting for it
+            kind = ASSIGN
+            while kind == ASSIGN:
+                if not frames:
+                    return value
+
+                kind, waiting, operands, operators, prefixes = frames.pop()
+                if kind == ASSIGN:
+                    target, equals = waiting
+                    if isinstance(target, Variable):
+                        value = Assign(target.name, value)
+                    elif isinstance(target, Get):
+                        value = Set(target.object, target.name, value)
+                    else:
+                        raise self.error(equals, "Invalid assignment target.")
+
+            if kind == GROUPING:
+                self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                expr = Grouping(value)
+                continue
+
+            callee, arguments = waiting
+            arguments.append(value)
+            if self.match(TokenType.COMMA):
+                if len(arguments) >= 255:
+                    raise self.error(self.peek(), "Can't have more than 255 arguments.")
+                frames.append((CALL, waiting, operands, operators, prefixes))
+                operands, operators, prefixes = [], [], []
+                continue
+
+            paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+            expr = Call(callee, paren, arguments)
+
+    def declaration(self) -> Optional[Statement]:
+        try:
+            if self.match(TokenType.VAR):
+                return self.var_declaration()
+
+            return self.statement()
+        except ParseError as error:
+            if self.errors is None:
+                raise
+            self.errors.append(error)
+            self.synchronize()
+            return None
+
+    def var_declaration(self) -> Statement:
+        line = self.previous_line()
+        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+
+        initializer = None
+        if self.match(TokenType.EQUAL):
+            initializer = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
+        return Var(name, initializer, line=line)
 
     def statement(self) -> Statement:
-        if self.match(TokenType.PRINT):
-            return self.print_statement()
+        # statements in statements are parsed by recursing, as every stage
+        #     after the parser goes through them, so nothing past a statement
+        #     nested too deeply for those is parsed
+        if self.depth == MAX_NESTING:
+            raise NestingError(self.peek().line, "Statements nested too deeply.")
+        self.depth += 1
+
+        try:
+            if self.match(TokenType.IF):
+                return self.if_statement()
+            elif self.match(TokenType.PRINT):
+                return self.print_statement()
+            elif self.match(TokenType.WHILE):
+                return self.while_statement()
+            elif self.match(TokenType.LEFT_BRACE):
+                line = self.previous_line()
+                return Block(self.block(), line=line)
+
+            return self.expression_statement()
+        finally:
+            self.depth -= 1
+
+    def if_statement(self) -> Statement:
+        line = self.previous_line()
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
+        condition = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
+
+        then_branch = self.statement()
+        else_branch = None
+        if self.match(TokenType.ELSE):
+            else_branch = self.statement()
+
+        return If(condition, then_branch, else_branch, line)
+
+    def while_statement(self) -> Statement:
+        line = self.previous_line()
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
+        condition = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+        body = self.statement()
+
+        return While(condition, body, line)
+
+    def block(self) -> List[Statement]:
+        statements = []
+
+        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+            statement = self.declaration()
+            if statement is not None:
+                statements.append(statement)
 
-        return self.expression_statement()
+        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+        return statements
 
     def print_statement(self) -> Any:
+        line = self.previous_line()
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
-        return Print(value)
+        return Print(value, line)
 
     def expression_statement(self) -> Statement:
+        line = self.peek_line()
         expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after expression.")
-        return StmtExpression(expr)
-
-    def equality(self) -> ExprExpression:
-        expr = self.comparison()
-
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-
-        return expr
+        return StmtExpression(expr, line)
 
     def match(self, *typs: TokenType) -> bool:
-        for typ in typs:
-            if self.check(typ):
-                self.advance()
-                return True
+        # EOF is never asked for, so a type match also means not at the end
+        if self.types[self.current] in typs:
+            self.current += 1
+            return True
 
         return False
 
     def check(self, typ: TokenType) -> bool:
-        if self.is_at_end():
-            return False
-
-        return self.peek().type == typ
+        return self.types[self.current] == typ
 
-    def advance(self) -> Token:
+    def advance(self) -> None:
         if not self.is_at_end():
             self.current += 1
 
-        return self.previous()
-
     def is_at_end(self) -> bool:
-        return self.peek().type == TokenType.EOF
+        return self.types[self.current] == TokenType.EOF
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.tokens.token(self.current)
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
-
-    def comparison(self) -> ExprExpression:
-        expr = self.term()
-
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def term(self) -> ExprExpression:
-        expr = self.factor()
-
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def factor(self) -> ExprExpression:
-        expr = self.unary()
-
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-
-        return expr
+        return self.tokens.token(self.current - 1)
 
-    def unary(self) -> ExprExpression:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
+    def previous_literal(self) -> Any:
+        return self.tokens.literal(self.current - 1)
 
-        return self.primary()
+    def previous_type(self) -> TokenType:
+        return self.types[self.current - 1]
 
-    def primary(self) -> ExprExpression:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        elif self.match(TokenType.TRUE):
-            return Literal(True)
-        elif self.match(TokenType.NIL):
-            return Literal(None)
+    def peek_type(self) -> TokenType:
+        return self.types[self.current]
 
-        elif self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
+    def peek_line(self) -> int:
+        return self.tokens.lines[self.current]
 
-        elif self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-
-        raise self.error(self.peek(), "Expect expression.")
+    def previous_line(self) -> int:
+        return self.tokens.lines[self.current - 1]
 
     def consume(self, typ: TokenType, message: str) -> Token:
         if self.check(typ):
-            return self.advance()
+            self.advance()
+            return self.previous()
 
         raise self.error(self.peek(), message)
 
@@ -161,15 +366,17 @@ class Parser:
         return err
 
     def synchronize(self) -> None:
+        # skips to what is likely the start of the next statement: past a
+        #     semicolon, or up to a keyword that begins one
         self.advance()
 
         while not self.is_at_end():
-            if self.previous.type == TokenType.SEMICOLON:
+            if self.previous_type() == TokenType.SEMICOLON:
                 return
 
-            if self.peek().type in (
+            if self.peek_type() in (
                 TokenType.CLASS,
-                TokenType.FUNCTION,
+                TokenType.FUN,
                 TokenType.VAR,
                 TokenType.FOR,
                 TokenType.IF,
@@ -180,3 +387,57 @@ class Parser:
                 return
 
             self.advance()
+
+
+class StreamingParser(Parser):
+    # pulls tokens one at a time and yields top level statements as soon as
+    #     they are parsed, so neither all the tokens nor the whole tree of a
+    #     program are ever held at once
+    def __init__(self, tokens: Iterator[Token]):
+        self.stream = tokens
+        self.last: Token = None
+        self.next: Token = next(tokens)
+        self.depth = 0
+
+    def parse(self) -> Iterator[Statement]:
+        while not self.is_at_end():
+            yield self.declaration()
+
+    def match(self, *typs: TokenType) -> bool:
+        if self.next.type in typs:
+            self.advance()
+            return True
+
+        return False
+
+    def check(self, typ: TokenType) -> bool:
+        return self.next.type == typ
+
+    def advance(self) -> None:
+        if not self.is_at_end():
+            self.last = self.next
+            self.next = next(self.stream)
+
+    def is_at_end(self) -> bool:
+        return self.next.type == TokenType.EOF
+
+    def peek(self) -> Token:
+        return self.next
+
+    def previous(self) -> Token:
+        return self.last
+
+    def previous_literal(self) -> Any:
+        return self.last.literal
+
+    def previous_type(self) -> TokenType:
+        return self.last.type
+
+    def peek_type(self) -> TokenType:
+        return self.next.type
+
+    def peek_line(self) -> int:
+        return self.next.line
+
+    def previous_line(self) -> int:
+        return self.last.line
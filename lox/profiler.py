@@ -0,0 +1,142 @@
+from time import perf_counter
+from typing import Any, Callable, Dict, List, TextIO, Union
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.expression import Expression as ExprExpression, Assign, Binary, Call, Get, Set, Unary, Variable
+from lox.statement import Statement
+
+
+Node = Union[ExprExpression, Statement]
+
+
+class Entry:
+    __slots__ = ('count', 'total', 'own')
+
+    def __init__(self) -> None:
+        self.count = 0
+        # seconds including the nodes run on behalf of this one
+        self.total = 0.0
+        # seconds excluding them
+        self.own = 0.0
+
+
+class Frame:
+    __slots__ = ('path', 'line', 'children')
+
+    def __init__(self, path: str, line: int) -> None:
+        # every node from the top level statement down, as collapsed stacks
+        #     write them
+        self.path = path
+        self.line = line
+        self.children = 0.0
+
+
+class Profile:
+    def __init__(self) -> None:
+        self.lines: Dict[int, Entry] = {}
+        self.types: Dict[str, Entry] = {}
+        # collapsed stack -> seconds spent in its innermost node
+        self.stacks: Dict[str, float] = {}
+
+    def report(self, file: TextIO, source: List[str] = None, limit: int = 20) -> None:
+        source = source if source is not None else []
+
+        file.write("hot lines by self time\n")
+        file.write(f"{'line':>6} {'count':>10} {'total ms':>10} {'self ms':>10}  source\n")
+        for line, entry in self.hottest(self.lines, limit):
+            text = source[line - 1].strip() if 0 < line <= len(source) else ""
+            file.write(f"{line:>6} {entry.count:>10} {entry.total * 1000:>10.2f} {entry.own * 1000:>10.2f}  {text}\n")
+
+        file.write("\nhot node types by self time\n")
+        file.write(f"{'node':<12} {'count':>10} {'total ms':>10} {'self ms':>10}\n")
+        for name, entry in self.hottest(self.types, limit):
+            file.write(f"{name:<12} {entry.count:>10} {entry.total * 1000:>10.2f} {entry.own * 1000:>10.2f}\n")
+
+    def write_stacks(self, file: TextIO) -> None:
+        # the collapsed format of flamegraph.pl, speedscope and friends, one
+        #     "frame;frame;frame count" line per stack, counted in microseconds
+        for path, seconds in sorted(self.stacks.items()):
+            microseconds = round(seconds * 1_000_000)
+            if microseconds > 0:
+                file.write(f"{path} {microseconds}\n")
+
+    @staticmethod
+    def hottest(entries: Dict[Any, Entry], limit: int) -> List:
+        return sorted(entries.items(), key=lambda item: item[1].own, reverse=True)[:limit]
+
+
+class ProfilingInterpreter(Interpreter):
+    # counts and times every node it runs, by source line and by node type;
+    #     a separate class so the plain interpreter has no hooks to skip
+    def __init__(self, globals: Globals = None, profile: Profile = None, stdout: TextIO = None) -> None:
+        super().__init__(globals, stdout)
+        self.profile = profile if profile is not None else Profile()
+        self.frames = [Frame("", 0)]
+        # nodes of each line and type currently running, so the total time
+        #     of nested ones, like the operands of a binary, is only counted
+        #     by the outermost
+        self.active_lines: Dict[int, int] = {}
+        self.active_types: Dict[str, int] = {}
+
+    def evaluate(self, expr: ExprExpression) -> Any:
+        match expr:
+            case Binary() | Unary():
+                line = expr.operator.line
+            case Assign() | Variable() | Get() | Set():
+                line = expr.name.line
+            case Call():
+                line = expr.paren.line
+            case _:
+                # literals and groupings have no token of their own
+                line = self.frames[-1].line
+
+        return self.measure(expr, line, Interpreter.evaluate)
+
+    def execute(self, stmt: Statement) -> Any:
+        # blocks made up by the optimizer have no line
+        line = stmt.line if stmt.line is not None else self.frames[-1].line
+        return self.measure(stmt, line, Interpreter.execute)
+
+    def measure(self, node: Node, line: int, run: Callable[[Interpreter, Node], Any]) -> Any:
+        profile = self.profile
+        name = type(node).__name__
+        parent = self.frames[-1]
+        label = f"{name}:{line}"
+        frame = Frame(f"{parent.path};{label}" if parent.path else label, line)
+
+        active_lines = self.active_lines
+        active_types = self.active_types
+        active_lines[line] = active_lines.get(line, 0) + 1
+        active_types[name] = active_types.get(name, 0) + 1
+        self.frames.append(frame)
+
+        start = perf_counter()
+        try:
+            return run(self, node)
+        finally:
+            elapsed = perf_counter() - start
+
+            self.frames.pop()
+            parent.children += elapsed
+            own = elapsed - frame.children
+
+            active_lines[line] -= 1
+            active_types[name] -= 1
+
+            entry = profile.lines.get(line)
+            if entry is None:
+                entry = profile.lines[line] = Entry()
+            entry.count += 1
+            entry.own += own
+            if active_lines[line] == 0:
+                entry.total += elapsed
+
+            entry = profile.types.get(name)
+            if entry is None:
+                entry = profile.types[name] = Entry()
+            entry.count += 1
+            entry.own += own
+            if active_types[name] == 0:
+                entry.total += elapsed
+
+            profile.stacks[frame.path] = profile.stacks.get(frame.path, 0.0) + own
@@ -0,0 +1,231 @@
+from typing import Dict, List, Optional, Set, Tuple, Union
+from lox.tokens import Token
+from lox.expression import Expression as ExprExpression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set as ExprSet, Assign, Variable
+from lox.statement import Expression as StmtExpression, Statement, StatementVisitor, Block, If, Print, Var, While
+
+
+# the height past which the interpreter evaluates a statement's expression
+#     with a stack of its own, well short of python's recursion limit
+DEEP = 100
+
+class ResolveError(RuntimeError):
+    def __init__(self, token: Token, message: str):
+        self.token = token
+        self.message = message
+
+
+class Scope:
+    def __init__(self) -> None:
+        # name -> slot in the environment this block creates at runtime
+        self.slots: Dict[str, int] = {}
+        # name -> whether its initializer has finished resolving
+        self.defined: Dict[str, bool] = {}
+
+
+class Resolver(ExpressionVisitor, StatementVisitor):
+    def __init__(self, errors: Optional[List[ResolveError]] = None) -> None:
+        # errors go here when given a list, and resolving carries on past
+        #     them; otherwise the first is raised
+        self.errors = errors
+        self.scopes: List[Scope] = []
+        # local references and the scopes between them and their declaration
+        self.references: List[Tuple[Union[Variable, Assign], Tuple[Scope, ...]]] = []
+        # globals the program declares or assigns, and the calls of globals
+        self.written: Set[str] = set()
+        self.global_calls: List[Call] = []
+        # how deeply the expression being resolved has recursed, whether it
+        #     went past DEEP and the stack of what is left past there
+        self.depth = 0
+        self.deep = False
+        self.pending: List[ExprExpression] = None
+
+    def resolve(self, statements: List[Statement]) -> List[Statement]:
+        self.depth = 0
+        self.pending = None
+        for statement in statements:
+            self.execute(statement)
+
+        # blocks without variables get no environment at runtime, and
+        #     whether a block has any is only known once it is closed, so
+        #     depths are counted after everything has been resolved
+        for expr, between in self.references:
+            expr.depth = sum(1 for scope in between if scope.slots)
+
+        # a global nothing in the program writes holds the same value for a
+        #     whole run, so calling it only takes looking it up and checking
+        #     it once
+        for call in self.global_calls:
+            call.fixed = call.callee.slot is None and call.callee.name.lexeme not in self.written
+
+        self.references = []
+        self.written = set()
+        self.global_calls = []
+        return statements
+
+    def resolve_expression(self, expr: ExprExpression) -> bool:
+        # resolves the expression of a statement; true when it is deeper
+        #     than the interpreter recurses
+        self.deep = False
+        self.evaluate(expr)
+        return self.deep
+
+    def evaluate(self, expr: ExprExpression) -> None:
+        if self.depth < DEEP:
+            self.depth += 1
+            expr.accept(self)
+            self.depth -= 1
+            return None
+
+        # past DEEP the rest of the expression is walked with a stack of
+        #     its own, so how deeply it nests is limited by memory alone:
+        #     the visits in there put operands on it instead of recursing
+        if self.pending is not None:
+            self.pending.append(expr)
+            return None
+
+        self.deep = True
+        pending = self.pending = [expr]
+        while pending:
+            expr = pending.pop()
+            mark = len(pending)
+            expr.accept(self)
+            # operands are pushed in source order, and have to come off it
+            #     in source order too
+            pending[mark:] = reversed(pending[mark:])
+        self.pending = None
+
+    def execute(self, stmt: Statement) -> None:
+        stmt.accept(self)
+
+    def error(self, token: Token, message: str) -> None:
+        error = ResolveError(token, message)
+        if self.errors is None:
+            raise error
+        self.errors.append(error)
+
+    def resolve_local(self, expr: Union[Variable, Assign], name: Token) -> None:
+        for index in range(len(self.scopes) - 1, -1, -1):
+            slot = self.scopes[index].slots.get(name.lexeme)
+
+            if slot is not None:
+                expr.slot = slot
+                self.references.append((expr, tuple(self.scopes[index + 1:])))
+                return
+
+        # not found in any block, so it is a global
+        expr.depth = None
+        expr.slot = None
+
+    def visit_literal_expression(self, expr: Literal) -> None:
+        return None
+
+    def visit_grouping_expression(self, expr: Grouping) -> None:
+        self.evaluate(expr.expression)
+
+    def visit_unary_expression(self, expr: Unary) -> None:
+        self.evaluate(expr.right)
+
+    def visit_binary_expression(self, expr: Binary) -> None:
+        self.evaluate(expr.left)
+        self.evaluate(expr.right)
+
+    def visit_call_expression(self, expr: Call) -> None:
+        # whether the callee is a global is only known once it is resolved,
+        #     which a deep call site may not be yet when this returns
+        if isinstance(expr.callee, Variable):
+            self.global_calls.append(expr)
+
+        self.evaluate(expr.callee)
+        for argument in expr.arguments:
+            self.evaluate(argument)
+
+    def visit_get_expression(self, expr: Get) -> None:
+        self.evaluate(expr.object)
+
+    def visit_set_expression(self, expr: ExprSet) -> None:
+        self.evaluate(expr.object)
+        self.evaluate(expr.value)
+
+    def visit_assign_expression(self, expr: Assign) -> None:
+        self.evaluate(expr.value)
+        self.resolve_local(expr, expr.name)
+
+        if expr.slot is None:
+            self.written.add(expr.name.lexeme)
+
+    def visit_variable_expression(self, expr: Variable) -> None:
+        if self.scopes and self.scopes[-1].defined.get(expr.name.lexeme) is False:
+            self.error(expr.name, "Can't read local variable in its own initializer.")
+
+        self.resolve_local(expr, expr.name)
+
+    def visit_expression_statement(self, statement: StmtExpression) -> None:
+        statement.deep = self.resolve_expression(statement.expression)
+
+    def visit_if_statement(self, statement: If) -> None:
+        statement.deep = self.resolve_expression(statement.condition)
+        self.execute(statement.then_branch)
+        if statement.else_branch is not None:
+            self.execute(statement.else_branch)
+
+    def visit_print_statement(self, statement: Print) -> None:
+        statement.deep = self.resolve_expression(statement.expression)
+
+    def visit_block_statement(self, statement: Block) -> None:
+        scope = Scope()
+        self.scopes.append(scope)
+
+        for inner in statement.statements:
+            self.execute(inner)
+
+        self.scopes.pop()
+        statement.slots = len(scope.slots)
+
+    def visit_var_statement(self, statement: Var) -> None:
+        name = statement.name.lexeme
+
+        if not self.scopes:
+            if statement.initializer is not None:
+                statement.deep = self.resolve_expression(statement.initializer)
+            statement.slot = None
+            self.written.add(name)
+            return None
+
+        scope = self.scopes[-1]
+        if name in scope.slots:
+            self.error(statement.name, "Already a variable with this name in this scope.")
+
+        scope.slots[name] = len(scope.slots)
+        scope.defined[name] = False
+
+        if statement.initializer is not None:
+            statement.deep = self.resolve_expression(statement.initializer)
+
+        scope.defined[name] = True
+        statement.slot = scope.slots[name]
+
+    def visit_while_statement(self, statement: While) -> None:
+        statement.deep = self.resolve_expression(statement.condition)
+        self.execute(statement.body)
+
+
+def first_deep(statements: List[Statement]) -> Optional[Statement]:
+    # the first statement, in source order, whose expression was resolved
+    #     past DEEP; blocks and branches are looked into as well
+    pending = list(reversed(statements))
+
+    while pending:
+        statement = pending.pop()
+        if getattr(statement, 'deep', False):
+            return statement
+
+        if isinstance(statement, Block):
+            pending.extend(reversed(statement.statements))
+        elif isinstance(statement, If):
+            if statement.else_branch is not None:
+                pending.append(statement.else_branch)
+            pending.append(statement.then_branch)
+        elif isinstance(statement, While):
+            pending.append(statement.body)
+
+    return None
@@ -0,0 +1,85 @@
+from typing import Any, Union
+
+
+# strings shorter than this are joined right away, as copying them costs
+#     less than keeping their pieces around
+ROPE_MIN = 256
+# a rope ending in a piece shorter than this has the next short piece
+#     appended to it, so appending a character at a time does not leave a
+#     node per character
+LEAF_MAX = 128
+
+
+class Rope:
+    # a lox string made by +, kept as the two strings it joins until its
+    #     text is asked for, so building a string by appending to it copies
+    #     it once rather than on every append.
+    #
+    # parts is the pair of strings or ropes joined, or the text once it has
+    #     been flattened; it is replaced in one assignment, so a rope can be
+    #     shared by threads flattening it at the same time
+    __slots__ = ('parts', 'length')
+
+    def __init__(self, left: 'String', right: 'String', length: int) -> None:
+        self.parts = (left, right)
+        self.length = length
+
+    def flatten(self) -> str:
+        parts = self.parts
+        if type(parts) is str:
+            return parts
+
+        # a rope built by appending is as deep as it is long, so the pieces
+        #     are gathered without recursion
+        pieces = []
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            if type(node) is str:
+                pieces.append(node)
+                continue
+
+            parts = node.parts
+            if type(parts) is str:
+                pieces.append(parts)
+            else:
+                pending.append(parts[1])
+                pending.append(parts[0])
+
+        text = "".join(pieces)
+        self.parts = text
+        return text
+
+    def __str__(self) -> str:
+        return self.flatten()
+
+    def __repr__(self) -> str:
+        return f"Rope({self.flatten()!r})"
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is Rope or type(other) is str:
+            return self.length == len(other) and self.flatten() == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.flatten())
+
+
+String = Union[str, Rope]
+
+
+def concat(left: String, right: String) -> String:
+    # left + right for two lox strings
+    length = len(left) + len(right)
+    if length < ROPE_MIN:
+        return str(left) + str(right)
+
+    if type(left) is Rope and type(right) is str and len(right) < LEAF_MAX:
+        parts = left.parts
+        if type(parts) is tuple and type(parts[1]) is str and len(parts[1]) + len(right) <= LEAF_MAX:
+            return Rope(parts[0], parts[1] + right, length)
+
+    return Rope(left, right, length)
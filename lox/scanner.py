@@ -1,24 +1,47 @@
-from typing import List, AnyStr
-from lox.tokens import Token, TokenType, keywords
+import re
+from typing import Iterator, List, TextIO, Tuple
+from lox.tokens import Buffer, Token, TokenBuffer, ByteTokenBuffer, TokenType, keywords
 
 
 class Scanner:
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, output: TextIO = None) -> None:
         self.source = source
-        self.tokens = []
+        self.tokens = TokenBuffer(source)
+        # where error messages go, sys.stdout when None
+        self.output = output
 
         self.start = 0
         self.current = 0
         self.line = 1
+        # set once a message has been printed, a program with one is not cached
+        self.had_error = False
+        # the messages printed, each with its line
+        self.errors: List[Tuple[int, str]] = []
 
-    def scan_tokens(self) -> List[Token]:
+    def scan_tokens(self) -> TokenBuffer:
+        self.scan()
+
+        self.tokens.append(TokenType.EOF, self.current, 0, self.line)
+        return self.tokens
+
+    def stream(self, window: int = 256) -> Iterator[Token]:
+        # yields tokens while scanning, never holding more than about
+        #     window of them at a time
         while not self.is_at_end():
+            self.scan(window)
+
+            for index in range(len(self.tokens)):
+                yield self.tokens.token(index)
+            self.tokens.clear()
+
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    def scan(self, limit: int = None) -> None:
+        # scans until limit tokens are buffered or the source runs out
+        while not self.is_at_end() and (limit is None or len(self.tokens) < limit):
             self.start = self.current
             self.scan_token()
 
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
-        return self.tokens
-
     def scan_token(self) -> None:
         c = self.advance()
 
@@ -77,7 +100,7 @@ class Scanner:
                 elif c.isalpha():
                     self.identifier(c)
                 else:
-                    print("Unexpected character.")
+                    self.error("Unexpected character.")
                     # Lox.error(self.line, "Unexpected character.")
 
     def identifier(self, c: str) -> None:
@@ -99,8 +122,7 @@ class Scanner:
             while self.peek().isdigit():
                 self.advance()
 
-        self.add_token(TokenType.NUMBER, float(
-            self.source[self.start: self.current]))
+        self.add_token(TokenType.NUMBER)
 
     def string(self) -> None:
         while self.peek() != '"' and not self.is_at_end():
@@ -109,15 +131,14 @@ class Scanner:
             self.advance()
 
         if self.is_at_end():
-            print("Unterminated string.")
+            self.error("Unterminated string.")
             return None
             # Lox.error(self.line, "Unterminated string.")
 
         # consume closing '"'
         self.advance()
 
-        value = self.source[self.start + 1: self.current - 1]
-        self.add_token(TokenType.STRING, value)
+        self.add_token(TokenType.STRING)
 
     def match(self, expected: str) -> bool:
         if self.is_at_end() or self.source[self.current] != expected:
@@ -145,6 +166,175 @@ class Scanner:
         self.current += 1
         return self.source[self.current - 1]
 
-    def add_token(self, type: TokenType, literal: AnyStr = None) -> None:
-        text = self.source[self.start: self.current]
-        self.tokens.append(Token(type, text, literal, self.line))
+    def add_token(self, type: TokenType) -> None:
+        self.tokens.append(type, self.start, self.current - self.start, self.line)
+
+    def error(self, message: str, line: int = None) -> None:
+        print(message, file=self.output)
+        self.had_error = True
+        self.errors.append((self.line if line is None else line, message))
+
+
+operators = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# only matches ascii tokens the character scanner would produce exactly
+#     the same way; numbers and identifiers running into non-ascii text
+#     (which isdigit() and isalnum() may accept) are left to it instead,
+#     and the possessive quantifiers keep those from backtracking into a
+#     shorter ascii match. spaces are folded into the token after them and
+#     the alternatives are roughly in order of how common they are, since
+#     the time goes into trying them one by one
+token_regex = r"""[ \t\r]*+(?:
+      (?P<identifier>[A-Za-z][A-Za-z0-9]*+)(?![^\x00-\x7f])
+    | (?P<operator>[!=<>]=?|[(){},.\-+;*]|/(?!/))
+    | (?P<number>[0-9]++(?:\.[0-9]++)?+)(?![^\x00-\x7f]|\.[^\x00-\x7f])
+    | (?P<newline>\n[ \t\r\n]*+)
+    | (?P<comment>//[^\n]*+)
+    | (?P<string>"[^"]*+")
+    | (?P<unterminated>"[^"]*+\Z)
+    | (?P<end>\Z)
+    | (?P<other>.)
+)"""
+token_pattern = re.compile(token_regex, re.VERBOSE)
+# the same pattern over utf-8 bytes; '"' and '\n' never occur inside a
+#     multi-byte character, so strings and comments are still matched whole
+byte_token_pattern = re.compile(token_regex.encode(), re.VERBOSE)
+byte_keywords = {lexeme.encode(): type for lexeme, type in keywords.items()}
+byte_operators = {lexeme.encode(): type for lexeme, type in operators.items()}
+
+
+class RegexScanner(Scanner):
+    pattern = token_pattern
+    keywords = keywords
+    operators = operators
+    newline = "\n"
+
+    def scan(self, limit: int = None) -> None:
+        source = self.source
+        end = len(source)
+        scanned = self.tokens.types
+        types = self.tokens.types.append
+        starts = self.tokens.starts.append
+        lengths = self.tokens.lengths.append
+        lines = self.tokens.lines.append
+        finditer = self.pattern.finditer
+        fixed = self.keywords.get
+        operators = self.operators
+        newline = self.newline
+        position = self.current
+        line = self.line
+
+        while position < end and (limit is None or len(scanned) < limit):
+            for token in finditer(source, position):
+                kind = token.lastgroup
+                start, position = token.span(kind)
+
+                if kind == "identifier":
+                    types(fixed(token.group(kind), TokenType.IDENTIFIER))
+                elif kind == "operator":
+                    types(operators[token.group(kind)])
+                elif kind == "newline":
+                    line += token.group(kind).count(newline)
+                    continue
+                elif kind == "number":
+                    types(TokenType.NUMBER)
+                elif kind == "comment" or kind == "end":
+                    continue
+                elif kind == "string":
+                    line += token.group(kind).count(newline)
+                    types(TokenType.STRING)
+                elif kind == "unterminated":
+                    line += token.group(kind).count(newline)
+                    self.error("Unterminated string.", line)
+                    continue
+                else:
+                    position = self.fallback(start, line)
+                    break
+
+                starts(start)
+                lengths(position - start)
+                lines(line)
+
+                if limit is not None and len(scanned) >= limit:
+                    break
+
+        self.current = position
+        self.line = line
+
+    def fallback(self, start: int, line: int) -> int:
+        # anything the pattern does not cover goes through the character
+        #     scanner one token at a time; newlines and strings never get
+        #     here, so the line stays the same
+        self.start = self.current = start
+        self.line = line
+        self.scan_token()
+        return self.current
+
+
+class BytesScanner(RegexScanner):
+    # scans utf-8 encoded bytes, such as a memory mapped file, without
+    #     decoding them up front; offsets in the token buffer are byte
+    #     offsets and lexemes are decoded when a Token is materialized; there
+    #     is no newline translation, so "\r\n" inside a string stays in its
+    #     value and a lone "\r" does not end a line as it does in text mode
+    pattern = byte_token_pattern
+    keywords = byte_keywords
+    operators = byte_operators
+    newline = b"\n"
+    # bytes decoded at first for the character scanner
+    window = 64
+
+    def __init__(self, source: Buffer, output: TextIO = None) -> None:
+        super().__init__(source, output)
+        self.tokens = ByteTokenBuffer(source)
+
+    def fallback(self, start: int, line: int) -> int:
+        # the character scanner needs text, so a window of the source is
+        #     decoded; tokens it is handed here are single characters or
+        #     identifiers and numbers that run into non-ascii text, so the
+        #     window only grows while such a token fills it
+        size = self.window
+        while True:
+            end = min(start + size, len(self.source))
+            # never split a character
+            while end < len(self.source) and self.source[end] & 0xC0 == 0x80:
+                end += 1
+            text = self.source[start:end].decode()
+
+            scanner = Scanner(text, self.output)
+            scanner.scan_token()
+            # a token that reaches the last character may go on past the
+            #     window (a number stops before a dot it cannot see a digit
+            #     after); errors are for single characters and already printed
+            if scanner.current < len(text) - 1 or scanner.had_error or end == len(self.source):
+                break
+            size *= 2
+
+        length = len(text[: scanner.current].encode())
+        self.had_error = self.had_error or scanner.had_error
+        self.errors.extend((line, message) for _, message in scanner.errors)
+
+        for index in range(len(scanner.tokens)):
+            self.tokens.append(scanner.tokens.types[index], start, length, line)
+
+        return start + length
@@ -9,8 +9,10 @@ __all__ = [
     "Statement",
     "Block"
     "Expression"
+    "If"
     "Print"
     "Var"
+    "While"
 ]
 
 class StatementVisitor(ABC):
@@ -22,6 +24,10 @@ class StatementVisitor(ABC):
     def visit_expression_statement(self, statement: 'Expression'):
         pass
 
+    @abstractmethod
+    def visit_if_statement(self, statement: 'Expression'):
+        pass
+
     @abstractmethod
     def visit_print_statement(self, statement: 'Expression'):
         pass
@@ -30,41 +36,91 @@ class StatementVisitor(ABC):
     def visit_var_statement(self, statement: 'Expression'):
         pass
 
+    @abstractmethod
+    def visit_while_statement(self, statement: 'Expression'):
+        pass
+
 
 class Statement(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: StatementVisitor):
         pass
 
 
 class Block(Statement):
-    def __init__(self, statements: List[Statement]) -> None:
+    __slots__ = ('statements', 'slots', 'line')
+
+    def __init__(self, statements: List[Statement], slots: int = 0, line: int = None) -> None:
         self.statements = statements
+        self.slots = slots
+        self.line = line
 
     def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
         return visitor.visit_block_statement(self)
 
 
 class Expression(Statement):
-    def __init__(self, expression: Expression) -> None:
+    __slots__ = ('expression', 'line', 'deep')
+
+    def __init__(self, expression: Expression, line: int = None, deep: bool = False) -> None:
         self.expression = expression
+        self.line = line
+        self.deep = deep
 
     def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
         return visitor.visit_expression_statement(self)
 
 
+class If(Statement):
+    __slots__ = ('condition', 'then_branch', 'else_branch', 'line', 'deep')
+
+    def __init__(self, condition: Expression, then_branch: Statement, else_branch: Statement, line: int = None, deep: bool = False) -> None:
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+        self.line = line
+        self.deep = deep
+
+    def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
+        return visitor.visit_if_statement(self)
+
+
 class Print(Statement):
-    def __init__(self, expression: Expression) -> None:
+    __slots__ = ('expression', 'line', 'deep')
+
+    def __init__(self, expression: Expression, line: int = None, deep: bool = False) -> None:
         self.expression = expression
+        self.line = line
+        self.deep = deep
 
     def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
         return visitor.visit_print_statement(self)
 
 
 class Var(Statement):
-    def __init__(self, name: Token, initializer: Expression) -> None:
+    __slots__ = ('name', 'initializer', 'slot', 'line', 'deep')
+
+    def __init__(self, name: Token, initializer: Expression, slot: int = None, line: int = None, deep: bool = False) -> None:
         self.name = name
         self.initializer = initializer
+        self.slot = slot
+        self.line = line
+        self.deep = deep
 
     def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
         return visitor.visit_var_statement(self)
+
+
+class While(Statement):
+    __slots__ = ('condition', 'body', 'line', 'deep')
+
+    def __init__(self, condition: Expression, body: Statement, line: int = None, deep: bool = False) -> None:
+        self.condition = condition
+        self.body = body
+        self.line = line
+        self.deep = deep
+
+    def accept(self, visitor: StatementVisitor) -> ExpressionVisitor:
+        return visitor.visit_while_statement(self)
@@ -1,8 +1,11 @@
-from enum import Enum, unique
+from array import array
+from enum import IntEnum, unique
+from mmap import mmap
+from typing import Any, Union
 
 
 @unique
-class TokenType(Enum):
+class TokenType(IntEnum):
     # Single-character tokens.
     LEFT_PAREN = 1
     RIGHT_PAREN = 2
@@ -52,6 +55,11 @@ class TokenType(Enum):
     EOF = 39
 
 
+Buffer = Union[bytes, mmap]
+
+# code stored in a TokenBuffer -> TokenType, cheaper than TokenType(code)
+token_types = {type.value: type for type in TokenType}
+
 keywords = {
     "and": TokenType.AND,
     "class": TokenType.CLASS,
@@ -79,8 +87,71 @@ class Token:
         self.literal = literal
         self.line = line
 
+    def __reduce__(self) -> tuple:
+        # much smaller and faster to load than the default copy of __dict__
+        return Token, (self.type, self.lexeme, self.literal, self.line)
+
     def __str__(self) -> str:
         return f"{self.type} {self.lexeme} {self.literal}"
 
     def __repr__(self) -> str:
         return f"{self.type} {self.lexeme} {self.literal}"
+
+
+class TokenBuffer:
+    # one token per index across parallel columns; lexemes and literal
+    #     values are recomputed from the source only when asked for
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array('i')
+        # offsets are absolute, and a memory mapped script can be larger
+        #     than a signed 32 bit column holds
+        self.starts = array('q')
+        self.lengths = array('q')
+        self.lines = array('q')
+
+    def append(self, type: TokenType, start: int, length: int, line: int) -> None:
+        self.types.append(type)
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def clear(self) -> None:
+        del self.types[:], self.starts[:], self.lengths[:], self.lines[:]
+
+    def lexeme(self, index: int) -> str:
+        start = self.starts[index]
+        return self.source[start: start + self.lengths[index]]
+
+    def literal(self, index: int) -> Any:
+        match self.types[index]:
+            case TokenType.NUMBER:
+                return float(self.lexeme(index))
+            case TokenType.STRING:
+                start = self.starts[index]
+                return self.source[start + 1: start + self.lengths[index] - 1]
+
+        return None
+
+    def token(self, index: int) -> Token:
+        return Token(token_types[self.types[index]], self.lexeme(index),
+                     self.literal(index), self.lines[index])
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        return self.token(index)
+
+
+class ByteTokenBuffer(TokenBuffer):
+    # a TokenBuffer over utf-8 encoded bytes rather than text
+    def lexeme(self, index: int) -> str:
+        start = self.starts[index]
+        return self.source[start: start + self.lengths[index]].decode()
+
+    def literal(self, index: int) -> Any:
+        if self.types[index] == TokenType.STRING:
+            return self.lexeme(index)[1:-1]
+
+        return super().literal(index)
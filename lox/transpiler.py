@@ -0,0 +1,557 @@
+from math import isfinite
+from types import CodeType
+from typing import Any, Dict, List, NamedTuple, Optional, TextIO, Tuple
+from lox.tokens import Token, TokenType
+from lox.expression import Expression as ExprExpression, ExpressionVisitor, Literal, Grouping, Unary, Binary, Call, Get, Set, Assign, Variable
+from lox.statement import Expression as StmtExpression, Statement, StatementVisitor, Block, If, Print, Var, While
+from lox.errors import LoxRuntimeError, NestingError
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.rope import ROPE_MIN, Rope, concat
+from lox.array import binary, negate
+from lox.natives import Native, NativeError, function_of
+from lox.instances import Site
+
+
+NoneType = type(None)
+
+# python's limit on nested blocks, which is all loops
+MAX_LOOPS = 20
+# python's limit on levels of indentation, less the one of __lox_main__
+MAX_INDENT = 98
+
+binary_operators = {
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.STAR: '*',
+    TokenType.SLASH: '/',
+    TokenType.GREATER: '>',
+    TokenType.GREATER_EQUAL: '>=',
+    TokenType.LESS: '<',
+    TokenType.LESS_EQUAL: '<=',
+    TokenType.EQUAL_EQUAL: '==',
+    TokenType.BANG_EQUAL: '!=',
+}
+
+
+class Operand(NamedTuple):
+    # python expression producing the value
+    code: str
+    # statically known python type of the value, None when unknown; str
+    #     stands for either kind of lox string, str or Rope, and bool for
+    #     a boolean or an array of them, which is always truthy
+    type: Optional[type]
+    # constants and temporaries can be reused without re-evaluating anything
+    atomic: bool
+
+
+def error(line: int, token_type: str, lexeme: str, message: str) -> LoxRuntimeError:
+    return LoxRuntimeError(Token(TokenType[token_type], lexeme, None, line), message)
+
+
+# where the generated checks for numbers fail: the operator applied to
+#     arrays, or the error the operator raises
+def operation(line: int, token_type: str, lexeme: str, left: Any, right: Any) -> Any:
+    return binary(Token(TokenType[token_type], lexeme, None, line), left, right)
+
+
+def negation(line: int, token_type: str, lexeme: str, value: Any) -> Any:
+    return negate(Token(TokenType[token_type], lexeme, None, line), value)
+
+
+# what a call site calls, checked against its number of arguments: a fixed
+#     call site calls native once, with the callee's name, others callable
+def native(values: Dict[str, Any], name_line: int, name: str, line: int, count: int) -> Any:
+    if name not in values:
+        raise error(name_line, 'IDENTIFIER', name, f"Undefined variable '{name}'.")
+    return callable_(line, values[name], count)
+
+
+def callable_(line: int, callee: Any, count: int) -> Any:
+    # the token is only made for the error
+    if type(callee) is Native and callee.arity == count:
+        return callee.function
+    return function_of(Token(TokenType.RIGHT_PAREN, ")", None, line), callee, count)
+
+
+# the inline cache of a property access, made for every run
+def site(name_line: int, name: str, line: int = None, count: int = 0) -> Site:
+    paren = Token(TokenType.RIGHT_PAREN, ")", None, line) if line is not None else None
+    return Site(Token(TokenType.IDENTIFIER, name, None, name_line), paren, count)
+
+
+def runtime(globals: Globals, stdout: TextIO = None) -> Dict[str, Any]:
+    namespace = {
+        "_stringify": Interpreter.stringify,
+        "_error": error,
+        "_operation": operation,
+        "_negation": negation,
+        "_native": native,
+        "_callable": callable_,
+        "_site": site,
+        "_NativeError": NativeError,
+        "_globals": globals.values,
+        "_concat": concat,
+        "_strings": (str, Rope),
+    }
+    # the generated print calls find this before the builtin
+    if stdout is not None:
+        write = stdout.write
+        namespace["print"] = lambda text: write(text + "\n")
+
+    return namespace
+
+
+def run(code: CodeType, globals: Globals = None, stdout: TextIO = None) -> None:
+    exec(code, runtime(globals if globals is not None else Globals(), stdout))
+
+
+class Transpiler(ExpressionVisitor, StatementVisitor):
+    def __init__(self) -> None:
+        # python line, lox line, and whether it calls something
+        self.lines: List[Tuple[str, int, bool]] = []
+        self.line = 1
+        self.indent = 0
+        # while loops around what is being transpiled
+        self.loops = 0
+        self.temps = 0
+        # python names of the locals in every block that has any, innermost
+        #     last, indexed the same way as the resolver's (depth, slot)
+        self.scopes: List[List[str]] = []
+        self.locals = 0
+        # python source line -> lox source line, filled in by transpile()
+        self.line_map: Dict[int, int] = {}
+        # code -> value of the string constants emitted
+        self.strings: Dict[str, str] = {}
+        # fixed call sites, each a python local holding what it calls
+        self.sites = 0
+        # the arguments of the property sites, each a python local too
+        self.properties: List[str] = []
+
+    def transpile(self, statements: List[Statement]) -> str:
+        self.lines = []
+        self.line = 1
+        self.indent = 0
+        self.loops = 0
+        self.scopes = []
+        self.locals = 0
+        self.sites = 0
+        self.properties = []
+
+        for statement in statements:
+            self.execute(statement)
+
+        source = ["def __lox_main__():"]
+        source.extend(f"    _c{site} = None" for site in range(self.sites))
+        source.extend(f"    _p{index} = _site({arguments})" for index, arguments in enumerate(self.properties))
+        self.line_map = {}
+        # python line -> lox line of the calls
+        calls = {}
+        previous_line = None
+
+        for text, line, call in self.lines:
+            if line != previous_line:
+                indent = text[:len(text) - len(text.lstrip())]
+                source.append(f"    {indent}# line {line}")
+                previous_line = line
+
+            source.append(f"    {text}")
+            self.line_map[len(source)] = line
+            if call:
+                calls[len(source)] = line
+
+        if not self.lines:
+            source.append("    pass")
+
+        # natives failing are reported at the call they failed in, found by
+        #     the line __lox_main__ was at. a handler out here rather than
+        #     around every call leaves all of python's 20 nested blocks to
+        #     the loops
+        source.append("")
+        source.append(f"_calls = {calls!r}")
+        source.append("try:")
+        source.append("    __lox_main__()")
+        source.append("except _NativeError as _e:")
+        source.append("    _line = _calls.get(_e.__traceback__.tb_next.tb_lineno)")
+        source.append("    if _line is None:")
+        source.append("        raise")
+        source.append("    raise _error(_line, 'RIGHT_PAREN', ')', str(_e))")
+        source.append("")
+
+        return "\n".join(source)
+
+    def compile(self, statements: List[Statement], filename: str = "<lox>") -> CodeType:
+        # the code object is self-contained (error locations are inlined as
+        #     constants), so it can be marshalled and cached as is
+        return compile(self.transpile(statements), filename, "exec")
+
+    def evaluate(self, expr: ExprExpression) -> Operand:
+        return expr.accept(self)
+
+    def execute(self, stmt: Statement) -> None:
+        # temporaries never outlive the statement that created them
+        self.temps = 0
+        stmt.accept(self)
+
+    def emit(self, text: str, position: int = None, call: bool = False) -> None:
+        text = "    " * self.indent + text
+
+        if position is None:
+            self.lines.append((text, self.line, call))
+        else:
+            self.lines.insert(position, (text, self.line, call))
+
+    def temporary(self, operand: Operand, position: int = None) -> Operand:
+        if operand.atomic:
+            return operand
+
+        name = f"_t{self.temps}"
+        self.temps += 1
+        self.emit(f"{name} = {operand.code}", position)
+
+        return Operand(name, operand.type, True)
+
+    def raise_error(self, condition: str, operator: Token, message: str) -> None:
+        self.emit(f"if {condition}: raise _error({operator.line}, "
+                  f"{operator.type.name!r}, {operator.lexeme!r}, {message!r})")
+
+    def check_global(self, name: Token) -> None:
+        self.raise_error(f"{name.lexeme!r} not in _globals", name,
+                         f"Undefined variable '{name.lexeme}'.")
+
+    def local(self, depth: int, slot: int) -> str:
+        return self.scopes[-1 - depth][slot]
+
+    @staticmethod
+    def truthy(value: Operand) -> str:
+        # callers pin non-bool values first, so they are already evaluated
+        #     and only the truthiness of their type is left to decide
+        if value.type is bool:
+            return value.code
+        elif value.type is NoneType:
+            return "False"
+        elif value.type is not None:
+            return "True"
+
+        return f"{value.code} is not None and {value.code} is not False"
+
+    @classmethod
+    def falsey(cls, value: Operand) -> str:
+        return f"not ({cls.truthy(value)})"
+
+    @staticmethod
+    def constant(value: Any) -> Operand:
+        if isinstance(value, float) and not isfinite(value):
+            return Operand(f"float('{value}')", float, True)
+
+        return Operand(repr(value), type(value), True)
+
+    def string(self, value: str) -> Operand:
+        operand = self.constant(value)
+        self.strings[operand.code] = value
+        return operand
+
+    def string_constant(self, operand: Operand) -> Optional[str]:
+        return self.strings.get(operand.code) if operand.type is str else None
+
+    def visit_literal_expression(self, expr: Literal) -> Operand:
+        if type(expr.value) is str:
+            return self.string(expr.value)
+        return self.constant(expr.value)
+
+    def visit_grouping_expression(self, expr: Grouping) -> Operand:
+        return self.evaluate(expr.expression)
+
+    def visit_unary_expression(self, expr: Unary) -> Operand:
+        self.line = expr.operator.line
+        right = self.evaluate(expr.right)
+
+        match expr.operator.type:
+            case TokenType.MINUS:
+                if right.type is float:
+                    return Operand(f"(-{right.code})", float, False)
+
+                right = self.temporary(right)
+                fallback = self.operation("_negation", expr.operator, right)
+                return Operand(f"(-{right.code} if type({right.code}) is float else {fallback})", None, False)
+            case TokenType.BANG:
+                if right.type is bool:
+                    return Operand(f"(not {right.code})", bool, False)
+
+                # every other type has a fixed truthiness, but the operand
+                #     still has to run for its errors
+                right = self.temporary(right)
+                if right.type is NoneType:
+                    return self.constant(True)
+                elif right.type is not None:
+                    return self.constant(False)
+
+                return Operand(f"({right.code} is None or {right.code} is False)", bool, False)
+
+        raise ValueError(f"Unknown unary operator '{expr.operator.lexeme}'.")
+
+    def visit_binary_expression(self, expr: Binary) -> Operand:
+        operator = expr.operator
+        self.line = operator.line
+
+        left = self.evaluate(expr.left)
+        mark = len(self.lines)
+        right = self.evaluate(expr.right)
+        symbol = binary_operators[operator.type]
+
+        match operator.type:
+            case TokenType.PLUS:
+                return self.add(operator, left, right, mark)
+            case TokenType.EQUAL_EQUAL | TokenType.BANG_EQUAL:
+                needs_check = False
+                result_type = bool
+            case TokenType.MINUS | TokenType.STAR | TokenType.SLASH:
+                needs_check = left.type is not float or right.type is not float
+                # or an array, unless both are known to be numbers
+                result_type = float if not needs_check else None
+            case _:
+                needs_check = left.type is not float or right.type is not float
+                result_type = bool
+
+        # left has to be evaluated before anything right emits, so pin it
+        #     into a temporary ahead of right's statements
+        if needs_check or len(self.lines) > mark:
+            left = self.temporary(left, mark)
+        if needs_check:
+            right = self.temporary(right)
+
+            checks = [f"type({operand.code}) is float" for operand in (left, right) if operand.type is not float]
+            return Operand(f"({left.code} {symbol} {right.code} if {' and '.join(checks)}"
+                           f" else {self.operation('_operation', operator, left, right)})", result_type, False)
+
+        return Operand(f"({left.code} {symbol} {right.code})", result_type, False)
+
+    @staticmethod
+    def operation(function: str, operator: Token, *operands: Operand) -> str:
+        arguments = ", ".join(operand.code for operand in operands)
+        return f"{function}({operator.line}, {operator.type.name!r}, {operator.lexeme!r}, {arguments})"
+
+
+    def add(self, operator: Token, left: Operand, right: Operand, mark: int) -> Operand:
+        # strings are joined by _concat, which may keep them as a rope
+        if len(self.lines) > mark:
+            left = self.temporary(left, mark)
+
+        if left.type is float and right.type is float:
+            return Operand(f"({left.code} + {right.code})", float, False)
+
+        # short strings known now are joined now, as python would fold them
+        #     had they been added with +
+        left_value, right_value = self.string_constant(left), self.string_constant(right)
+        if left_value is not None and right_value is not None and len(left_value) + len(right_value) < ROPE_MIN:
+            return self.string(left_value + right_value)
+
+        if left.type is str and right.type is str:
+            return Operand(f"_concat({left.code}, {right.code})", str, False)
+
+        left = self.temporary(left, mark)
+        right = self.temporary(right)
+        message = 'Cannot add a number and a string.'
+
+        # with one side known the other has to match it, or be an array
+        if float in (left.type, right.type):
+            checks = [f"type({operand.code}) is float" for operand in (left, right) if operand.type is not float]
+            return Operand(f"({left.code} + {right.code} if {' and '.join(checks)}"
+                           f" else {self.operation('_operation', operator, left, right)})", None, False)
+        if str in (left.type, right.type):
+            checks = [f"type({operand.code}) not in _strings"
+                      for operand in (left, right) if operand.type is not str]
+            self.raise_error(" or ".join(checks), operator, message)
+            return Operand(f"_concat({left.code}, {right.code})", str, False)
+
+        return Operand(f"({left.code} + {right.code} if type({left.code}) is float and type({right.code}) is float"
+                       f" else _concat({left.code}, {right.code})"
+                       f" if type({left.code}) in _strings and type({right.code}) in _strings"
+                       f" else {self.operation('_operation', operator, left, right)})", None, False)
+
+    def property(self, arguments: str) -> str:
+        self.properties.append(arguments)
+        return f"_p{len(self.properties) - 1}"
+
+    def visit_call_expression(self, expr: Call) -> Operand:
+        paren = expr.paren
+        count = len(expr.arguments)
+
+        # the callee is checked against the number of arguments before they
+        #     are evaluated; a fixed call site does so on its first call only
+        arguments: List[Operand] = []
+        if expr.fixed:
+            name = expr.callee.name
+            self.line = name.line
+            callee = Operand(f"_c{self.sites}", None, True)
+            self.sites += 1
+            self.emit(f"if {callee.code} is None: {callee.code} = _native(_globals, {name.line}, "
+                      f"{name.lexeme!r}, {paren.line}, {count})")
+        elif type(expr.callee) is Get:
+            # a method called right away is looked up before the arguments
+            #     run, and gets the instance as its first argument
+            name = expr.callee.name
+            instance = self.temporary(self.evaluate(expr.callee.object))
+            self.line = name.line
+            site = self.property(f"{name.line}, {name.lexeme!r}, {paren.line}, {count}")
+            callee = self.temporary(Operand(f"{site}.method({instance.code})", None, False))
+            arguments.append(instance)
+        else:
+            callee = self.evaluate(expr.callee)
+            self.line = paren.line
+            callee = self.temporary(Operand(f"_callable({paren.line}, {callee.code}, {count})", None, False))
+
+        # every argument has to be evaluated before anything a later one
+        #     emits, so earlier ones are pinned ahead of its statements
+        for argument in expr.arguments:
+            mark = len(self.lines)
+            value = self.evaluate(argument)
+
+            if len(self.lines) > mark:
+                for index, earlier in enumerate(arguments):
+                    if not earlier.atomic:
+                        arguments[index] = self.temporary(earlier, mark)
+                        mark += 1
+            arguments.append(value)
+
+        # a statement of its own, so natives failing can be reported at the
+        #     call, without a handler on the way when they do not
+        self.line = paren.line
+        result = Operand(f"_t{self.temps}", None, True)
+        self.temps += 1
+        self.emit(f"{result.code} = {callee.code}({', '.join(argument.code for argument in arguments)})", call=True)
+
+        return result
+
+    def visit_get_expression(self, expr: Get) -> Operand:
+        instance = self.evaluate(expr.object)
+        self.line = expr.name.line
+        site = self.property(f"{expr.name.line}, {expr.name.lexeme!r}")
+        # not atomic, like a variable: a later set could change the field
+        return Operand(f"{site}.get({instance.code})", None, False)
+
+    def visit_set_expression(self, expr: Set) -> Operand:
+        instance = self.evaluate(expr.object)
+        mark = len(self.lines)
+        value = self.evaluate(expr.value)
+        if len(self.lines) > mark:
+            instance = self.temporary(instance, mark)
+
+        self.line = expr.name.line
+        site = self.property(f"{expr.name.line}, {expr.name.lexeme!r}")
+        return self.temporary(Operand(f"{site}.set({instance.code}, {value.code})", None, False))
+
+    def visit_assign_expression(self, expr: Assign) -> Operand:
+        self.line = expr.name.line
+        # the assigned value, not the variable, is the result; the variable
+        #     could be reassigned again before the result is used
+        value = self.temporary(self.evaluate(expr.value))
+
+        if expr.depth is None:
+            self.check_global(expr.name)
+            self.emit(f"_globals[{expr.name.lexeme!r}] = {value.code}")
+        else:
+            self.emit(f"{self.local(expr.depth, expr.slot)} = {value.code}")
+
+        return value
+
+    def visit_variable_expression(self, expr: Variable) -> Operand:
+        self.line = expr.name.line
+
+        # variables are not atomic, a later assignment in the same
+        #     expression must not change a value that was already read
+        if expr.depth is None:
+            self.check_global(expr.name)
+            return Operand(f"_globals[{expr.name.lexeme!r}]", None, False)
+
+        return Operand(self.local(expr.depth, expr.slot), None, False)
+
+    def visit_expression_statement(self, statement: StmtExpression) -> None:
+        value = self.evaluate(statement.expression)
+
+        if not value.atomic:
+            self.emit(value.code)
+
+    def nest(self, line: int) -> None:
+        # indents what is emitted next one more level
+        if self.indent == MAX_INDENT:
+            raise NestingError(line, "Statements nested too deeply for the python engine.")
+        self.indent += 1
+
+    def branch(self, statement: Statement) -> None:
+        self.nest(statement.line)
+        start = len(self.lines)
+
+        self.execute(statement)
+        if len(self.lines) == start:
+            self.emit("pass")
+
+        self.indent -= 1
+
+    def visit_if_statement(self, statement: If) -> None:
+        condition = self.evaluate(statement.condition)
+        if condition.type is not bool:
+            condition = self.temporary(condition)
+
+        self.emit(f"if {self.truthy(condition)}:")
+        self.branch(statement.then_branch)
+
+        if statement.else_branch is not None:
+            self.emit("else:")
+            self.branch(statement.else_branch)
+
+    def visit_print_statement(self, statement: Print) -> None:
+        value = self.evaluate(statement.expression)
+        self.emit(f"print(_stringify({value.code}))")
+
+    def visit_block_statement(self, statement: Block) -> None:
+        if statement.slots:
+            self.scopes.append([None] * statement.slots)
+
+        for inner in statement.statements:
+            self.execute(inner)
+
+        if statement.slots:
+            self.scopes.pop()
+
+    def visit_var_statement(self, statement: Var) -> None:
+        self.line = statement.name.line
+
+        # every declaration gets its own python local, so shadowing never
+        #     aliases; it is named before the initializer runs since the
+        #     initializer may already assign to it. lox takes identifiers
+        #     python does not, e.g. x², so the lox name is only a comment
+        comment = ""
+        if statement.slot is None:
+            name = f"_globals[{statement.name.lexeme!r}]"
+        else:
+            name = f"_l{self.locals}"
+            comment = f"  # {statement.name.lexeme}"
+            self.locals += 1
+            self.scopes[-1][statement.slot] = name
+
+        if statement.initializer is None:
+            value = self.constant(None)
+        else:
+            value = self.evaluate(statement.initializer)
+
+        self.emit(f"{name} = {value.code}{comment}")
+
+    def visit_while_statement(self, statement: While) -> None:
+        # every loop is a block to python, which compiles no more than 20
+        #     nested ones
+        if self.loops == MAX_LOOPS:
+            raise NestingError(statement.line, "Loops nested too deeply for the python engine.")
+        self.loops += 1
+
+        self.emit("while True:")
+        self.nest(statement.line)
+
+        condition = self.evaluate(statement.condition)
+        if condition.type is not bool:
+            condition = self.temporary(condition)
+        self.emit(f"if {self.falsey(condition)}: break")
+
+        self.execute(statement.body)
+        self.indent -= 1
+        self.loops -= 1
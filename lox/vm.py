@@ -0,0 +1,259 @@
+from typing import TextIO
+from lox.compiler import Chunk, OpCode
+from lox.environment import Environment, Globals
+from lox.interpreter import Interpreter, LoxRuntimeError
+from lox.rope import Rope, concat
+from lox.array import binary, negate
+from lox.natives import NativeError, function_of
+
+
+class VM:
+    def __init__(self, globals: Globals = None, stdout: TextIO = None) -> None:
+        self.globals = globals if globals is not None else Globals()
+        # where print writes, sys.stdout when None
+        self.stdout = stdout
+
+    def interpret(self, chunk: Chunk) -> None:
+        self.run(chunk)
+
+    def run(self, chunk: Chunk) -> None:
+        code = chunk.code
+        constants = chunk.constants
+        globals = self.globals.values
+        stringify = Interpreter.stringify
+        stdout = self.stdout
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        environment = None
+        # what each fixed call site calls, looked up on its first call
+        sites = [None] * chunk.sites
+        properties = chunk.properties
+
+        # opcodes bound to locals so every comparison in the dispatch loop
+        #     is a LOAD_FAST instead of an enum attribute lookup
+        CONSTANT = OpCode.CONSTANT.value
+        NIL = OpCode.NIL.value
+        TRUE = OpCode.TRUE.value
+        FALSE = OpCode.FALSE.value
+        POP = OpCode.POP.value
+        ADD = OpCode.ADD.value
+        SUBTRACT = OpCode.SUBTRACT.value
+        MULTIPLY = OpCode.MULTIPLY.value
+        DIVIDE = OpCode.DIVIDE.value
+        GREATER = OpCode.GREATER.value
+        GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+        LESS = OpCode.LESS.value
+        LESS_EQUAL = OpCode.LESS_EQUAL.value
+        EQUAL = OpCode.EQUAL.value
+        NOT_EQUAL = OpCode.NOT_EQUAL.value
+        NEGATE = OpCode.NEGATE.value
+        NOT = OpCode.NOT.value
+        PRINT = OpCode.PRINT.value
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+        GET_GLOBAL = OpCode.GET_GLOBAL.value
+        SET_GLOBAL = OpCode.SET_GLOBAL.value
+        DEFINE_LOCAL = OpCode.DEFINE_LOCAL.value
+        GET_LOCAL = OpCode.GET_LOCAL.value
+        SET_LOCAL = OpCode.SET_LOCAL.value
+        PUSH_SCOPE = OpCode.PUSH_SCOPE.value
+        POP_SCOPE = OpCode.POP_SCOPE.value
+        JUMP = OpCode.JUMP.value
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        CALLABLE = OpCode.CALLABLE.value
+        NATIVE = OpCode.NATIVE.value
+        CALL = OpCode.CALL.value
+        GET_PROPERTY = OpCode.GET_PROPERTY.value
+        SET_PROPERTY = OpCode.SET_PROPERTY.value
+        INVOKE = OpCode.INVOKE.value
+
+        ip = 0
+        end = len(code)
+
+        while ip < end:
+            op = code[ip]
+            ip += 1
+
+            if op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == GET_LOCAL:
+                depth = code[ip]
+                scope = environment
+                while depth:
+                    scope = scope.enclosing
+                    depth -= 1
+                push(scope.values[code[ip + 1]])
+                ip += 2
+            elif op == SET_LOCAL:
+                depth = code[ip]
+                scope = environment
+                while depth:
+                    scope = scope.enclosing
+                    depth -= 1
+                scope.values[code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals:
+                    raise self.error(chunk, ip - 1, f"Undefined variable '{name}'.")
+                push(globals[name])
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals:
+                    raise self.error(chunk, ip - 1, f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == JUMP:
+                ip = code[ip]
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif (type(left) is str or type(left) is Rope) and (type(right) is str or type(right) is Rope):
+                    stack[-1] = concat(left, right)
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left / right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == NATIVE:
+                function = sites[code[ip + 2]]
+                if function is None:
+                    name = constants[code[ip]]
+                    if name not in globals:
+                        # the name operand carries the callee's token
+                        raise LoxRuntimeError(chunk.tokens[ip], f"Undefined variable '{name}'.")
+                    function = sites[code[ip + 2]] = function_of(chunk.tokens[ip - 1], globals[name], code[ip + 1])
+                push(function)
+                ip += 3
+            elif op == CALL:
+                count = code[ip]
+                ip += 1
+                try:
+                    if count == 1:
+                        argument = pop()
+                        stack[-1] = stack[-1](argument)
+                    elif count == 0:
+                        stack[-1] = stack[-1]()
+                    else:
+                        arguments = stack[-count:]
+                        del stack[-count:]
+                        stack[-1] = stack[-1](*arguments)
+                except NativeError as error:
+                    raise self.error(chunk, ip - 1, str(error))
+            elif op == GET_PROPERTY:
+                stack[-1] = properties[code[ip]].get(stack[-1])
+                ip += 1
+            elif op == SET_PROPERTY:
+                value = pop()
+                stack[-1] = properties[code[ip]].set(stack[-1], value)
+                ip += 1
+            elif op == INVOKE:
+                instance = stack[-1]
+                stack[-1] = properties[code[ip]].method(instance)
+                push(instance)
+                ip += 1
+            elif op == PRINT:
+                if stdout is None:
+                    print(stringify(pop()))
+                else:
+                    stdout.write(stringify(pop()) + "\n")
+            elif op == POP:
+                pop()
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = binary(chunk.tokens[ip - 1], left, right)
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == NEGATE:
+                if type(stack[-1]) is float:
+                    stack[-1] = -stack[-1]
+                else:
+                    stack[-1] = negate(chunk.tokens[ip - 1], stack[-1])
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == DEFINE_LOCAL:
+                environment.values[code[ip]] = pop()
+                ip += 1
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == PUSH_SCOPE:
+                environment = Environment(environment, code[ip])
+                ip += 1
+            elif op == POP_SCOPE:
+                environment = environment.enclosing
+            elif op == CALLABLE:
+                stack[-1] = function_of(chunk.tokens[ip - 1], stack[-1], code[ip])
+                ip += 1
+            else:
+                raise RuntimeError(f"Unknown opcode {op} at {ip - 1}.")
+
+    @staticmethod
+    def error(chunk: Chunk, ip: int, message: str) -> LoxRuntimeError:
+        # ip has already moved past the failing instruction
+        return LoxRuntimeError(chunk.tokens[ip - 1], message)
@@ -0,0 +1,64 @@
+from io import StringIO
+from random import Random
+from typing import Tuple
+from unittest import TestCase, main
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.interpreter import LoxRuntimeError
+from lox.array import LoxArray
+
+
+def expression(random: Random, depth: int) -> str:
+    # no ! and no zero divisors: ! asks if an array is truthy, not its
+    #     elements, and scalar division by zero is not a lox error
+    if depth == 0 or random.random() < 0.25:
+        return random.choice(["x", "y", "x", "y", "2", "0.5", "-3", "true"])
+    if random.random() < 0.15:
+        return f"-{expression(random, depth - 1)}"
+    operator = random.choice(["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!="])
+    return f"({expression(random, depth - 1)} {operator} {expression(random, depth - 1)})"
+
+
+def outcome(engine: str, source: str, values: dict) -> Tuple[str, str]:
+    globals = Globals()
+    for name, value in values.items():
+        globals.define(name, value)
+
+    stdout = StringIO()
+    try:
+        LoxEngine(engine).compile(source).run(globals, stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class ArrayTest(TestCase):
+    # differential test: an expression over arrays must give, element by
+    #     element, what it gives over the numbers at each index
+    def test_random_expressions(self) -> None:
+        random = Random(0)
+        xs = [random.choice([1.0, 2.0, -0.5, 3.0]) for _ in range(5)]
+        ys = [random.choice([1.0, 2.0, 4.0, -1.0]) for _ in range(5)]
+        checked = 0
+
+        while checked < 300:
+            source = f"print {expression(random, 4)};"
+            if "x" not in source and "y" not in source:
+                continue
+
+            try:
+                scalars = [outcome("interpreter", source, {"x": x, "y": y}) for x, y in zip(xs, ys)]
+            except ZeroDivisionError:
+                continue
+            errors = [error for _, error in scalars if error]
+            expected = ("", errors[0]) if errors else \
+                ("[" + ", ".join(output.strip() for output, _ in scalars) + "]\n", "")
+
+            for engine in engines:
+                with self.subTest(engine=engine, source=source):
+                    self.assertEqual(outcome(engine, source, {"x": LoxArray(xs), "y": LoxArray(ys)}), expected)
+            checked += 1
+
+
+if __name__ == "__main__":
+    main()
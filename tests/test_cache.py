@@ -0,0 +1,71 @@
+import os
+import stat
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from lox.cache import CheckCache, ProgramCache
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+
+class CacheTest(TestCase):
+    def test_entries_follow_the_umask(self) -> None:
+        # not only readable by whoever wrote them, so a cache can be shared
+        with TemporaryDirectory() as directory:
+            program = ProgramCache(Path(directory))
+            program.store(program.key("print 1;"), Parser(Scanner("print 1;").scan_tokens()).parse())
+            # small enough that saving writes the file again from a
+            #     temporary one
+            clean = CheckCache(Path(directory), 100)
+            for key in ("a" * 64, "b" * 64):
+                clean.add(key)
+            clean.save()
+
+            paths = list(Path(directory).iterdir())
+            self.assertEqual(len(paths), 2)
+            # the mode of a file made the usual way
+            reference = Path(directory) / "reference"
+            reference.write_text("")
+            for path in paths:
+                with self.subTest(path=path.name):
+                    self.assertEqual(stat.S_IMODE(path.stat().st_mode), stat.S_IMODE(reference.stat().st_mode))
+
+    def test_entries_of_other_users(self) -> None:
+        # in a sticky directory only the owner of an entry may touch or
+        #     remove it; for anyone else a hit is a hit and the rest a miss
+        denied = PermissionError(13, "Permission denied")
+        with TemporaryDirectory() as directory, \
+                patch("os.utime", side_effect=denied), patch.object(Path, "unlink", side_effect=denied):
+            program = ProgramCache(Path(directory), 0)
+            key = program.key("print 1;")
+            program.store(key, Parser(Scanner("print 1;").scan_tokens()).parse())
+            self.assertEqual(len(program.load(key)), 1)
+
+            program.path(key).write_bytes(b"damaged")
+            self.assertIsNone(program.load(key))
+
+    def test_entries_others_may_write_are_not_loaded(self) -> None:
+        # whoever may write an entry decides what loading it runs
+        with TemporaryDirectory() as directory:
+            program = ProgramCache(Path(directory))
+            key = program.key("print 1;")
+            program.store(key, Parser(Scanner("print 1;").scan_tokens()).parse())
+            self.assertIsNotNone(program.load(key))
+
+            program.path(key).chmod(0o666)
+            self.assertIsNone(program.load(key))
+            # left for its owner, rather than dropped like a damaged one
+            self.assertTrue(program.path(key).exists())
+
+            program.path(key).chmod(0o644)
+            with patch("os.getuid", return_value=12345):
+                self.assertIsNotNone(program.load(key))
+            # as a user who is neither its owner nor root
+            with patch.object(os, "fstat", lambda descriptor: os.stat_result(
+                    (0o100644, 0, 0, 1, 12345, 0, 0, 0, 0, 0))):
+                self.assertIsNone(program.load(key))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from lox.check import check_scripts, check_source
+from lox.engine import LoxEngine
+from lox.errors import CompileError
+from lox.lox import Lox
+from lox.output import Output
+
+
+# statements each broken in one way, and what checking them reports
+broken = [
+    ("print 1 +;", "[line {line}] Error at ';': Expect expression."),
+    ("var = 2;", "[line {line}] Error at '=': Expect variable name."),
+    ("print (3;", "[line {line}] Error at ';': Expect ')' after expression."),
+    ("1 + 2 = 3;", "[line {line}] Error at '=': Invalid assignment target."),
+    ("print f(1, ;", "[line {line}] Error at ';': Expect expression."),
+    ("print a.;", "[line {line}] Error at ';': Expect property name after '.'."),
+    ("if 1 print 2;", "[line {line}] Error at '1': Expect '(' after 'if'."),
+    ("{ var a = 1; var a = 2; }", "[line {line}] Error at 'a': Already a variable with this name in this scope."),
+    ("{ var b = b; }", "[line {line}] Error at 'b': Can't read local variable in its own initializer."),
+    ("print 1 @;", "[line {line}] Error: Unexpected character."),
+]
+
+
+class CheckTest(TestCase):
+    def test_random_scripts(self) -> None:
+        # every broken statement in a script is reported, and the first of
+        #     them is what compiling the script reports too
+        random = Random(0)
+
+        for _ in range(500):
+            lines = ["var ok = 1;"]
+            expected = []
+            for _ in range(random.randint(1, 6)):
+                statement, message = random.choice(broken)
+                lines.append(statement)
+                expected.append(message.format(line=len(lines)))
+                lines.append("print ok;")
+
+            source = "\n".join(lines)
+            diagnostics = check_source(source)
+            found = [diagnostic["text"] for diagnostic in diagnostics]
+            with self.subTest(source=source):
+                self.assertEqual(found, expected)
+
+            # compiling stops at the first parse error, and resolves only a
+            #     script the scanner had nothing to say about
+            parsed = [diagnostic["text"] for diagnostic in diagnostics if diagnostic["phase"] == "parse"]
+            resolved = [diagnostic["text"] for diagnostic in diagnostics if diagnostic["phase"] == "resolve"]
+            scanned = any(diagnostic["phase"] == "scan" for diagnostic in diagnostics)
+            first = parsed[0] if parsed else None if scanned else resolved[0] if resolved else None
+            try:
+                LoxEngine().compile(source)
+            except CompileError as error:
+                if first is not None:
+                    with self.subTest(source=source):
+                        self.assertEqual(error.messages[-1], first)
+
+    def test_scripts_that_are_not_text(self) -> None:
+        # reported for the script alone; the others are still checked
+        with TemporaryDirectory() as directory:
+            binary = Path(directory) / "binary.lox"
+            binary.write_bytes(b"print 1;\nprint \"\xff\";\n")
+            clean = Path(directory) / "clean.lox"
+            clean.write_text("print 1;")
+            broken = Path(directory) / "broken.lox"
+            broken.write_text("print 1 +;")
+
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs):
+                    report = check_scripts([str(binary), str(clean), str(broken)], jobs=jobs)
+                    texts = [[found["text"] for found in result["diagnostics"]] for result in report["results"]]
+                    self.assertEqual(texts, [["[line 2] Error: Script is not valid UTF-8."], [],
+                                             ["[line 1] Error at ';': Expect expression."]])
+                    self.assertEqual(report["failed"], 2)
+
+    def test_running_reports_the_same(self) -> None:
+        # a script with parse or resolve errors is not run; running it
+        #     reports the first of them as checking it does, and exits 65
+        saved = Lox.output, Lox.had_error
+        try:
+            for statement, message in broken:
+                source = f"print 1;\n{statement}\nprint 2;"
+                found = [diagnostic for diagnostic in check_source(source) if diagnostic["phase"] != "scan"]
+                if not found:
+                    continue
+
+                Lox.use_output(Output(StringIO(), "explicit"))
+                Lox.had_error = False
+                stderr = StringIO()
+                with redirect_stderr(stderr):
+                    Lox.run(source)
+                with self.subTest(source=source):
+                    self.assertEqual(stderr.getvalue(), found[0]["text"])
+                    self.assertTrue(Lox.had_error)
+        finally:
+            output, Lox.had_error = saved
+            Lox.use_output(output)
+
+
+if __name__ == "__main__":
+    main()
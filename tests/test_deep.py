@@ -0,0 +1,142 @@
+from io import StringIO
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from typing import Tuple
+from unittest import TestCase, main
+from lox import resolver
+from lox.cache import ProgramCache
+from lox.check import check_source
+from lox.engine import LoxEngine, engines
+from lox.errors import CompileError
+from lox.interpreter import LoxRuntimeError
+from lox.optimizer import passes
+from lox.parser import MAX_NESTING
+from lox.transpiler import MAX_INDENT
+from tool.bench.deep import shapes
+from tool.bench.instances import classes
+
+
+def expression(random: Random, depth: int) -> str:
+    if depth <= 0 or random.random() < 0.2:
+        return random.choice(["x", "y", "1", "2.5", "\"s\"", "nil", "true", "p.x", "b.v", "p"])
+
+    choice = random.random()
+    if choice < 0.1:
+        return f"{random.choice(['-', '!'])}{expression(random, depth - 1)}"
+    if choice < 0.2:
+        return f"({expression(random, depth - 1)})"
+    if choice < 0.3:
+        return f"({random.choice(['x', 'y', 'p.x', 'b.v'])} = {expression(random, depth - 1)})"
+    if choice < 0.45:
+        callee = random.choice(["sqrt", "abs", "f", "p.move", "p.norm", "at", "nope", "p.x"])
+        arguments = ", ".join(expression(random, depth - 2) for _ in range(random.randint(0, 2)))
+        return f"{callee}({arguments})"
+    operator = random.choice(["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!="])
+    return f"{expression(random, depth - 1)} {operator} {expression(random, depth - 1)}"
+
+
+def outcome(source: str) -> Tuple[str, str]:
+    stdout = StringIO()
+    try:
+        LoxEngine("interpreter").compile(source).run(classes(), stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class DeepTest(TestCase):
+    # nesting far past python's recursion limit
+    depth = 5000
+
+    def setUp(self) -> None:
+        self.deep = resolver.DEEP
+
+    def tearDown(self) -> None:
+        resolver.DEEP = self.deep
+
+    def test_random_scripts(self) -> None:
+        # differential test: with DEEP at 0 every expression is resolved and
+        #     evaluated with the explicit stacks, which have to agree with the
+        #     recursion on results, errors and the order things happen in
+        random = Random(0)
+
+        for _ in range(300):
+            source = (f"var f = floor; var x = 1; var y = 2; var p = Point(3, 4); var b = Bag(); b.v = 0;\n"
+                      f"print {expression(random, 5)};\nx = {expression(random, 5)};\n"
+                      f"if ({expression(random, 3)}) print x; else print y;\n"
+                      f"{{ var z = {expression(random, 4)}; print z; print p.x + b.v; }}")
+            try:
+                resolver.DEEP = self.deep
+                expected = outcome(source)
+                resolver.DEEP = 0
+                actual = outcome(source)
+            except ZeroDivisionError:
+                continue
+
+            with self.subTest(source=source):
+                self.assertEqual(actual, expected)
+
+    def test_shapes(self) -> None:
+        # optimizing leaves deep statements as they are, and the cache
+        #     stores and loads them without recursing
+        with TemporaryDirectory() as directory:
+            cache = ProgramCache(Path(directory))
+
+            for name, (source, printed) in shapes.items():
+                for optimize in (False, True):
+                    engine = LoxEngine(passes=list(passes) if optimize else None, cache=cache)
+                    # the second compile loads what the first stored
+                    for _ in range(2):
+                        with self.subTest(shape=name, optimize=optimize):
+                            stdout = StringIO()
+                            engine.compile(source(self.depth)).run(stdout=stdout)
+                            self.assertEqual(stdout.getvalue(), printed(self.depth) + "\n")
+
+    def test_engines_refuse_what_they_cannot_take(self) -> None:
+        # the other engines compile by recursing; too deep for them is a
+        #     compile error on the line of the deep statement
+        source = "print 1;\n" + shapes["parentheses"][0](self.depth)
+
+        for engine in engines[1:]:
+            with self.subTest(engine=engine):
+                with self.assertRaises(CompileError) as raised:
+                    LoxEngine(engine).compile(source)
+                self.assertEqual(raised.exception.messages,
+                                 [f"[line 2] Error: Expression nested too deeply for the {engine} engine."])
+
+    def test_statements_nested_too_deeply(self) -> None:
+        # statements nest by recursing, in the parser and every stage after
+        #     it, so past MAX_NESTING they are an error on the line the
+        #     parser stopped at, for every engine and for the checker
+        source = "print 1;\n" + "{\n" * (MAX_NESTING + 1) + "}" * (MAX_NESTING + 1)
+        message = f"[line {MAX_NESTING + 2}] Error: Statements nested too deeply."
+
+        for engine in engines:
+            with self.subTest(engine=engine):
+                with self.assertRaises(CompileError) as raised:
+                    LoxEngine(engine).compile(source)
+                self.assertEqual(raised.exception.messages, [message])
+
+        self.assertEqual([found["text"] for found in check_source(source)], [message])
+
+    def test_statements_as_deep_as_they_may_be(self) -> None:
+        # the python engine indents every branch, and python compiles
+        #     fewer levels of indentation than MAX_NESTING
+        source = "if (true)\n" * (MAX_NESTING - 1) + "print 2;"
+
+        for engine in engines[:-1]:
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    stdout = StringIO()
+                    LoxEngine(engine, passes=list(passes) if optimize else None).compile(source).run(stdout=stdout)
+                    self.assertEqual(stdout.getvalue(), "2\n")
+
+        with self.assertRaises(CompileError) as raised:
+            LoxEngine("python").compile(source)
+        self.assertEqual(raised.exception.messages,
+                         [f"[line {MAX_INDENT + 2}] Error: Statements nested too deeply for the python engine."])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from typing import Tuple
+from unittest import TestCase, main
+from lox.engine import CompiledProgram, LoxEngine, engines
+from lox.environment import Globals
+from lox.interpreter import LoxRuntimeError
+from lox.natives import Native
+from tool.bench.corpus import mixed
+
+
+def outcome(program: CompiledProgram) -> Tuple[str, str]:
+    # the output of a run and the error it ended with, if any
+    stdout = StringIO()
+    try:
+        program.run(Globals(), stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class EmbeddingTest(TestCase):
+    # differential test: every run on every thread must see what a run on
+    #     its own does, with none of the others' output or errors
+    def test_threads_sharing_programs(self) -> None:
+        for engine in engines:
+            compiler = LoxEngine(engine)
+            programs = [
+                compiler.compile(mixed(200)),
+                compiler.compile(mixed(40) + "\nprint -\"not a number\";"),
+                compiler.compile("var a = 0; while (a < 300) { print a; a = a + 1; }"),
+            ]
+            expected = [outcome(program) for program in programs]
+
+            def worker(index: int) -> None:
+                for run in range(20):
+                    which = (index + run) % len(programs)
+                    self.assertEqual(outcome(programs[which]), expected[which],
+                                     f"{engine}: run {run} on thread {index}")
+
+            with ThreadPoolExecutor(8) as executor:
+                for future in [executor.submit(worker, index) for index in range(8)]:
+                    future.result()
+
+    def test_runs_with_their_own_globals(self) -> None:
+        # what a call site calls is looked up again in every run, in the
+        #     globals that run was given
+        for engine in engines:
+            program = LoxEngine(engine).compile("print scale(2); print scale(3);")
+            for factor in (10, 100, 10):
+                globals = Globals()
+                globals.define("scale", Native("scale", 1, lambda value, factor=factor: value * factor))
+                stdout = StringIO()
+                with self.subTest(engine=engine, factor=factor):
+                    self.assertIs(program.run(globals, stdout), globals)
+                    self.assertEqual(stdout.getvalue(), f"{2 * factor}\n{3 * factor}\n")
+
+    def test_python_errors_are_not_lox_errors(self) -> None:
+        # a RuntimeError from python, such as a RecursionError in a native,
+        #     is not a failure of the script and is raised as it is
+        def overflow() -> None:
+            raise RecursionError("maximum recursion depth exceeded")
+
+        for engine in engines:
+            globals = Globals()
+            globals.define("overflow", Native("overflow", 0, overflow))
+            with self.subTest(engine=engine), self.assertRaises(RecursionError):
+                LoxEngine(engine).compile("overflow();").run(globals, StringIO())
+
+        globals = Globals()
+        globals.define("overflow", Native("overflow", 0, overflow))
+        with self.assertRaises(RecursionError):
+            asyncio.run(LoxEngine().compile("overflow();").run_async(globals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from random import Random
+from typing import Any, Tuple
+from unittest import TestCase, main
+from lox.scanner import Scanner
+from lox.parser import Parser, ParseError
+from lox.incremental import Document
+from lox.tokens import Token
+from lox.expression import Expression as ExprExpression
+from lox.statement import Statement
+from tool.bench.corpus import mixed
+
+
+fragments = [
+    "var", "print", "if", "else", "while", "x", "v1", " ", "\n", "\n\n", "1", "2.5", "\"s\"", "\"",
+    "// note\n", "+", "-", "*", "/", "!", "==", "=", "<", "(", ")", "{", "}", ";", ";", ";", "@",
+]
+
+
+def dump(value: Any) -> Any:
+    # a tree as plain values, lines included, to compare parses with
+    if isinstance(value, Token):
+        return value.type, value.lexeme, value.literal, value.line
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    if isinstance(value, (ExprExpression, Statement)):
+        return type(value).__name__, [dump(getattr(value, name)) for name in type(value).__slots__]
+    return value
+
+
+def outcome(parse) -> Any:
+    try:
+        return dump(parse())
+    except ParseError as error:
+        return "error", dump(error.token), error.message
+
+
+def full(source: str) -> Tuple[Any, bool]:
+    scanner = Scanner(source)
+    tokens = scanner.scan_tokens()
+    return outcome(Parser(tokens).parse), scanner.had_error
+
+
+class DocumentTest(TestCase):
+    # differential test: after every random edit the document must parse
+    #     to what a full parse of its source does
+    def test_random_edits(self) -> None:
+        random = Random(0)
+
+        with redirect_stdout(StringIO()):
+            for case in range(200):
+                source = mixed(random.randint(0, 40)) if case % 2 else ""
+                document = Document(source)
+
+                for _ in range(30):
+                    offset = random.randint(0, len(source))
+                    # now and then across several statements
+                    longest = 8 if random.random() < 0.9 else 200
+                    deleted = random.randint(0, min(longest, len(source) - offset)) if random.random() < 0.5 else 0
+                    inserted = "".join(random.choice(fragments) for _ in range(random.randint(0, 3)))
+
+                    source = source[:offset] + inserted + source[offset + deleted:]
+                    document.edit(offset, deleted, inserted)
+
+                    self.assertEqual(document.source, source)
+                    self.assertEqual((outcome(document.parse), document.had_error), full(source), source)
+
+
+if __name__ == "__main__":
+    main()
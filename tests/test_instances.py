@@ -0,0 +1,88 @@
+from io import StringIO
+from typing import Tuple
+from unittest import TestCase, main
+from lox import instances
+from lox.engine import LoxEngine, engines
+from lox.interpreter import LoxRuntimeError
+from lox.optimizer import passes
+from tool.bench.instances import classes, fields, methods
+
+
+cases = [
+    "var p = Point(3, 4); print p.x; print p.y; print p.norm(); print p;",
+    "var p = Point(1, 2); p.move(1, 1).move(2, 2); print p.x + p.y; print p.add(Point(10, 0));",
+    "var b = Bag(); b.a = 1; b.b = b.a + 1; b.a = \"s\"; print b.a + \"!\"; print b.b;",
+    "var b = Bag(); print b.x = b.y = 3; print b.x + b.y;",
+    # bound methods are values, and remember their instance
+    "var p = Point(3, 4); var n = p.norm; p.x = 0; print n(); print n; var m = p.move; m(1, 1); print p.y;",
+    # a field shadows a method of the same name
+    "var p = Point(3, 4); p.norm = sqrt; print p.norm(16); print Point(6, 8).norm();",
+    # one site seeing instances of several shapes: polymorphic, then megamorphic
+    "var i = 0; var b = Bag(); while (i < 8) { var c = Bag(); if (i > 1) c.a = i; if (i > 3) c.b = i; "
+    "if (i > 5) c.c = i; c.v = i; b = c; print b.v; i = i + 1; }",
+    "var i = 0; while (i < 6) { var o = Point(i, 1); if (i > 2) o = Counter(); "
+    "if (i > 4) o = Bag(); o.v = i; print o.v; i = i + 1; }",
+    "var c = Counter(); var i = 0; while (i < 5) { c.tick(); i = i + 1; } print c.n;",
+    "var p = Point(1, 2); var x = p.x; p.x = (x = 10) + p.x; print p.x; print x;",
+    "print 1; print Point(1, 2).z;",
+    "var b = Bag(); print b.nothing();",
+    "print 1.x;",
+    "var s = \"a\"; print s.len();",
+    "nil.x = 1 + 2;",
+    "var b = Bag(); 1.y = b.x;",
+    "print Point(1);",
+    "print Point(1, 2).move(1);",
+    "var b = Bag(); b.f = 1; print b.f();",
+    "var p = Point(1, 2); p.n = p.norm; print p.n(1);",
+    "var b = Bag(); b.f = clock; print b.f(1 + nil);",
+    "var p = Point(1, 2); print p.add(1);",
+    "var b = Bag();\nb.a = 1;\nprint b\n  .a + b\n  .c;",
+]
+
+
+def outcome(engine: str, source: str, optimize: bool) -> Tuple[str, str]:
+    stdout = StringIO()
+    program = LoxEngine(engine, passes=list(passes) if optimize else None).compile(source)
+    try:
+        program.run(classes(), stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class InstancesTest(TestCase):
+    # differential test: fields, methods and their errors agree on every
+    #     engine, optimized or not, and with the caches on or off
+    def setUp(self) -> None:
+        self.polymorphic = instances.POLYMORPHIC
+
+    def tearDown(self) -> None:
+        instances.POLYMORPHIC = self.polymorphic
+
+    def test_cases(self) -> None:
+        for source in cases:
+            instances.POLYMORPHIC = self.polymorphic
+            expected = outcome("interpreter", source, False)
+            for size in (self.polymorphic, 1, 0):
+                instances.POLYMORPHIC = size
+                for engine in engines:
+                    for optimize in (False, True):
+                        with self.subTest(engine=engine, shapes=size, optimize=optimize, source=source):
+                            self.assertEqual(outcome(engine, source, optimize), expected)
+
+    def test_workloads(self) -> None:
+        # what tool/bench/instances.py times prints the same with the
+        #     caches on and off
+        for template in (fields, methods):
+            source = template.format(iterations=50)
+            instances.POLYMORPHIC = self.polymorphic
+            expected = outcome("interpreter", source, False)
+            for size in (self.polymorphic, 0):
+                instances.POLYMORPHIC = size
+                for engine in engines:
+                    with self.subTest(engine=engine, shapes=size, source=source):
+                        self.assertEqual(outcome(engine, source, False), expected)
+
+
+if __name__ == "__main__":
+    main()
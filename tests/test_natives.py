@@ -0,0 +1,60 @@
+from io import StringIO
+from typing import Tuple
+from unittest import TestCase, main
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.interpreter import LoxRuntimeError
+from lox.optimizer import passes
+
+
+cases = [
+    "print sqrt(sqrt(sqrt(256))) + abs(-1) + floor(2.5);",
+    "print sum(range(4) * 2) + mean(range(3)) + len(zeros(2)) + at(range(3), 2);",
+    "print min(zeros(0)); print max(range(3) - 1); print sqrt(range(3));",
+    "print log(0); print sqrt(-1); print exp(1000); print clock() - clock() <= 0;",
+    "print sum; var f = sqrt; print f(9); { var g = f; print g(4); }",
+    "var a = 1; print at(range(5), a = a + 1) + at(range(5), a); print a;",
+    "var a = 1; print a + sqrt(a + 3) * sqrt(at(range(5), a = 4)); print a;",
+    # rebinding a native inside a loop; the call site must see it
+    "var i = 0; while (i < 3) { print sqrt(2.25); if (i == 1) sqrt = floor; i = i + 1; }",
+    "var i = 0; while (i < 3) { print sqrt(2.25); if (i == 1) sqrt = clock; i = i + 1; }",
+    "print clock(1);",
+    "print abs(1, 2 + nil);",
+    "print \"abs\"(1);",
+    "var f = 1; print f(2 + nil);",
+    "print nope(1 + nil);",
+    "print range(3)(1);",
+    "print sqrt(\"a\");",
+    "print at(range(3), 3);",
+    "print range(-1);",
+    "print sum(1);",
+    "print sum(range(2) + nil);",
+    "print 1;\nprint sqrt(\n  true\n);",
+    "{ var a = 2; print a + sqrt(nil); }",
+]
+
+
+def outcome(engine: str, source: str, optimize: bool) -> Tuple[str, str]:
+    stdout = StringIO()
+    program = LoxEngine(engine, passes=list(passes) if optimize else None).compile(source)
+    try:
+        program.run(Globals(), stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class NativesTest(TestCase):
+    # differential test: calls, their errors and the order arguments and
+    #     errors come in agree on every engine, optimized or not
+    def test_cases(self) -> None:
+        for source in cases:
+            expected = outcome("interpreter", source, False)
+            for engine in engines:
+                for optimize in (False, True):
+                    with self.subTest(engine=engine, optimize=optimize, source=source):
+                        self.assertEqual(outcome(engine, source, optimize), expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from io import StringIO
+from unittest import TestCase, main
+from lox.lox import Lox
+from lox.output import Output
+
+
+class OutputTest(TestCase):
+    def setUp(self) -> None:
+        self.saved = Lox.output, Lox.streaming, Lox.had_error
+
+    def tearDown(self) -> None:
+        output, Lox.streaming, Lox.had_error = self.saved
+        Lox.use_output(output)
+
+    def printed(self, source: str, policy: str) -> str:
+        stream = StringIO()
+        Lox.use_output(Output(stream, policy))
+        Lox.streaming = True
+        Lox.run(source)
+        Lox.output.flush()
+        return stream.getvalue()
+
+    def test_scanner_messages_keep_their_place(self) -> None:
+        # streamed, the scanner gets to the bad character past its first
+        #     window of tokens, after the prints before that have run. the
+        #     message comes where writing every line at once puts it,
+        #     whatever the policy
+        source = "".join(f"print {index};\n" for index in range(200)) + "@\nprint 999;\n"
+        expected = self.printed(source, "line")
+        self.assertGreater(expected.index("Unexpected character."), 0)
+
+        for policy in Output.policies:
+            with self.subTest(policy=policy):
+                self.assertEqual(self.printed(source, policy), expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from random import Random
+from typing import Any, Tuple
+from unittest import TestCase, main
+from lox.parser import Parser, ParseError, StreamingParser
+from lox.scanner import Scanner
+from lox.tokens import Token
+from tool.bench.parsing import Cascade
+
+
+def dump(node: Any) -> Any:
+    # a tree as nested tuples, so two parses compare field by field
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return node.type, node.lexeme, node.line
+    if type(node).__module__ in ("lox.expression", "lox.statement"):
+        return type(node).__name__, [dump(getattr(node, field)) for field in type(node).__slots__]
+    return repr(node)
+
+
+def outcome(parser: Parser) -> Tuple[Any, ...]:
+    try:
+        return "parsed", dump(list(parser.parse()))
+    except ParseError as error:
+        return "error", dump(error.token), error.message
+
+
+def expression(random: Random, depth: int) -> str:
+    if depth <= 0 or random.random() < 0.2:
+        return random.choice(["a", "b.c", "1", "\"s\"", "nil", "true", "f()"])
+
+    choice = random.random()
+    if choice < 0.15:
+        return random.choice(["-", "!"]) + expression(random, depth - 1)
+    if choice < 0.3:
+        return f"({expression(random, depth - 1)})"
+    if choice < 0.4:
+        arguments = ", ".join(expression(random, depth - 2) for _ in range(random.randint(0, 3)))
+        return f"{expression(random, depth - 1)}({arguments})"
+    if choice < 0.5:
+        return f"({expression(random, depth - 1)}).p"
+    if choice < 0.6:
+        return f"{random.choice(['a', 'b.c', '(a).d', '-a'])} = {expression(random, depth - 1)}"
+    operator = random.choice(["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">="])
+    return f"{expression(random, depth - 1)} {operator} {expression(random, depth - 1)}"
+
+
+# pieces of expressions, put together at random mostly into broken ones, for
+#     the errors
+pieces = ["a", "b", "1", "\"s\"", "nil", "true", "(", ")", "+", "-", "*", "/", "==", "!=", "<", "<=",
+          ">", ">=", "!", "=", ".", "x", ",", "f(", "g()", ".y", "\n"]
+
+
+class ParsingTest(TestCase):
+    def test_random_scripts(self) -> None:
+        # differential test: the same trees and the same first error as the
+        #     cascade, from the buffered and the streaming parser alike
+        random = Random(0)
+        parsed = 0
+
+        for index in range(20_000):
+            if index % 2:
+                source = f"print {expression(random, 6)};\nx = {expression(random, 4)};"
+            else:
+                source = (random.choice(["print ", "", "var v = ", "if (", "while ("])
+                          + " ".join(random.choice(pieces) for _ in range(random.randint(1, 14)))
+                          + random.choice([";", ") print 1;", ""]))
+
+            tokens = Scanner(source).scan_tokens()
+            expected = outcome(Cascade(tokens))
+            for parser in (Parser(tokens), StreamingParser(iter(tokens))):
+                with self.subTest(parser=type(parser).__name__, source=source):
+                    self.assertEqual(outcome(parser), expected)
+            parsed += expected[0] == "parsed"
+
+        # trees and errors both get compared, thousands of each
+        self.assertGreater(parsed, 1_000)
+        self.assertGreater(20_000 - parsed, 1_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from io import StringIO
+from random import Random
+from typing import List, Tuple
+from unittest import TestCase, main
+import lox.rope
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.interpreter import LoxRuntimeError
+
+
+def program(random: Random) -> str:
+    # strings appended to, prepended to and compared with each other and
+    #     with literals, at the top level and in blocks
+    names = ["a", "b", "c"]
+    lines = [f"var {name} = \"{name * random.randint(0, 3)}\";" for name in names]
+
+    def string(exclude: str = None) -> str:
+        return random.choice([name for name in names if name != exclude] + ["\"x\"", "\"yz\"", "\"\""])
+
+    def statement() -> str:
+        choice = random.random()
+        if choice < 0.3:
+            return f"{random.choice(names)} = {string()} + {string()};"
+        if choice < 0.5:
+            return f"print {string()} + {string()} == {string()} + {string()};"
+        if choice < 0.6:
+            return f"print {string()} != {string()};"
+        if choice < 0.7:
+            return f"print {string()};"
+        if choice < 0.8:
+            inner = random.choice(names)
+            # a local can not be read in its own initializer
+            return f"{{ var {inner} = {string(inner)} + {string(inner)}; {statement()} {statement()} }}"
+        if choice < 0.9:
+            return f"{{ var i = 0; while (i < 3) {{ {statement()} i = i + 1; }} }}"
+        return f"if ({string()} == {string()}) {statement()} else {statement()}"
+
+    lines.extend(statement() for _ in range(random.randint(1, 12)))
+    if random.random() < 0.2:
+        lines.append(f"print {string()} + {random.choice(['1', 'nil', 'true'])};")
+    return "\n".join(lines)
+
+
+def outcome(source: str, engine: str, passes: List[str]) -> Tuple[str, str]:
+    stdout = StringIO()
+    try:
+        LoxEngine(engine, passes=passes).compile(source).run(Globals(), stdout)
+    except LoxRuntimeError as error:
+        return stdout.getvalue(), f"{error} [line {error.token.line}]"
+    return stdout.getvalue(), ""
+
+
+class RopeTest(TestCase):
+    # differential test: with every string + making a rope, every engine
+    #     must print what they do with plain strings
+    def setUp(self) -> None:
+        self.rope_min = lox.rope.ROPE_MIN
+
+    def tearDown(self) -> None:
+        lox.rope.ROPE_MIN = self.rope_min
+
+    def test_random_programs(self) -> None:
+        random = Random(0)
+
+        for _ in range(300):
+            source = program(random)
+            lox.rope.ROPE_MIN = float("inf")
+            expected = outcome(source, "interpreter", None)
+
+            lox.rope.ROPE_MIN = 1
+            for engine in engines:
+                for passes in (None, ["fold-constants"]):
+                    with self.subTest(engine=engine, passes=passes, source=source):
+                        self.assertEqual(outcome(source, engine, passes), expected)
+
+
+if __name__ == "__main__":
+    main()
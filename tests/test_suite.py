@@ -0,0 +1,23 @@
+from unittest import TestCase, main
+from tool.bench.suite import midranks, p_value
+
+
+class SuiteTest(TestCase):
+    def test_ties_share_their_mean_rank(self) -> None:
+        self.assertEqual(midranks([3.0, 1.0, 2.0]), [2, 0, 1])
+        self.assertEqual(midranks([1.0, 2.0, 2.0, 2.0, 0.5]), [1, 3, 3, 3, 0])
+        self.assertEqual(midranks([5.0] * 4), [1.5] * 4)
+
+    def test_ties_are_not_a_regression(self) -> None:
+        # timings at the timer's resolution, all alike: nothing got slower
+        self.assertGreater(p_value([1.0] * 10, [1.0] * 10, rounds=2_000), 0.5)
+        # as fast as often as slower, and with the same median. giving the
+        #     ties the lowest rank put this at 0.21, ranks averaged at 0.68
+        self.assertGreater(p_value([2.0] * 5, [1.0, 1.0, 2.0, 4.0, 4.0], rounds=2_000), 0.5)
+
+    def test_slower_is_significant(self) -> None:
+        self.assertLess(p_value([1.0, 1.1, 0.9, 1.0, 1.05], [2.0, 2.1, 1.9, 2.2, 2.0], rounds=2_000), 0.05)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from unittest import TestCase, main
+from lox.tokens import ByteTokenBuffer, TokenBuffer, TokenType
+
+
+class TokenBufferTest(TestCase):
+    def test_offsets_past_two_gibibytes(self) -> None:
+        # memory mapped scripts get offsets past what 32 bits hold
+        for buffer in (TokenBuffer(""), ByteTokenBuffer(b"")):
+            with self.subTest(buffer=type(buffer).__name__):
+                buffer.append(TokenType.NUMBER, 2 ** 31, 2 ** 31 + 1, 2 ** 31 + 2)
+                buffer.append(TokenType.EOF, 2 ** 40, 0, 3)
+                self.assertEqual((buffer.starts[0], buffer.lengths[0], buffer.lines[0]),
+                                 (2 ** 31, 2 ** 31 + 1, 2 ** 31 + 2))
+                self.assertEqual(buffer.starts[1], 2 ** 40)
+
+
+if __name__ == "__main__":
+    main()
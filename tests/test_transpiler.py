@@ -0,0 +1,51 @@
+from io import StringIO
+from unittest import TestCase, main
+from lox.engine import LoxEngine, engines
+from lox.errors import CompileError
+from lox.interpreter import LoxRuntimeError
+from lox.transpiler import MAX_LOOPS
+
+
+def loops(count: int) -> str:
+    # count loops in one another, a native called in the innermost
+    source = "".join(f"var i{index} = 0;\nwhile (i{index} < 1) {{ i{index} = i{index} + 1;\n"
+                     for index in range(count))
+    return source + "print abs(-1);\nprint abs(nil);\n" + "}" * count
+
+
+def printed(engine: str, source: str) -> str:
+    stdout = StringIO()
+    LoxEngine(engine).compile(source).run(stdout=stdout)
+    return stdout.getvalue()
+
+
+class TranspilerTest(TestCase):
+    def test_identifiers_python_does_not_take(self) -> None:
+        # the scanner starts names with whatever str.isalpha takes and
+        #     carries on with whatever str.isalnum does
+        source = "{ var x² = 1; var π = 3; var vⅫ = 12; var 変数 = x² + π; print 変数 * vⅫ; }"
+
+        for engine in engines:
+            with self.subTest(engine=engine):
+                self.assertEqual(printed(engine, source), "48\n")
+
+    def test_loops_in_loops(self) -> None:
+        # calls take none of python's nested blocks, and a native failing
+        #     is still reported at its call
+        for engine in engines:
+            with self.subTest(engine=engine):
+                with self.assertRaises(LoxRuntimeError) as raised:
+                    printed(engine, loops(MAX_LOOPS))
+                self.assertEqual((str(raised.exception), raised.exception.token.line),
+                                 ("Argument must be a number.", MAX_LOOPS * 2 + 2))
+
+        # past that the python engine refuses the program, at the loop
+        #     that is one too many
+        with self.assertRaises(CompileError) as raised:
+            LoxEngine("python").compile(loops(MAX_LOOPS + 1))
+        self.assertEqual(raised.exception.messages,
+                         [f"[line {MAX_LOOPS * 2 + 2}] Error: Loops nested too deeply for the python engine."])
+
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,15 @@ def write_imports(writer: TextIO, imports: Dict) -> None:
     writer.write("\n\n")
 
 
-def write_ast(output_dir: Path, base_name: str, imports: Dict, types: List[str]) -> None:
+def write_ast(output_dir: Path, base_name: str, imports: Dict, types: List[str], slots: bool = True) -> None:
     path = (output_dir / base_name.lower()).with_suffix(".py")
-    writer = open(path, "w", encoding="UTF-8")
 
-    write_imports(writer, imports)
-    define_ast(writer, base_name, types)
+    with open(path, "w", encoding="UTF-8") as writer:
+        write_imports(writer, imports)
+        define_ast(writer, base_name, types, slots)
 
 
-def define_ast(writer: TextIO, base_name: str, types: List[str]) -> None:
+def define_ast(writer: TextIO, base_name: str, types: List[str], slots: bool = True) -> None:
     writer.write("__all__ = [\n")
     writer.write(f"    \"{base_name}Visitor\",\n")
     writer.write(f"    \"{base_name}\",\n")
@@ -32,6 +32,8 @@ def define_ast(writer: TextIO, base_name: str, types: List[str]) -> None:
     writer.write("\n")
 
     writer.write(f"class {base_name}(ABC):\n")
+    if slots:
+        writer.write(f"    __slots__ = ()\n\n")
     writer.write(f"    @abstractmethod\n")
     writer.write(
         f"    def accept(self, visitor: {base_name}Visitor):\n")
@@ -41,7 +43,7 @@ def define_ast(writer: TextIO, base_name: str, types: List[str]) -> None:
         writer.write("\n\n")
         class_name = type.split(':', maxsplit=1)[0].strip()
         instance_vars = type.split(':', maxsplit=1)[1].strip()
-        define_type(writer, base_name, class_name, instance_vars)
+        define_type(writer, base_name, class_name, instance_vars, slots)
 
 
 def define_visitor(writer: TextIO, base_name: str, types: List[str]) -> None:
@@ -55,13 +57,17 @@ def define_visitor(writer: TextIO, base_name: str, types: List[str]) -> None:
         writer.write(f"        pass\n\n")
 
 
-def define_type(writer: TextIO, base_name: str, class_name: str, instance_vars: str) -> None:
+def define_type(writer: TextIO, base_name: str, class_name: str, instance_vars: str, slots: bool = True) -> None:
+    vars = [var.split(": ")[0] for var in instance_vars.split(", ")]
+
     writer.write(f"class {class_name}({base_name}):\n")
+    if slots:
+        # no per-instance __dict__; __slots__ also lists the fields in
+        #     constructor order, which lox.flat relies on
+        writer.write(f"    __slots__ = {tuple(vars)!r}\n\n")
     writer.write(f"    def __init__(self, {instance_vars}) -> None:\n")
 
-    vars = instance_vars.split(", ")
     for var in vars:
-        var = var.split(": ")[0]
         writer.write(f"        self.{var} = {var}\n")
 
     writer.write("\n")
@@ -71,37 +77,44 @@ def define_type(writer: TextIO, base_name: str, class_name: str, instance_vars:
         f"        return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)\n")
 
 
-def main(args) -> None:
-    if len(args) > 1:
-        stderr.write("Usage: GenerateAst.py <output directory>")
-        exit(64)
-
-    output_file = Path(args[0]).resolve()
-
-    write_ast(output_file, "Expression", {
+def generate(output_dir: Path, slots: bool = True) -> None:
+    write_ast(output_dir, "Expression", {
         "abc": "ABC, abstractmethod",
         "lox.tokens": "Token",
-        "typing": "Any"
+        "typing": "Any, List"
     }, [
-        'Assign   : name: Token, value: Expression',
+        'Assign   : name: Token, value: Expression, depth: int = None, slot: int = None',
         'Binary   : left: Expression, operator: Token, right: Expression',
+        'Call     : callee: Expression, paren: Token, arguments: List[Expression], fixed: bool = False',
+        'Get      : object: Expression, name: Token, site: Any = None',
         'Grouping : expression: Expression',
         'Literal  : value: Any',
+        'Set      : object: Expression, name: Token, value: Expression, site: Any = None',
         'Unary    : operator: Token, right: Expression',
-        'Variable : name: Token',
-    ])
+        'Variable : name: Token, depth: int = None, slot: int = None',
+    ], slots)
 
-    write_ast(output_file, 'Statement', {
+    write_ast(output_dir, 'Statement', {
         "abc": "ABC, abstractmethod",
         'typing': 'List',
         'lox.tokens': 'Token',
         'lox.expression': 'Expression, ExpressionVisitor',
     }, [
-        'Block      : statements: List[Statement]',
-        'Expression : expression: Expression',
-        'Print      : expression: Expression',
-        'Var        : name: Token, initializer: Expression',
-    ])
+        'Block      : statements: List[Statement], slots: int = 0, line: int = None',
+        'Expression : expression: Expression, line: int = None, deep: bool = False',
+        'If         : condition: Expression, then_branch: Statement, else_branch: Statement, line: int = None, deep: bool = False',
+        'Print      : expression: Expression, line: int = None, deep: bool = False',
+        'Var        : name: Token, initializer: Expression, slot: int = None, line: int = None, deep: bool = False',
+        'While      : condition: Expression, body: Statement, line: int = None, deep: bool = False',
+    ], slots)
+
+
+def main(args) -> None:
+    if len(args) > 1:
+        stderr.write("Usage: GenerateAst.py <output directory>")
+        exit(64)
+
+    generate(Path(args[0]).resolve())
 
 
 if __name__ == "__main__":
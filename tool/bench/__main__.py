@@ -0,0 +1,5 @@
+from sys import argv
+from tool.bench.suite import main
+
+
+exit(main(argv[1:]))
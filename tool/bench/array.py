@@ -0,0 +1,40 @@
+from io import StringIO
+from sys import argv
+from time import perf_counter
+from typing import List
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.array import LoxArray, numpy
+
+
+def main(args: List[str]) -> None:
+    elements = int(args[0]) if args else 10_000_000
+    selected = args[1].split(",") if len(args) > 1 else engines
+
+    # the same sum of a linear function, one element at a time and as arrays
+    loop = (f"var i = 0; var total = 0; "
+            f"while (i < {elements}) {{ total = total + i * 0.5 + 1; i = i + 1; }} print total;")
+    vectorized = "print sum(xs * 0.5 + 1);"
+
+    print(f"{elements} elements, arrays backed by {'numpy' if numpy is not None else 'array(d)'}")
+    print("engine          loop   vectorized  elements/s loop  elements/s vectorized")
+    xs = LoxArray(range(elements))
+    for engine in selected:
+        program = LoxEngine(engine).compile(loop)
+        start = perf_counter()
+        program.run(Globals(), StringIO())
+        looped = perf_counter() - start
+
+        program = LoxEngine(engine).compile(vectorized)
+        globals = Globals()
+        globals.define("xs", xs)
+        start = perf_counter()
+        program.run(globals, StringIO())
+        array_time = perf_counter() - start
+
+        print(f"{engine:<11} {looped:7.2f} s  {array_time:7.2f} s  {elements / looped:15,.0f}"
+              f"  {elements / array_time:21,.0f}")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
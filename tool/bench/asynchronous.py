@@ -0,0 +1,81 @@
+import asyncio
+from io import StringIO
+from statistics import quantiles
+from sys import argv
+from time import perf_counter
+from typing import Dict, List
+from lox.engine import CompiledProgram, LoxEngine
+from lox.environment import Globals
+from lox.asynchronous import AsyncWriter
+from tool.bench.corpus import mixed
+
+
+class Collected(AsyncWriter):
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+
+
+async def run(program: CompiledProgram, mode: Dict) -> None:
+    if mode is None:
+        # what embedding Interpreter.interpret in a coroutine does
+        program.run(Globals(), StringIO())
+    else:
+        await program.run_async(Globals(), Collected(), **mode)
+
+
+async def serve(long: CompiledProgram, short: CompiledProgram, mode: Dict,
+                longs: int, interval: float, count: int) -> Dict[str, float]:
+    # a few long scripts start together, and short ones arrive every
+    #     interval seconds while they run; a short script's latency counts
+    #     from when it was due to arrive
+    latencies = []
+
+    async def request(due: float) -> None:
+        await run(short, mode)
+        latencies.append(perf_counter() - due)
+
+    start = perf_counter()
+    background = [asyncio.create_task(run(long, mode)) for _ in range(longs)]
+    requests = []
+    while len(requests) < count:
+        # every request that has come in since the loop last got here
+        while len(requests) < count and start + len(requests) * interval <= perf_counter():
+            requests.append(asyncio.create_task(request(start + len(requests) * interval)))
+        await asyncio.sleep(max(0.0, start + len(requests) * interval - perf_counter()))
+
+    await asyncio.gather(*requests)
+    short_done = perf_counter()
+    await asyncio.gather(*background)
+
+    cuts = quantiles(latencies, n=100)
+    return {"p50": cuts[49], "p99": cuts[98], "max": max(latencies),
+            "short": short_done - start, "long": perf_counter() - start}
+
+
+def main(args: List[str]) -> None:
+    iterations = int(args[0]) if args else 100_000
+    longs = int(args[1]) if len(args) > 1 else 4
+
+    engine = LoxEngine()
+    long = engine.compile(f"var i = 0; while (i < {iterations}) {{ var j = i * 2; i = i + 1; }} print i;")
+    short = engine.compile(mixed(40))
+
+    print(f"{longs} scripts of {iterations} loop iterations running, short scripts arriving every 5 ms")
+    print("mode                    p50 ms    p99 ms    max ms   all short s  all long s")
+    modes = {
+        "blocking": None,
+        "async 1000 nodes": {"slice_nodes": 1000},
+        "async 10000 nodes": {"slice_nodes": 10_000},
+        "async 1 ms": {"slice_nodes": None, "slice_time": 0.001},
+    }
+    for name, mode in modes.items():
+        result = asyncio.run(serve(long, short, mode, longs, 0.005, 200))
+        print(f"{name:<20} {result['p50'] * 1000:9.1f} {result['p99'] * 1000:9.1f} {result['max'] * 1000:9.1f}"
+              f" {result['short']:13.2f} {result['long']:11.2f}")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
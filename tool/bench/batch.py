@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List
+from tool.bench.corpus import mixed
+
+
+def write_scripts(directory: Path, count: int) -> List[Path]:
+    # small scripts, every tenth failing to resolve or at run time
+    scripts = []
+
+    for index in range(count):
+        source = mixed(40)
+        if index % 10 == 3:
+            source += "\nprint -\"not a number\";"
+        elif index % 10 == 7:
+            source += "\n{ var a = 1; var a = 2; }"
+
+        script = directory / f"{index:05}.lox"
+        script.write_text(source)
+        scripts.append(script)
+
+    return scripts
+
+
+def separately(script: Path) -> Dict:
+    result = subprocess.run([sys.executable, "-m", "lox", str(script)], capture_output=True, text=True)
+    return {"status": result.returncode, "stdout": result.stdout, "stderr": result.stderr}
+
+
+def batch(directory: Path, jobs: int) -> Dict:
+    result = subprocess.run([sys.executable, "-m", "lox", "--batch", str(directory), "-j", str(jobs)],
+                            capture_output=True, text=True)
+    return json.loads(result.stdout)
+
+
+def main(args: List[str]) -> None:
+    count = int(args[0]) if args else 1_000
+    sample = min(count, 50)
+    jobs = os.cpu_count()
+
+    with TemporaryDirectory() as directory:
+        scripts = write_scripts(Path(directory), count)
+
+        start = perf_counter()
+        expected = {str(script): separately(script) for script in scripts[:sample]}
+        each = (perf_counter() - start) / sample
+
+        print(f"{count} scripts")
+        print(f"    one process each  {each * count:8.2f} s  (estimated from {sample})")
+
+        for workers in sorted({1, jobs}):
+            start = perf_counter()
+            report = batch(Path(directory), workers)
+            elapsed = perf_counter() - start
+
+            # every script must see the same as it does in a process of its own
+            for result in report["results"]:
+                if result["script"] in expected:
+                    if {name: result[name] for name in ("status", "stdout", "stderr")} != expected[result["script"]]:
+                        raise AssertionError(f"{result['script']} differs in the batch")
+
+            print(f"    --batch -j {workers:<5}  {elapsed:8.2f} s  ({report['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
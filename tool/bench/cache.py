@@ -0,0 +1,43 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import List
+from tool.bench.corpus import mixed
+
+
+def startup(arguments: List[str]) -> float:
+    start = perf_counter()
+    subprocess.run([sys.executable, "-m", "lox", *arguments], stdout=subprocess.DEVNULL, check=True)
+    return perf_counter() - start
+
+
+def main(args: List[str]) -> None:
+    repeat = int(args[0]) if args else 5
+
+    print("wall time of python -m lox, best of", repeat)
+    print("statements   no cache       cold       warm")
+    with TemporaryDirectory() as directory:
+        script = Path(directory) / "script.lox"
+        cache = Path(directory) / "cache"
+
+        for statements in (100, 1_000, 10_000, 50_000):
+            script.write_text(mixed(statements))
+            arguments = ["--cache-dir", str(cache), str(script)]
+
+            plain = min(startup([str(script)]) for _ in range(repeat))
+
+            cold = []
+            for _ in range(repeat):
+                shutil.rmtree(cache, ignore_errors=True)
+                cold.append(startup(arguments))
+
+            warm = min(startup(arguments) for _ in range(repeat))
+
+            print(f"{statements:>10}  {plain * 1000:7.0f} ms  {min(cold) * 1000:7.0f} ms  {warm * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import List
+from lox.cache import CheckCache
+from lox.check import check_scripts
+from tool.bench.corpus import mixed
+
+
+def write_scripts(directory: Path, count: int) -> List[str]:
+    # every tenth script with errors, which are never cached
+    scripts = []
+
+    for index in range(count):
+        source = mixed(100)
+        if index % 10 == 3:
+            source += "\nprint 1 +;\nvar = 2;"
+
+        script = directory / f"{index:05}.lox"
+        script.write_text(source)
+        scripts.append(str(script))
+
+    return scripts
+
+
+def main(args: List[str]) -> None:
+    count = int(args[0]) if args else 1_000
+    jobs = os.cpu_count()
+
+    with TemporaryDirectory() as directory:
+        (Path(directory) / "scripts").mkdir()
+        scripts = write_scripts(Path(directory) / "scripts", count)
+        cache_directory = Path(directory) / "cache"
+
+        print(f"{count} scripts, {jobs} jobs")
+        for name, cached in (("uncached", False), ("first, cached", True), ("unchanged, cached", True)):
+            cache = CheckCache(cache_directory) if cached else None
+            start = perf_counter()
+            report = check_scripts(scripts, jobs=jobs, cache=cache)
+            elapsed = perf_counter() - start
+
+            print(f"    {name:<18} {elapsed:7.2f} s  {count / elapsed:8.0f} scripts/s  {report['cached']} cached")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
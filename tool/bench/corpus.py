@@ -0,0 +1,86 @@
+from typing import Callable, Dict
+
+
+def arithmetic_heavy(statements: int) -> str:
+    line = "(1 + 2 * 3 - 4 / 5) * (6 - 7) + -(8 * 9) / (10 + 11) - 12 > 13 == false;\n"
+    return line * statements
+
+
+def print_heavy(statements: int) -> str:
+    line = "print \"line\" + \" \" + \"of output\";\nprint 1 + 2;\n"
+    return line * (statements // 2)
+
+
+def string_concatenation(statements: int) -> str:
+    # strings grow inside a loop, so the cost is in the engines' "+"
+    lines = ["var s = \"\";", "var i = 0;"]
+
+    for index in range(statements // 3):
+        lines.append(f"{{ var piece = \"{index}\"; s = s + piece + \", \"; }}")
+        lines.append("while (i < 8) { s = s + \"x\"; i = i + 1; }")
+        lines.append("i = 0; s = \"\";")
+
+    return "\n".join(lines)
+
+
+def nested_expressions(statements: int, depth: int = 40) -> str:
+    # deep enough to exercise the recursion of the parser and the
+    #     tree-walking engines, well short of python's recursion limit
+    expression = "1"
+    for level in range(depth):
+        operator = "+-*"[level % 3]
+        expression = f"({expression} {operator} {level % 7 + 1})"
+
+    return f"print {expression} > 0;\n" * statements
+
+
+def mixed(statements: int) -> str:
+    # a bit of every statement kind, with block scoped variables
+    lines = []
+
+    for index in range(statements // 4):
+        lines.append(f"var v{index} = (60 * 60 * 24) + {index} * -2;")
+        lines.append(f"print v{index} == {index} != \"s\" + \"t\";")
+        lines.append(f"{{ var a = v{index}; if (a > 1) print a; else a = a - 1; }}")
+        lines.append(f"while (v{index} < 0) v{index} = v{index} + 1;")
+
+    return "\n".join(lines)
+
+
+def recycled(statements: int) -> str:
+    # like mixed, but reusing a hundred globals so memory is not dominated
+    #     by the globals dictionary
+    lines = []
+
+    for index in range(statements // 4):
+        lines.append(f"var v{index % 100} = {index} * 2 + 1;")
+        lines.append(f"{{ var a = v{index % 100}; if (a > 1) print a; else a = a - 1; }}")
+        lines.append(f"print \"line \" + \"{index}\";")
+        lines.append(f"while (v{index % 100} < 0) v{index % 100} = v{index % 100} + 1;")
+
+    return "\n".join(lines)
+
+
+def large_file(size: float) -> str:
+    # a source of about size MiB for the scanners, with comments, string
+    #     literals and fractional numbers
+    lines = [
+        "var total = (60 * 60 * 24) + 1.5 * -2;\n",
+        "print \"a string literal\" + \" and another\";\n",
+        "{ var a = total; if (a >= 1) print a; else a = a - 1; }\n",
+        "while (total < 0) total = total + 1; // trailing comment\n",
+    ]
+    chunk = "".join(lines)
+
+    return chunk * int(size * 1024 * 1024 / len(chunk))
+
+
+# the workloads of the benchmark suite, at the sizes it runs them
+corpus: Dict[str, Callable[[], str]] = {
+    "arithmetic": lambda: arithmetic_heavy(2_000),
+    "strings": lambda: string_concatenation(1_500),
+    "print": lambda: print_heavy(4_000),
+    "nested": lambda: nested_expressions(200),
+    "mixed": lambda: mixed(4_000),
+    "large-file": lambda: large_file(1),
+}
@@ -0,0 +1,80 @@
+from io import StringIO
+from sys import argv
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+from lox import resolver
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.scanner import Scanner
+
+
+# nesting of every kind, each with what it prints, which tests/test_deep.py
+#     checks
+shapes: Dict[str, Tuple[Callable[[int], str], Callable[[int], str]]] = {
+    "parentheses": (lambda n: f"print {'(' * n}1{')' * n};", lambda n: "1"),
+    "negations": (lambda n: f"print {'-' * n}1;", lambda n: "1" if n % 2 == 0 else "-1"),
+    "chain": (lambda n: f"print 1{' + 1' * n};", lambda n: str(n + 1)),
+    "assignments": (lambda n: f"var a; print {'a = ' * n}1;", lambda n: "1"),
+    "calls": (lambda n: f"print {'abs(' * n}-1{')' * n};", lambda n: "1"),
+}
+
+
+def phases(source: str) -> List[float]:
+    start = perf_counter()
+    tokens = Scanner(source).scan_tokens()
+    scanned = perf_counter()
+    statements = Parser(tokens).parse()
+    parsed = perf_counter()
+    Resolver().resolve(statements)
+    resolved = perf_counter()
+    Interpreter(Globals(), StringIO()).interpret(statements)
+    ran = perf_counter()
+
+    return [scanned - start, parsed - scanned, resolved - parsed, ran - resolved]
+
+
+def evaluation_time(source: str, deep: int, repeat: int) -> float:
+    # best time of running a resolved program on the interpreter
+    saved = resolver.DEEP
+    resolver.DEEP = deep
+    try:
+        statements = Resolver().resolve(Parser(Scanner(source).scan_tokens()).parse())
+    finally:
+        resolver.DEEP = saved
+
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(Globals(), StringIO())
+        start = perf_counter()
+        interpreter.interpret(statements)
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+def main(args: List[str]) -> None:
+    depth = int(args[0]) if args else 100_000
+    repeat = int(args[1]) if len(args) > 1 else 5
+
+    print(f"{depth} levels of nesting on the interpreter")
+    print("shape            scan     parse   resolve       run")
+    for name, (source, _) in shapes.items():
+        times = phases(source(depth))
+        print(f"{name:<12} " + " ".join(f"{time * 1000:6.0f} ms" for time in times))
+
+    # under DEEP the interpreter recurses; what the explicit stack would
+    #     cost expressions it does not need it for
+    levels = resolver.DEEP - 10
+    print(f"\n{levels} levels, within recursion, 200 statements: recursive and explicit stack runs")
+    print("shape        recursive  explicit")
+    for name, (source, _) in shapes.items():
+        program = "\n".join([source(levels)] * 200)
+        recursive = evaluation_time(program, resolver.DEEP, repeat)
+        explicit = evaluation_time(program, 0, repeat)
+        print(f"{name:<12} {recursive * 1000:6.1f} ms  {explicit * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,51 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from sys import argv
+from time import perf_counter
+from typing import List
+from lox.lox import Lox
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.vm import VM
+from lox.output import Output
+from tool.bench.corpus import mixed
+
+
+def per_request(source: str, engine: str, requests: int) -> float:
+    # what an embedder had before: the whole front end on every request,
+    #     through the state on Lox
+    start = perf_counter()
+    for _ in range(requests):
+        with redirect_stdout(StringIO()):
+            Lox.globals = Globals()
+            Lox.output = Output()
+            Lox.interpreter = Interpreter(Lox.globals, Lox.output)
+            Lox.vm = VM(Lox.globals, Lox.output)
+            Lox.run(source, engine)
+            Lox.output.flush()
+    return perf_counter() - start
+
+
+def compiled_once(source: str, engine: str, requests: int) -> float:
+    start = perf_counter()
+    program = LoxEngine(engine).compile(source)
+    for _ in range(requests):
+        program.run(Globals(), StringIO())
+    return perf_counter() - start
+
+
+def main(args: List[str]) -> None:
+    requests = int(args[0]) if args else 200
+
+    source = mixed(100)
+    print(f"{requests} requests running the same script")
+    print("engine        Lox.run  compile once  speedup")
+    for engine in engines:
+        before = per_request(source, engine, requests)
+        after = compiled_once(source, engine, requests)
+        print(f"{engine:<11} {before * 1000:7.0f} ms  {after * 1000:9.0f} ms  {before / after:6.2f}x")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,56 @@
+from sys import argv
+from typing import Dict, List
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.interpreter import Interpreter
+from lox.compiler import Compiler
+from lox.vm import VM
+from lox.closures import ClosureCompiler
+from lox.transpiler import Transpiler, run as run_python
+from tool.bench.corpus import arithmetic_heavy, print_heavy
+from tool.bench.suite import best_of
+
+
+def bench(name: str, source: str, repeat: int) -> Dict[str, float]:
+    statements = Parser(Scanner(source).scan_tokens()).parse()
+
+    interpreter = Interpreter()
+    vm = VM()
+    chunk = Compiler().compile(statements)
+    program = ClosureCompiler().compile(statements)
+    code = Transpiler().compile(statements)
+
+    # engine -> (compile step, run step)
+    engines = {
+        "interpreter": (None, lambda: interpreter.interpret(statements)),
+        "vm": (lambda: Compiler().compile(statements), lambda: vm.interpret(chunk)),
+        "closure": (lambda: ClosureCompiler().compile(statements), program),
+        "python": (lambda: Transpiler().compile(statements), lambda: run_python(code)),
+    }
+
+    results = {}
+    for engine, (compile_step, run_step) in engines.items():
+        results[engine] = best_of(repeat, run_step)
+        if compile_step is not None:
+            results[f"{engine}_compile"] = best_of(repeat, compile_step)
+
+    print(name)
+    for engine in engines:
+        compiled = results.get(f"{engine}_compile")
+        print(f"    {engine:<12} run {results[engine]:8.4f}s"
+              f"  ({results['interpreter'] / results[engine]:5.2f}x)"
+              + (f"  compile {compiled:8.4f}s" if compiled is not None else ""))
+
+    return results
+
+
+def main(args: List[str]) -> None:
+    statements = int(args[0]) if args else 20_000
+    repeat = int(args[1]) if len(args) > 1 else 5
+
+    bench("arithmetic-heavy", arithmetic_heavy(statements), repeat)
+    bench("print-heavy", print_heavy(statements), repeat)
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,54 @@
+from statistics import median
+from sys import argv
+from time import perf_counter
+from typing import List
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.incremental import Document
+from tool.bench.corpus import mixed
+
+
+def latency(document: Document, edits: List[tuple]) -> float:
+    timings = []
+
+    for offset, deleted, inserted in edits:
+        start = perf_counter()
+        document.edit(offset, deleted, inserted)
+        timings.append(perf_counter() - start)
+
+    return median(timings)
+
+
+def main(args: List[str]) -> None:
+    print("median latency of an edit in the middle of the script")
+    print("statements  full parse       typing      newline    break/fix")
+    for statements in (1_000, 10_000, 100_000):
+        source = mixed(statements)
+
+        start = perf_counter()
+        Parser(Scanner(source).scan_tokens()).parse()
+        parse = perf_counter() - start
+
+        document = Document(source)
+        # the start of a line in the middle, which holds a print statement
+        middle = source.index("\nprint", len(source) // 2) + 1
+
+        # typing a variable name into an expression one character at a time
+        position = middle + len("print ")
+        typing = latency(document, [(position + index, 0, character) for index, character in enumerate("abc + ")])
+        latency(document, [(position, 6, "")])
+
+        # pressing return, so every line after it moves
+        newline = latency(document, [(middle, 0, "\n"), (middle, 1, "")] * 5)
+
+        # deleting a semicolon and typing it back, the script fails to parse
+        #     in between
+        semicolon = source.index(";", middle)
+        broken = latency(document, [(semicolon, 1, ""), (semicolon, 0, ";")] * 5)
+
+        print(f"{statements:>10}  {parse * 1000:7.1f} ms  {typing * 1_000_000:8.0f} µs"
+              f"  {newline * 1_000_000:8.0f} µs  {broken * 1_000_000:8.0f} µs")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,88 @@
+from io import StringIO
+from math import hypot
+from sys import argv
+from time import perf_counter
+from typing import List
+from lox import instances
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.instances import LoxClass, LoxInstance
+from lox.natives import Native, NativeError
+
+
+def point_init(self: LoxInstance, x: float, y: float) -> None:
+    self.set("x", x)
+    self.set("y", y)
+
+
+def point_move(self: LoxInstance, dx: float, dy: float) -> LoxInstance:
+    self.set("x", self.get("x") + dx)
+    self.set("y", self.get("y") + dy)
+    return self
+
+
+def point_add(self: LoxInstance, other: LoxInstance) -> float:
+    if type(other) is not LoxInstance:
+        raise NativeError("Argument must be an instance.")
+    return self.get("x") + other.get("x")
+
+
+def classes() -> Globals:
+    globals = Globals()
+    globals.define("Point", LoxClass("Point", {
+        "init": Native("init", 2, point_init),
+        "norm": Native("norm", 0, lambda self: hypot(self.get("x"), self.get("y"))),
+        "move": Native("move", 2, point_move),
+        "add": Native("add", 1, point_add),
+    }))
+    globals.define("Bag", LoxClass("Bag"))
+    globals.define("Counter", LoxClass("Counter", {
+        "init": Native("init", 0, lambda self: self.set("n", 0.0)),
+        "tick": Native("tick", 0, lambda self: self.set("n", self.get("n") + 1)),
+    }))
+    return globals
+
+
+# field heavy: reads and writes of a few fields on instances of two shapes,
+#     so every site stays polymorphic
+fields = ("{{ var a = Bag(); a.x = 0; a.y = 0; var b = Bag(); b.y = 0; b.x = 0; var o = a; var i = 0; "
+          "while (i < {iterations}) {{ o.x = o.x + o.y; o.y = o.x - i; if (o == a) o = b; else o = a; "
+          "i = i + 1; }} print a.x + b.y; }}")
+# method dispatch heavy: calls of methods on two classes, one chained
+methods = ("{{ var p = Point(0, 1); var c = Counter(); var i = 0; var t = 0; "
+           "while (i < {iterations}) {{ c.tick(); t = t + p.move(1, 0).norm(); i = i + 1; }} print t + c.n; }}")
+
+
+def lox_time(engine: str, template: str, iterations: int, size: int, repeat: int) -> float:
+    polymorphic = instances.POLYMORPHIC
+    instances.POLYMORPHIC = size
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            # compiled again each time, so no run starts with warm sites
+            program = LoxEngine(engine).compile(template.format(iterations=iterations))
+            start = perf_counter()
+            program.run(classes(), StringIO())
+            best = min(best, perf_counter() - start)
+    finally:
+        instances.POLYMORPHIC = polymorphic
+
+    return best
+
+
+def main(args: List[str]) -> None:
+    iterations = int(args[0]) if args else 200_000
+    repeat = int(args[1]) if len(args) > 1 else 3
+
+    print(f"{iterations} iterations, best of {repeat}; cached: sites keep {instances.POLYMORPHIC} shapes, "
+          f"uncached: every access looks its name up")
+    print("engine      workload   cached  uncached  speedup")
+    for engine in engines:
+        for workload, template in (("fields", fields), ("methods", methods)):
+            cached = lox_time(engine, template, iterations, instances.POLYMORPHIC, repeat)
+            uncached = lox_time(engine, template, iterations, 0, repeat)
+            print(f"{engine:<11} {workload:<8} {cached:6.2f} s  {uncached:6.2f} s  {uncached / cached:6.2f}x")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
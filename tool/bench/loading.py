@@ -0,0 +1,81 @@
+import resource
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List
+from lox.lox import Lox
+from lox.scanner import RegexScanner
+from tool.bench.corpus import large_file
+
+
+def write_workload(path: Path, megabytes: int) -> None:
+    chunk = large_file(1)
+
+    with open(path, "w") as file:
+        for _ in range(megabytes):
+            file.write(chunk)
+
+
+def status() -> Dict[str, int]:
+    # resident memory split into anonymous pages and pages of mapped files
+    fields = {}
+
+    with open("/proc/self/status") as file:
+        for line in file:
+            name, _, value = line.partition(":")
+            if name in ("RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0])
+
+    return fields
+
+
+def child(mode: str, path: str) -> None:
+    start = perf_counter()
+
+    if mode == "mmap":
+        scanner = Lox.scanner_for(Lox.map_file(Path(path)))
+    else:
+        scanner = RegexScanner(Path(path).read_text())
+
+    # tokens are dropped as they are scanned, like --stream does, so only
+    #     the cost of loading and walking the source is measured
+    while not scanner.is_at_end():
+        scanner.scan(4096)
+        scanner.tokens.clear()
+
+    elapsed = perf_counter() - start
+    resident = status()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(elapsed, peak, resident.get("RssAnon", 0), resident.get("RssFile", 0))
+
+
+def main(args: List[str]) -> None:
+    if args and args[0] == "child":
+        return child(args[1], args[2])
+
+    sizes = [int(size) for size in args[0].split(",")] if args else [10, 100]
+
+    print("scan throughput and memory, text read with read_text() or bytes from mmap")
+    print("      size   mode      MB/s    max rss   anon rss   file rss")
+    with TemporaryDirectory() as directory:
+        for megabytes in sizes:
+            path = Path(directory) / f"{megabytes}.lox"
+            write_workload(path, megabytes)
+            size = path.stat().st_size / 1_000_000
+
+            for mode in ("text", "mmap"):
+                result = subprocess.run([sys.executable, "-m", "tool.bench.loading", "child", mode, str(path)],
+                                        capture_output=True, text=True, check=True)
+                elapsed, peak, anonymous, mapped = result.stdout.split()
+
+                print(f"{size:7.0f} MB  {mode:>5}  {size / float(elapsed):8.2f}"
+                      f"  {int(peak) / 1024:6.0f} MiB  {int(anonymous) / 1024:6.0f} MiB  {int(mapped) / 1024:6.0f} MiB")
+
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,79 @@
+import tracemalloc
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from sys import argv
+from tempfile import TemporaryDirectory
+from types import ModuleType
+from typing import Any, Callable, Dict, List
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.expression import Expression as ExprExpression
+from lox.statement import Statement
+from lox.optimizer import NodeCounter
+from lox.flat import FlatAst
+from tool.GenerateAst import generate
+from tool.bench.corpus import mixed
+
+
+def load(path: Path, name: str) -> ModuleType:
+    spec = spec_from_file_location(name, path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def rebuild(node: Any, expressions: ModuleType, statements: ModuleType) -> Any:
+    # copies a tree into another generation of the node classes; tokens and
+    #     literal values are shared, so only the nodes themselves are new
+    if isinstance(node, list):
+        return [rebuild(child, expressions, statements) for child in node]
+    elif not isinstance(node, (ExprExpression, Statement)):
+        return node
+
+    family = statements if isinstance(node, Statement) else expressions
+    arguments = [rebuild(getattr(node, name), expressions, statements)
+                 for name in type(node).__slots__]
+
+    return getattr(family, type(node).__name__)(*arguments)
+
+
+def measure(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del result
+    return after - before
+
+
+def main(args: List[str]) -> None:
+    statements = int(args[0]) if args else 40_000
+
+    program = Resolver().resolve(Parser(Scanner(mixed(statements)).scan_tokens()).parse())
+    nodes = NodeCounter().count(program)
+
+    with TemporaryDirectory() as directory:
+        generate(Path(directory), slots=False)
+        legacy_expression = load(Path(directory) / "expression.py", "legacy_expression")
+        legacy_statement = load(Path(directory) / "statement.py", "legacy_statement")
+
+    import lox.expression
+    import lox.statement
+
+    layouts: Dict[str, Callable[[], Any]] = {
+        "__dict__ nodes": lambda: rebuild(program, legacy_expression, legacy_statement),
+        "__slots__ nodes": lambda: rebuild(program, lox.expression, lox.statement),
+        "flat arrays": lambda: FlatAst.flatten(program),
+    }
+
+    print(f"{nodes} nodes")
+    for name, build in layouts.items():
+        size = measure(build)
+        print(f"    {name:<16} {size / 1024 / 1024:8.2f} MiB  {size / nodes:6.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,67 @@
+from io import StringIO
+from sys import argv
+from time import perf_counter
+from typing import Callable, List
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+from lox.natives import Native
+
+
+def lox_time(engine: str, body: str, iterations: int, repeat: int) -> float:
+    # a loop of locals only, so the call is all that differs between bodies
+    source = (f"{{ var f = identity; var i = 0; var x = 0; "
+              f"while (i < {iterations}) {{ x = {body}; i = i + 1; }} }}")
+    program = LoxEngine(engine).compile(source)
+    best = float("inf")
+
+    for _ in range(repeat):
+        globals = Globals()
+        globals.define("identity", Native("identity", 1, lambda value: value))
+
+        start = perf_counter()
+        program.run(globals, StringIO())
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+def python_time(iterations: int, call: bool, repeat: int) -> float:
+    identity: Callable = lambda value: value
+
+    def loop() -> None:
+        i = 0.0
+        x = 0.0
+        while i < iterations:
+            x = identity(i) if call else i
+            i = i + 1.0
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        loop()
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+def main(args: List[str]) -> None:
+    iterations = int(args[0]) if args else 1_000_000
+    repeat = int(args[1]) if len(args) > 1 else 5
+
+    # fixed: identity(i), a global the script never assigns, looked up and
+    #     checked once; dynamic: f(i), a local, checked on every call
+    print(f"{iterations} calls of a native returning its argument, overhead per call")
+    print("engine        fixed    dynamic")
+    for engine in engines:
+        base = lox_time(engine, "i", iterations, repeat)
+        fixed = lox_time(engine, "identity(i)", iterations, repeat)
+        dynamic = lox_time(engine, "f(i)", iterations, repeat)
+        print(f"{engine:<11} {(fixed - base) / iterations * 1e9:5.0f} ns  {(dynamic - base) / iterations * 1e9:6.0f} ns")
+
+    base = python_time(iterations, False, repeat)
+    call = python_time(iterations, True, repeat)
+    print(f"{'python call':<11} {(call - base) / iterations * 1e9:5.0f} ns")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+from time import perf_counter
+from typing import List
+from lox.engine import LoxEngine
+from lox.environment import Globals
+from lox.output import Output
+
+
+modes = ("print", "line", "size", "time", "explicit")
+
+
+def child(mode: str, lines: int, engine: str) -> None:
+    # prints lines lines to stdout and the seconds it took to stderr; print
+    #     is the builtin print every line went through before Output
+    program = LoxEngine(engine).compile(f"var i = 0; while (i < {lines}) {{ print i; i = i + 1; }}")
+    output = None if mode == "print" else Output(policy=mode)
+
+    start = perf_counter()
+    program.run(Globals(), output)
+    if output is not None:
+        output.flush()
+    sys.stdout.flush()
+    sys.stderr.write(f"{perf_counter() - start}\n")
+
+
+def measure(mode: str, lines: int, engine: str, target: str) -> float:
+    command = [sys.executable, "-m", "tool.bench.output", "child", mode, str(lines), engine]
+
+    if target == "/dev/null":
+        with open("/dev/null", "w") as null:
+            result = subprocess.run(command, stdout=null, stderr=subprocess.PIPE, text=True, check=True)
+        return float(result.stderr)
+
+    # a pipe read as fast as this process can, in large blocks
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    received = 0
+    while block := process.stdout.read1(1 << 20):
+        received += len(block)
+    elapsed = float(process.stderr.read())
+    process.wait()
+
+    if received != sum(len(str(line)) + 1 for line in range(lines)):
+        raise AssertionError(f"{mode} lost output")
+    return elapsed
+
+
+def main(args: List[str]) -> None:
+    if args and args[0] == "child":
+        return child(args[1], int(args[2]), args[3])
+
+    lines = int(args[0]) if args else 10_000_000
+    engine = args[1] if len(args) > 1 else "python"
+
+    print(f"{lines} printed lines, {engine} engine")
+    print("policy      /dev/null       pipe")
+    for mode in modes:
+        null = measure(mode, lines, engine, "/dev/null")
+        pipe = measure(mode, lines, engine, "pipe")
+        print(f"{mode:<9} {null:9.2f} s  {pipe:7.2f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,139 @@
+from sys import argv
+from time import perf_counter
+from typing import Any, List
+from lox.expression import Expression as ExprExpression, Assign, Binary, Call, Get, Set, Unary, Literal, Grouping, Variable
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.tokens import TokenType
+from tool.bench.corpus import corpus
+
+
+class Cascade(Parser):
+    # the parser as it was: a method per precedence level, each calling the
+    #     next one down, kept as the reference the table driven one has to
+    #     agree with (tests/test_parsing.py) and is timed against
+    def expression(self) -> ExprExpression:
+        return self.assignment()
+
+    def assignment(self) -> ExprExpression:
+        expr = self.equality()
+
+        if self.match(TokenType.EQUAL):
+            equals = self.previous()
+            value = self.assignment()
+
+            if isinstance(expr, Variable):
+                return Assign(expr.name, value)
+            elif isinstance(expr, Get):
+                return Set(expr.object, expr.name, value)
+
+            raise self.error(equals, "Invalid assignment target.")
+
+        return expr
+
+    def equality(self) -> ExprExpression:
+        expr = self.comparison()
+
+        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
+            operator = self.previous()
+            expr = Binary(expr, operator, self.comparison())
+
+        return expr
+
+    def comparison(self) -> ExprExpression:
+        expr = self.term()
+
+        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
+            operator = self.previous()
+            expr = Binary(expr, operator, self.term())
+
+        return expr
+
+    def term(self) -> ExprExpression:
+        expr = self.factor()
+
+        while self.match(TokenType.MINUS, TokenType.PLUS):
+            operator = self.previous()
+            expr = Binary(expr, operator, self.factor())
+
+        return expr
+
+    def factor(self) -> ExprExpression:
+        expr = self.unary()
+
+        while self.match(TokenType.SLASH, TokenType.STAR):
+            operator = self.previous()
+            expr = Binary(expr, operator, self.unary())
+
+        return expr
+
+    def unary(self) -> ExprExpression:
+        if self.match(TokenType.BANG, TokenType.MINUS):
+            operator = self.previous()
+            return Unary(operator, self.unary())
+
+        expr = self.primary()
+        while self.match(TokenType.LEFT_PAREN, TokenType.DOT):
+            if self.previous_type() == TokenType.LEFT_PAREN:
+                expr = self.finish_call(expr)
+            else:
+                expr = Get(expr, self.consume(TokenType.IDENTIFIER, "Expect property name after '.'."))
+
+        return expr
+
+    def finish_call(self, callee: ExprExpression) -> ExprExpression:
+        arguments = []
+
+        if not self.check(TokenType.RIGHT_PAREN):
+            arguments.append(self.expression())
+            while self.match(TokenType.COMMA):
+                if len(arguments) >= 255:
+                    raise self.error(self.peek(), "Can't have more than 255 arguments.")
+                arguments.append(self.expression())
+
+        paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+        return Call(callee, paren, arguments)
+
+    def primary(self) -> ExprExpression:
+        if self.match(TokenType.FALSE):
+            return Literal(False)
+        elif self.match(TokenType.TRUE):
+            return Literal(True)
+        elif self.match(TokenType.NIL):
+            return Literal(None)
+        elif self.match(TokenType.NUMBER, TokenType.STRING):
+            return Literal(self.previous_literal())
+        elif self.match(TokenType.IDENTIFIER):
+            return Variable(self.previous())
+        elif self.match(TokenType.LEFT_PAREN):
+            expr = self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return Grouping(expr)
+
+        raise self.error(self.peek(), "Expect expression.")
+
+
+def throughput(parser: type, tokens: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        parser(tokens).parse()
+        best = min(best, perf_counter() - start)
+
+    return len(tokens) / best
+
+
+def main(args: List[str]) -> None:
+    repeat = int(args[0]) if args else 5
+
+    print(f"parse throughput in tokens per second, best of {repeat}")
+    print("workload       tokens    cascade      pratt  speedup")
+    for name, source in corpus.items():
+        tokens = Scanner(source()).scan_tokens()
+        cascade = throughput(Cascade, tokens, repeat)
+        pratt = throughput(Parser, tokens, repeat)
+        print(f"{name:<12} {len(tokens):>8} {cascade / 1e6:8.2f} M {pratt / 1e6:8.2f} M  {pratt / cascade:6.2f}x")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,40 @@
+from io import StringIO
+from sys import argv
+from time import perf_counter
+from typing import List
+import lox.rope
+from lox.engine import LoxEngine, engines
+from lox.environment import Globals
+
+
+def build(megabytes: float, engine: str) -> float:
+    # a string of the given size, built ten characters at a time
+    appends = int(megabytes * 1_000_000) // 10
+    program = LoxEngine(engine).compile(
+        f"var s = \"\"; var i = 0; while (i < {appends}) {{ s = s + \"0123456789\"; i = i + 1; }} print s;")
+
+    start = perf_counter()
+    program.run(Globals(), StringIO())
+    return perf_counter() - start
+
+
+def main(args: List[str]) -> None:
+    megabytes = float(args[0]) if args else 10
+
+    rope_min = lox.rope.ROPE_MIN
+    print("building a string by appending ten characters at a time")
+    print("engine         size      plain str      ropes")
+    for engine in engines:
+        for size in (0.25, 0.5, 1, megabytes):
+            # plain strings copy the whole string on every append
+            if size <= 1:
+                lox.rope.ROPE_MIN = float("inf")
+                plain = f"{build(size, engine):9.2f} s"
+                lox.rope.ROPE_MIN = rope_min
+            else:
+                plain = f"{'-':>11}"
+            print(f"{engine:<11} {size:6g} MB  {plain}  {build(size, engine):7.2f} s")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
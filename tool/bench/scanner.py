@@ -0,0 +1,33 @@
+from sys import argv
+from time import perf_counter
+from typing import List, Type
+from lox.scanner import Scanner, RegexScanner, BytesScanner
+from tool.bench.corpus import large_file
+
+
+def best_of(repeat: int, scanner: Type[Scanner], source: str) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        scanner(source).scan_tokens()
+        timings.append(perf_counter() - start)
+
+    return min(timings)
+
+
+def main(args: List[str]) -> None:
+    megabytes = float(args[0]) if args else 4
+    repeat = int(args[1]) if len(args) > 1 else 3
+
+    source = large_file(megabytes)
+    size = len(source.encode()) / 1_000_000
+
+    print(f"{size:.1f} MB source")
+    for scanner in (Scanner, RegexScanner, BytesScanner):
+        elapsed = best_of(repeat, scanner, source.encode() if scanner is BytesScanner else source)
+        print(f"    {scanner.__name__:<13} {elapsed:7.2f} s  {size / elapsed:7.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,69 @@
+from sys import argv
+from typing import List
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.interpreter import Interpreter
+from lox.compiler import Compiler
+from lox.vm import VM
+from lox.closures import ClosureCompiler
+from lox.transpiler import Transpiler, run as run_python
+from tool.bench.suite import best_of
+
+
+def nested(depth: int, iterations: int, declare: bool, read: str) -> str:
+    # depth nested blocks around a tight loop that reads one variable;
+    #     read is "inner", "outer" or "global"
+    source = ["var g = 1;"]
+
+    for level in range(depth):
+        source.append("{")
+        if declare:
+            source.append(f"var v{level} = 1;")
+
+    target = {
+        "inner": f"v{depth - 1}" if declare else "g",
+        "outer": "v0" if declare else "g",
+        "global": "g",
+    }[read]
+
+    source.append("var i = 0;")
+    source.append(f"while (i < {iterations}) {{ i = i + {target}; }}")
+    source.append("}" * depth)
+
+    return "\n".join(source)
+
+
+def bench(depth: int, iterations: int, declare: bool, read: str, repeat: int) -> None:
+    statements = Resolver().resolve(Parser(Scanner(nested(depth, iterations, declare, read)).scan_tokens()).parse())
+    chunk = Compiler().compile(statements)
+    program = ClosureCompiler().compile(statements)
+    code = Transpiler().compile(statements)
+
+    engines = {
+        "interpreter": lambda: Interpreter().interpret(statements),
+        "vm": lambda: VM().interpret(chunk),
+        "closure": program,
+        "python": lambda: run_python(code),
+    }
+
+    row = [f"{depth:>5}", f"{'yes' if declare else 'no':>7}", f"{read:>6}"]
+    for run in engines.values():
+        row.append(f"{best_of(repeat, run) / iterations * 1e9:9.0f}")
+
+    print("  ".join(row))
+
+
+def main(args: List[str]) -> None:
+    iterations = int(args[0]) if args else 20_000
+    repeat = int(args[1]) if len(args) > 1 else 3
+
+    print("ns per loop iteration")
+    print("depth  declare    read  interpreter        vm   closure    python")
+    for declare, read in ((True, "inner"), (True, "global"), (False, "global"), (True, "outer")):
+        for depth in (1, 8, 32, 128):
+            bench(depth, iterations, declare, read, repeat)
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,58 @@
+import tracemalloc
+from contextlib import redirect_stdout
+from sys import argv
+from time import perf_counter
+from typing import List, Tuple
+from lox.lox import Lox
+from tool.bench.corpus import recycled
+
+
+class Sink:
+    def __init__(self) -> None:
+        self.first: float = None
+
+    def write(self, text: str) -> int:
+        if self.first is None:
+            self.first = perf_counter()
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def measure(source: str, engine: str, streaming: bool) -> Tuple[float, float, int]:
+    Lox.streaming = streaming
+
+    sink = Sink()
+    with redirect_stdout(sink):
+        start = perf_counter()
+        Lox.run(source, engine)
+        elapsed = perf_counter() - start
+
+    # peak memory is measured on a second run, tracemalloc slows it down
+    tracemalloc.start()
+    with redirect_stdout(Sink()):
+        Lox.run(source, engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    Lox.streaming = False
+    return sink.first - start, elapsed, peak
+
+
+def main(args: List[str]) -> None:
+    engine = args[0] if args else "interpreter"
+
+    print(f"{engine}: time to first output, total time and peak memory besides the source")
+    print("statements    mode    first output      total         peak")
+    for statements in (1_000, 10_000, 100_000):
+        source = recycled(statements)
+
+        for streaming in (False, True):
+            first, elapsed, peak = measure(source, engine, streaming)
+            print(f"{statements:>10}  {'stream' if streaming else 'batch':>6}  {first * 1000:12.1f} ms"
+                  f"  {elapsed:8.2f} s  {peak / 1024:9.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(argv[1:])
@@ -0,0 +1,220 @@
+import gc
+import json
+import platform
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from os import devnull
+from random import Random
+from statistics import median, stdev
+from time import perf_counter
+from typing import Callable, Dict, List, Type
+from lox.scanner import Scanner
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.environment import Globals
+from lox.interpreter import Interpreter
+from lox.compiler import Compiler
+from lox.vm import VM
+from lox.closures import ClosureCompiler
+from lox.transpiler import Transpiler, run as run_python
+from lox.lox import Lox
+from tool.bench.corpus import corpus
+
+
+# workload -> phase -> seconds of every measured iteration
+Samples = Dict[str, Dict[str, List[float]]]
+
+
+def best_of(repeat: int, function: Callable[[], None]) -> float:
+    timings = []
+
+    with open(devnull, "w") as sink, redirect_stdout(sink):
+        for _ in range(repeat):
+            start = perf_counter()
+            function()
+            timings.append(perf_counter() - start)
+
+    return min(timings)
+
+
+def phases(source: str, engine: str, scanner: Type[Scanner]) -> Dict[str, float]:
+    timings = {}
+
+    start = perf_counter()
+    tokens = scanner(source).scan_tokens()
+    timings["scan"] = perf_counter() - start
+
+    start = perf_counter()
+    statements = Parser(tokens).parse()
+    timings["parse"] = perf_counter() - start
+
+    start = perf_counter()
+    Resolver().resolve(statements)
+    timings["resolve"] = perf_counter() - start
+
+    # engine -> (compile step, run step taking what it compiled)
+    steps = {
+        "interpreter": (lambda: statements, Interpreter(Globals()).interpret),
+        "vm": (lambda: Compiler().compile(statements), VM(Globals()).interpret),
+        "closure": (lambda: ClosureCompiler().compile(statements), lambda program: program(Globals())),
+        "python": (lambda: Transpiler().compile(statements), lambda code: run_python(code, Globals())),
+    }
+    compile_step, run_step = steps[engine]
+
+    start = perf_counter()
+    program = compile_step()
+    if engine != "interpreter":
+        timings["compile"] = perf_counter() - start
+
+    start = perf_counter()
+    run_step(program)
+    timings["run"] = perf_counter() - start
+
+    return timings
+
+
+def run(workloads: List[str], engine: str, scanner: Type[Scanner], iterations: int, warmup: int) -> Samples:
+    samples: Samples = {}
+
+    with open(devnull, "w") as sink:
+        for name in workloads:
+            source = corpus[name]()
+            samples[name] = {}
+
+            for iteration in range(warmup + iterations):
+                # garbage left by one iteration is not billed to the next
+                gc.collect()
+
+                with redirect_stdout(sink):
+                    timings = phases(source, engine, scanner)
+
+                if iteration < warmup:
+                    continue
+                for phase, elapsed in timings.items():
+                    samples[name].setdefault(phase, []).append(elapsed)
+
+            report(name, samples[name])
+
+    return samples
+
+
+def report(name: str, phases: Dict[str, List[float]]) -> None:
+    print(name)
+    for phase, timings in phases.items():
+        spread = stdev(timings) / median(timings) * 100 if len(timings) > 1 else 0.0
+        print(f"    {phase:<8} {median(timings) * 1000:10.2f} ms  ±{spread:4.1f}%")
+
+
+def midranks(values: List[float]) -> List[float]:
+    # the rank of each value in sorted order, from 0; equal values, which
+    #     the timer's resolution makes common, share the mean of the ranks
+    #     they span rather than all getting the lowest
+    first: Dict[float, int] = {}
+    last: Dict[float, int] = {}
+    for index, value in enumerate(sorted(values)):
+        first.setdefault(value, index)
+        last[value] = index
+
+    return [(first[value] + last[value]) / 2 for value in values]
+
+
+def p_value(baseline: List[float], current: List[float], rounds: int = 10_000) -> float:
+    # one sided permutation test on rank sums: how often a random split of
+    #     all the samples ranks the current ones at least as slow as they
+    #     are; ranks keep a single outlier from deciding the result
+    ranks = midranks(baseline + current)
+    observed = sum(ranks[len(baseline):])
+    random = Random(0)
+    extreme = 0
+
+    for _ in range(rounds):
+        random.shuffle(ranks)
+        if sum(ranks[len(baseline):]) >= observed:
+            extreme += 1
+
+    return (extreme + 1) / (rounds + 1)
+
+
+def compare(baseline: Samples, current: Samples, threshold: float, alpha: float) -> int:
+    # a phase regressed when its median is more than threshold slower and
+    #     that is unlikely to be noise; returns how many did
+    regressions = 0
+
+    print(f"{'workload':<12} {'phase':<8} {'baseline':>11} {'current':>11} {'change':>8} {'p':>7}")
+    for name, phases in current.items():
+        for phase, timings in phases.items():
+            before = baseline.get(name, {}).get(phase)
+            if not before:
+                continue
+
+            change = median(timings) / median(before) - 1
+            p = p_value(before, timings)
+            verdict = ""
+            if change > threshold and p < alpha:
+                verdict = "REGRESSION"
+                regressions += 1
+            elif change < -threshold and p_value(timings, before) < alpha:
+                verdict = "faster"
+
+            print(f"{name:<12} {phase:<8} {median(before) * 1000:8.2f} ms {median(timings) * 1000:8.2f} ms"
+                  f" {change * 100:+7.1f}% {p:7.4f}  {verdict}")
+
+    return regressions
+
+
+def main(args: List[str]) -> int:
+    parser = ArgumentParser(prog="python -m tool.bench")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_command = commands.add_parser("run", help="time every phase of the corpus workloads")
+    run_command.add_argument("--workloads", default=",".join(corpus),
+                             help=f"comma separated workloads: {', '.join(corpus)}")
+    run_command.add_argument("--engine", choices=Lox.engines, default="interpreter")
+    run_command.add_argument("--scanner", choices=Lox.scanners, default="chars")
+    run_command.add_argument("--iterations", type=int, default=10)
+    run_command.add_argument("--warmup", type=int, default=2)
+    run_command.add_argument("--output", help="write the samples to this json file")
+
+    compare_command = commands.add_parser("compare", help="flag regressions against a baseline run")
+    compare_command.add_argument("baseline")
+    compare_command.add_argument("current")
+    compare_command.add_argument("--threshold", type=float, default=5.0, help="slowdown in percent to flag")
+    compare_command.add_argument("--alpha", type=float, default=0.01, help="significance level")
+
+    options = parser.parse_args(args)
+
+    if options.command == "run":
+        workloads = options.workloads.split(",")
+        for name in workloads:
+            if name not in corpus:
+                parser.error(f"Unknown workload '{name}'.")
+
+        samples = run(workloads, options.engine, Lox.scanners[options.scanner], options.iterations, options.warmup)
+
+        if options.output is not None:
+            with open(options.output, "w") as file:
+                json.dump({
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "engine": options.engine,
+                    "scanner": options.scanner,
+                    "iterations": options.iterations,
+                    "warmup": options.warmup,
+                    "samples": samples,
+                }, file, indent=2)
+        return 0
+
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    with open(options.current) as file:
+        current = json.load(file)
+
+    for setting in ("engine", "scanner"):
+        if baseline[setting] != current[setting]:
+            print(f"warning: {setting} differs, {baseline[setting]} against {current[setting]}")
+
+    regressions = compare(baseline["samples"], current["samples"], options.threshold / 100, options.alpha)
+    print(f"{regressions} regression{'' if regressions == 1 else 's'}")
+    return 1 if regressions else 0
@@ -0,0 +1,50 @@
+import tracemalloc
+from sys import argv
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+from lox.scanner import Scanner
+from lox.parser import Parser
+from tool.bench.corpus import large_file
+
+
+def measure(build: Callable[[], Any]) -> Tuple[float, int]:
+    # time is taken without tracemalloc, which slows allocation down a lot
+    start = perf_counter()
+    result = build()
+    elapsed = perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    del result
+    return elapsed, peak
+
+
+def main(args: List[str]) -> None:
+    megabytes = float(args[0]) if args else 10
+    source = large_file(megabytes)
+
+    buffer = Scanner(source).scan_tokens()
+    count = len(buffer)
+    del buffer
+
+    phases = {
+        "scan": lambda: Scanner(source).scan_tokens(),
+        # what the scanner used to produce: one Token object and one lexeme
+        #     string per token
+        "scan + Token objects": lambda: list(Scanner(source).scan_tokens()),
+        "scan + parse": lambda: Parser(Scanner(source).scan_tokens()).parse(),
+    }
+
+    print(f"{len(source) / 1024 / 1024:.1f} MiB source, {count} tokens")
+    for name, build in phases.items():
+        elapsed, peak = measure(build)
+        print(f"    {name:<22} {elapsed:8.2f} s  {len(source) / 1024 / 1024 / elapsed:6.2f} MiB/s"
+              f"  peak {peak / 1024 / 1024:9.1f} MiB  {peak / count:6.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main(argv[1:])